@@ -0,0 +1,262 @@
+# account_deletion.py
+import asyncio
+import logging
+import os
+import uuid
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal, db_now
+import metrics
+from models import user as models_user
+from models import training_block as models_training_block
+from models import training_block_exercise as models_tbe
+from models import exercise_log as models_log
+from models import exercise_daily_stat as models_stat
+from models import personal_record as models_record
+from models import daily_activity as models_activity
+from models import sync_tombstone as models_tombstone
+from models import account_deletion_job as models_job
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# Linhas apagadas por transação: mantém cada lock e cada entrada de WAL pequenos.
+ACCOUNT_DELETION_BATCH_SIZE = int(os.getenv("ACCOUNT_DELETION_BATCH_SIZE", "5000"))
+# Job ativo sem heartbeat há mais que isto ficou órfão (o worker caiu) e é retomado por outro.
+ACCOUNT_DELETION_STALE_SECONDS = float(os.getenv("ACCOUNT_DELETION_STALE_SECONDS", "300"))
+# Intervalo entre as buscas por jobs órfãos em cada worker.
+ACCOUNT_DELETION_RESUME_SECONDS = float(os.getenv("ACCOUNT_DELETION_RESUME_SECONDS", "60"))
+
+logger = logging.getLogger("gym_notes.account_deletion")
+
+Job = models_job.AccountDeletionJob
+
+
+def job_status(job: Job) -> dict:
+    """Corpo de AccountDeletionStatus a partir da linha do job."""
+    return {
+        "id": job.id.hex,
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "deleted_rows": job.deleted_rows,
+        "progress": min(1.0, job.deleted_rows / job.total_rows) if job.total_rows else (1.0 if job.status == "completed" else 0.0),
+        "current_table": job.current_table,
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def _owned_rows(user_id: uuid.UUID):
+    """(nome, modelo, coluna de PK, filtro) na ordem de exclusão: filhos antes dos pais."""
+    user_blocks = select(models_training_block.TrainingBlock.id)\
+        .where(models_training_block.TrainingBlock.user_id == user_id)
+    return (
+        ("exercise_logs", models_log.ExerciseLog, models_log.ExerciseLog.id,
+         models_log.ExerciseLog.user_id == user_id),
+        ("training_block_exercises", models_tbe.TrainingBlockExercise, models_tbe.TrainingBlockExercise.id,
+         models_tbe.TrainingBlockExercise.training_block_id.in_(user_blocks)),
+        ("training_blocks", models_training_block.TrainingBlock, models_training_block.TrainingBlock.id,
+         models_training_block.TrainingBlock.user_id == user_id),
+    )
+
+
+async def _update_job(db: AsyncSession, job_id: uuid.UUID, **values) -> None:
+    await db.execute(
+        update(Job).where(Job.id == job_id).values(**values).execution_options(synchronize_session=False)
+    )
+
+
+class AccountDeletionJobs:
+    """
+    Executa as exclusões de conta registradas em account_deletion_jobs.
+
+    Cada job apaga os dados do usuário em lotes de ACCOUNT_DELETION_BATCH_SIZE; o commit de
+    cada lote grava também o progresso e renova o heartbeat do job, e por fim sai a linha de
+    users (o ON DELETE CASCADE cobre o que restar). Um job ativo com heartbeat antigo (o
+    worker caiu ou reiniciou) é assumido por qualquer worker em `resume_stale`; apagar de novo
+    o que já saiu não tem efeito, então retomar é seguro.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = ACCOUNT_DELETION_BATCH_SIZE,
+        stale_seconds: float = ACCOUNT_DELETION_STALE_SECONDS,
+        resume_seconds: float = ACCOUNT_DELETION_RESUME_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.stale_seconds = stale_seconds
+        self.resume_seconds = resume_seconds
+        # O loop de eventos só guarda referências fracas das tasks; estas mantêm os jobs vivos.
+        self._tasks = set()
+        self._resumer: Optional[asyncio.Task] = None
+        self._resumed = 0
+        self._failed = 0
+
+    async def create(self, db: AsyncSession, user_id: uuid.UUID, username: str) -> Job:
+        """
+        Registra o job na transação de `db` (a mesma que desativa a conta), sem commit; se o
+        usuário já tem um job ativo, devolve esse. Depois do commit, chame `launch`.
+        """
+        existing = await db.scalar(
+            select(Job).where(Job.user_id == user_id).where(Job.status.in_(models_job.ACTIVE_STATUSES))
+        )
+        if existing is not None:
+            return existing
+        return await db.scalar(
+            insert(Job).values(id=uuid.uuid4(), user_id=user_id, username=username, status="pending").returning(Job)
+        )
+
+    def launch(self, job_id: uuid.UUID) -> None:
+        """Executa o job em segundo plano neste processo."""
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def get(self, db: AsyncSession, job_id: uuid.UUID) -> Optional[Job]:
+        return await db.scalar(select(Job).where(Job.id == job_id))
+
+    async def resume_stale(self) -> int:
+        """Assume os jobs ativos sem heartbeat recente e os executa neste processo."""
+        async with AsyncSessionLocal() as db:
+            stale_before = await db.scalar(select(db_now())) - timedelta(seconds=self.stale_seconds)
+            # O UPDATE renova o heartbeat: outro worker procurando ao mesmo tempo não assume os mesmos jobs.
+            job_ids = (await db.scalars(
+                update(Job)\
+                    .where(Job.status.in_(models_job.ACTIVE_STATUSES))\
+                    .where(Job.heartbeat_at < stale_before)\
+                    .values(heartbeat_at=db_now())\
+                    .returning(Job.id)\
+                    .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+        for job_id in job_ids:
+            logger.warning("Resuming account deletion %s", job_id)
+            self.launch(job_id)
+        self._resumed += len(job_ids)
+        return len(job_ids)
+
+    def start_resumer(self) -> None:
+        """Procura jobs órfãos a cada ACCOUNT_DELETION_RESUME_SECONDS (ligado no startup da API)."""
+        if self._resumer is None:
+            self._resumer = asyncio.create_task(self._resume_forever())
+
+    async def stop(self) -> None:
+        """Para a busca por jobs órfãos; jobs interrompidos aqui são retomados por outro worker."""
+        if self._resumer is not None:
+            self._resumer.cancel()
+            try:
+                await self._resumer
+            except asyncio.CancelledError:
+                pass
+            self._resumer = None
+
+    async def _resume_forever(self) -> None:
+        while True:
+            try:
+                await self.resume_stale()
+            except Exception:
+                logger.exception("Account deletion resume check failed")
+            await asyncio.sleep(self.resume_seconds)
+
+    async def _count_rows(self, db: AsyncSession, user_id: uuid.UUID) -> int:
+        total = 1  # a própria linha de users
+        for _, _, primary_key, condition in _owned_rows(user_id):
+            total += await db.scalar(select(func.count(primary_key)).where(condition))
+        return total
+
+    async def _delete_in_batches(self, job_id: uuid.UUID, table: str, model, primary_key, condition) -> None:
+        while True:
+            batch = select(primary_key).where(condition).limit(self.batch_size)
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    delete(model).where(primary_key.in_(batch)).execution_options(synchronize_session=False)
+                )
+                await _update_job(
+                    db, job_id,
+                    deleted_rows=Job.deleted_rows + result.rowcount, current_table=table, heartbeat_at=db_now(),
+                )
+                await db.commit()
+            if result.rowcount < self.batch_size:
+                return
+
+    async def _run(self, job_id: uuid.UUID) -> None:
+        # A task herda o contexto da requisição DELETE; o job não deve contar nas métricas dela.
+        metrics.current_request_stats.set(None)
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await self.get(db, job_id)
+                user_id = job.user_id
+                # Retomado, o que já saiu continua contado em deleted_rows.
+                total_rows = job.deleted_rows + await self._count_rows(db, user_id)
+                await _update_job(db, job_id, status="running", total_rows=total_rows, heartbeat_at=db_now())
+                await db.commit()
+
+            for table, model, primary_key, condition in _owned_rows(user_id):
+                await self._delete_in_batches(job_id, table, model, primary_key, condition)
+
+            async with AsyncSessionLocal() as db:
+                # Agregados (um por exercício/dia, exercício/reps ou dia) e tombstones são pequenos e saem num único statement cada.
+                await db.execute(delete(models_stat.ExerciseDailyStat).where(models_stat.ExerciseDailyStat.user_id == user_id))
+                await db.execute(delete(models_record.PersonalRecord).where(models_record.PersonalRecord.user_id == user_id))
+                await db.execute(delete(models_activity.DailyActivity).where(models_activity.DailyActivity.user_id == user_id))
+                await db.execute(delete(models_tombstone.SyncTombstone).where(models_tombstone.SyncTombstone.user_id == user_id))
+                result = await db.execute(delete(models_user.User).where(models_user.User.id == user_id))
+                await _update_job(
+                    db, job_id,
+                    status="completed", deleted_rows=Job.deleted_rows + result.rowcount, current_table=None,
+                    heartbeat_at=db_now(), finished_at=db_now(),
+                )
+                await db.commit()
+        except Exception as error:
+            logger.exception("Account deletion %s failed", job_id)
+            self._failed += 1
+            try:
+                async with AsyncSessionLocal() as db:
+                    await _update_job(db, job_id, status="failed", error=str(error), finished_at=db_now())
+                    await db.commit()
+            except Exception:
+                # Sem registrar a falha, o job segue ativo e é retomado quando o heartbeat envelhecer.
+                logger.exception("Could not record the failure of account deletion %s", job_id)
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self._tasks),
+            "resumed": self._resumed,
+            "failed": self._failed,
+        }
+
+
+account_deletion_jobs = AccountDeletionJobs()
+
+
+async def _delete_account(user_id: uuid.UUID) -> None:
+    async with AsyncSessionLocal() as db:
+        username = await db.scalar(select(models_user.User.username).where(models_user.User.id == user_id))
+        if username is None:
+            print("User not found")
+            return
+        await db.execute(update(models_user.User).where(models_user.User.id == user_id).values(is_active=False))
+        job = await account_deletion_jobs.create(db, user_id, username)
+        await db.commit()
+    # Assume o job aqui mesmo se já estava ativo: o worker que o executava pode ter caído.
+    account_deletion_jobs.launch(job.id)
+    while True:
+        await asyncio.sleep(1)
+        async with AsyncSessionLocal() as db:
+            job = await account_deletion_jobs.get(db, job.id)
+        print(f"{job.status}: {job.deleted_rows}/{job.total_rows} ({job.current_table or '-'})")
+        if job.status in ("completed", "failed"):
+            break
+    if job.error:
+        print(job.error)
+
+
+if __name__ == "__main__":
+    # Conclui a exclusão de uma conta interrompida: python account_deletion.py <user_id>
+    import sys
+    asyncio.run(_delete_account(uuid.UUID(sys.argv[1])))
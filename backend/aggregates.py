@@ -0,0 +1,358 @@
+# aggregates.py
+import uuid
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, func, insert, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import exercise_log as models_log
+from models import exercise_daily_stat as models_stat
+from models import personal_record as models_record
+from models import daily_activity as models_activity
+
+LB_TO_KG = 0.45359237
+
+# Chave de agregação afetada por uma escrita em exercise_logs.
+LogKey = Tuple[uuid.UUID, date]
+
+# Primeira chave de pg_advisory_xact_lock(int, int): separa os locks dos agregados de outros usos.
+AGGREGATES_LOCK_NAMESPACE = 6
+
+
+def set_weight_kg(set_data: dict) -> float:
+    """Peso da série normalizado para kg."""
+    weight = float(set_data.get("weight") or 0.0)
+    if (set_data.get("unit") or "kg").lower() in ("lb", "lbs"):
+        return weight * LB_TO_KG
+    return weight
+
+
+def estimate_1rm(weight_kg: float, reps: int) -> float:
+    """1RM estimado pela fórmula de Epley."""
+    if reps <= 0 or weight_kg <= 0:
+        return 0.0
+    if reps == 1:
+        return weight_kg
+    return weight_kg * (1 + reps / 30.0)
+
+
+def summarize_sets(sets: Optional[Iterable[dict]]) -> dict:
+    """Totais de uma lista de séries (sets_reps_data), com pesos em kg."""
+    summary = {"set_count": 0, "total_volume": 0.0, "top_set_weight": 0.0, "estimated_1rm": 0.0}
+    for set_data in sets or []:
+        weight = set_weight_kg(set_data)
+        reps = int(set_data.get("reps") or 0)
+        summary["set_count"] += 1
+        summary["total_volume"] += weight * reps
+        summary["top_set_weight"] = max(summary["top_set_weight"], weight)
+        summary["estimated_1rm"] = max(summary["estimated_1rm"], estimate_1rm(weight, reps))
+    return summary
+
+
+def log_totals(sets: Optional[Iterable[dict]]) -> dict:
+    """Colunas derivadas de exercise_logs, gravadas junto com sets_reps_data em toda escrita."""
+    summary = summarize_sets(sets)
+    return {
+        "set_count": summary["set_count"],
+        "total_volume_kg": summary["total_volume"],
+        "top_weight_kg": summary["top_set_weight"],
+        "estimated_1rm_kg": summary["estimated_1rm"],
+    }
+
+
+def best_sets_by_reps(sets: Optional[Iterable[dict]]) -> Dict[int, Tuple[float, float]]:
+    """Maior peso (kg) por número de repetições numa lista de séries: {reps: (peso, 1RM estimado)}."""
+    best = {}
+    for set_data in sets or []:
+        weight = set_weight_kg(set_data)
+        reps = int(set_data.get("reps") or 0)
+        if reps <= 0 or weight <= 0:
+            continue
+        if reps not in best or weight > best[reps][0]:
+            best[reps] = (weight, estimate_1rm(weight, reps))
+    return best
+
+
+async def lock_user_aggregates(db: AsyncSession, user_id: uuid.UUID) -> None:
+    """
+    Serializa as atualizações de agregados de um usuário até o fim da transação.
+
+    Os agregados são recalculados com SELECT + DELETE + INSERT; sem o lock, duas escritas
+    concorrentes do mesmo usuário (ex.: um POST /bulk e um POST avulso do mesmo dia) podiam
+    violar a chave primária ou gravar um total lido antes do commit da outra. Em READ COMMITTED
+    cada consulta feita depois do lock enxerga o que a transação anterior gravou. No SQLite as
+    escritas já são serializadas pelo lock do próprio banco.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return
+    await db.execute(select(func.pg_advisory_xact_lock(AGGREGATES_LOCK_NAMESPACE, func.hashtext(str(user_id)))))
+
+
+async def refresh_exercise_daily_stats(db: AsyncSession, user_id: uuid.UUID, keys: Set[LogKey]) -> None:
+    """Recalcula as linhas de exercise_daily_stats das chaves afetadas a partir das colunas derivadas dos logs do dia."""
+    log = models_log.ExerciseLog
+    rows = (await db.execute(
+        select(
+            log.exercise_id,
+            log.log_date,
+            func.count().label("log_count"),
+            func.sum(log.set_count).label("set_count"),
+            func.sum(log.total_volume_kg).label("total_volume"),
+            func.max(log.top_weight_kg).label("top_set_weight"),
+            func.max(log.estimated_1rm_kg).label("estimated_1rm"),
+        )\
+            .where(log.user_id == user_id)\
+            .where(tuple_(log.exercise_id, log.log_date).in_(keys))\
+            .group_by(log.exercise_id, log.log_date)
+    )).all()
+
+    await db.execute(
+        delete(models_stat.ExerciseDailyStat)\
+            .where(models_stat.ExerciseDailyStat.user_id == user_id)\
+            .where(tuple_(models_stat.ExerciseDailyStat.exercise_id, models_stat.ExerciseDailyStat.stat_date).in_(keys))
+    )
+    if rows:
+        await db.execute(insert(models_stat.ExerciseDailyStat), [
+            {
+                "user_id": user_id,
+                "exercise_id": row.exercise_id,
+                "stat_date": row.log_date,
+                "log_count": row.log_count,
+                "set_count": row.set_count,
+                "total_volume": row.total_volume,
+                "top_set_weight": row.top_set_weight,
+                "estimated_1rm": row.estimated_1rm,
+            }
+            for row in rows
+        ])
+
+
+async def refresh_daily_activity(db: AsyncSession, user_id: uuid.UUID, dates: Set[date]) -> None:
+    """
+    Recalcula daily_activity dos dias afetados. Somas vêm de exercise_daily_stats (já atualizada
+    nesta transação); sessões são os blocos de treino distintos com log no dia.
+    """
+    stat = models_stat.ExerciseDailyStat
+    totals = (await db.execute(
+        select(
+            stat.stat_date,
+            func.count().label("exercise_count"),
+            func.sum(stat.log_count).label("log_count"),
+            func.sum(stat.set_count).label("set_count"),
+            func.sum(stat.total_volume).label("total_volume"),
+        )\
+            .where(stat.user_id == user_id)\
+            .where(stat.stat_date.in_(dates))\
+            .group_by(stat.stat_date)
+    )).all()
+    sessions = dict((await db.execute(
+        select(models_log.ExerciseLog.log_date, func.count(models_log.ExerciseLog.training_block_id.distinct()))\
+            .where(models_log.ExerciseLog.user_id == user_id)\
+            .where(models_log.ExerciseLog.log_date.in_(dates))\
+            .group_by(models_log.ExerciseLog.log_date)
+    )).all())
+
+    await db.execute(
+        delete(models_activity.DailyActivity)\
+            .where(models_activity.DailyActivity.user_id == user_id)\
+            .where(models_activity.DailyActivity.activity_date.in_(dates))
+    )
+    if totals:
+        await db.execute(insert(models_activity.DailyActivity), [
+            {
+                "user_id": user_id,
+                "activity_date": row.stat_date,
+                "session_count": sessions.get(row.stat_date, 0),
+                "exercise_count": row.exercise_count,
+                "log_count": row.log_count,
+                "set_count": row.set_count,
+                "total_volume": row.total_volume,
+            }
+            for row in totals
+        ])
+
+
+async def _replace_personal_records(db: AsyncSession, user_id: uuid.UUID, delete_clause, records: dict) -> None:
+    await db.execute(
+        delete(models_record.PersonalRecord)\
+            .where(models_record.PersonalRecord.user_id == user_id)\
+            .where(delete_clause)
+    )
+    if records:
+        await db.execute(insert(models_record.PersonalRecord), [
+            {"user_id": user_id, "exercise_id": exercise_id, "reps": reps, **values}
+            for (exercise_id, reps), values in records.items()
+        ])
+
+
+async def _upsert_improved_records(db: AsyncSession, user_id: uuid.UUID, records: dict) -> None:
+    """
+    Grava recordes melhores que os atuais com INSERT ... ON CONFLICT DO UPDATE, trocando a linha
+    só se o peso novo for maior (ou igual e mais antigo, o mesmo desempate do recálculo): mesmo
+    que duas transações comparem com o mesmo recorde antigo, o que fica é o maior, e não o do
+    último commit.
+    """
+    record = models_record.PersonalRecord
+    dialect_insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    now = datetime.now()
+    statement = dialect_insert(record).values([
+        {"user_id": user_id, "exercise_id": exercise_id, "reps": reps, **values, "updated_at": now}
+        for (exercise_id, reps), values in records.items()
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[record.user_id, record.exercise_id, record.reps],
+        set_={
+            "weight_kg": statement.excluded.weight_kg,
+            "estimated_1rm": statement.excluded.estimated_1rm,
+            "achieved_on": statement.excluded.achieved_on,
+            "exercise_log_id": statement.excluded.exercise_log_id,
+            "updated_at": statement.excluded.updated_at,
+        },
+        where=or_(
+            statement.excluded.weight_kg > record.weight_kg,
+            and_(statement.excluded.weight_kg == record.weight_kg, statement.excluded.achieved_on < record.achieved_on),
+        ),
+    )
+    await db.execute(statement)
+
+
+async def _recompute_personal_records(db: AsyncSession, user_id: uuid.UUID, exercise_ids: Set[uuid.UUID]) -> None:
+    """Refaz os recordes dos exercícios a partir de todos os logs do usuário (empate: o mais antigo)."""
+    rows = (await db.execute(
+        select(models_log.ExerciseLog.id, models_log.ExerciseLog.exercise_id, models_log.ExerciseLog.log_date, models_log.ExerciseLog.sets_reps_data)\
+            .where(models_log.ExerciseLog.user_id == user_id)\
+            .where(models_log.ExerciseLog.exercise_id.in_(exercise_ids))\
+            .order_by(models_log.ExerciseLog.log_date, models_log.ExerciseLog.created_at)
+    )).all()
+
+    records = {}
+    for log_id, exercise_id, log_date, sets_reps_data in rows:
+        for reps, (weight, one_rep_max) in best_sets_by_reps(sets_reps_data).items():
+            current = records.get((exercise_id, reps))
+            if current is None or weight > current["weight_kg"]:
+                records[(exercise_id, reps)] = {
+                    "weight_kg": weight, "estimated_1rm": one_rep_max,
+                    "achieved_on": log_date, "exercise_log_id": log_id,
+                }
+    await _replace_personal_records(db, user_id, models_record.PersonalRecord.exercise_id.in_(exercise_ids), records)
+
+
+async def refresh_personal_records(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    exercise_ids: Set[uuid.UUID],
+    changed_log_ids: Optional[Set[uuid.UUID]] = None,
+) -> None:
+    """
+    Mantém personal_records para os exercícios afetados.
+
+    Logs novos ou editados só podem melhorar um recorde, então são comparados com as linhas
+    atuais e gravados por upsert condicional ao peso. Se o log que detém um recorde foi editado ou apagado (exercise_log_id NULL pelo
+    ON DELETE SET NULL), o exercício é recalculado a partir de todos os logs.
+    """
+    current = (await db.execute(
+        select(
+            models_record.PersonalRecord.exercise_id,
+            models_record.PersonalRecord.reps,
+            models_record.PersonalRecord.weight_kg,
+            models_record.PersonalRecord.exercise_log_id,
+            models_record.PersonalRecord.achieved_on,
+        )\
+            .where(models_record.PersonalRecord.user_id == user_id)\
+            .where(models_record.PersonalRecord.exercise_id.in_(exercise_ids))
+    )).all()
+
+    if changed_log_ids is None:
+        full_recompute = set(exercise_ids)
+    else:
+        full_recompute = {
+            exercise_id for exercise_id, _, _, holder_log_id, _ in current
+            if holder_log_id is None or holder_log_id in changed_log_ids
+        }
+    if full_recompute:
+        await _recompute_personal_records(db, user_id, full_recompute)
+
+    incremental = set(exercise_ids) - full_recompute
+    if not incremental or not changed_log_ids:
+        return
+
+    best = {
+        (exercise_id, reps): (weight, achieved_on)
+        for exercise_id, reps, weight, _, achieved_on in current if exercise_id in incremental
+    }
+    rows = (await db.execute(
+        select(models_log.ExerciseLog.id, models_log.ExerciseLog.exercise_id, models_log.ExerciseLog.log_date, models_log.ExerciseLog.sets_reps_data)\
+            .where(models_log.ExerciseLog.user_id == user_id)\
+            .where(models_log.ExerciseLog.id.in_(changed_log_ids))\
+            .where(models_log.ExerciseLog.exercise_id.in_(incremental))
+    )).all()
+
+    improved = {}
+    for log_id, exercise_id, log_date, sets_reps_data in rows:
+        for reps, (weight, one_rep_max) in best_sets_by_reps(sets_reps_data).items():
+            key = (exercise_id, reps)
+            best_weight, best_date = best.get(key, (0.0, None))
+            if weight > best_weight or (weight == best_weight and log_date < best_date):
+                best[key] = (weight, log_date)
+                improved[key] = {
+                    "weight_kg": weight, "estimated_1rm": one_rep_max,
+                    "achieved_on": log_date, "exercise_log_id": log_id,
+                }
+    if improved:
+        await _upsert_improved_records(db, user_id, improved)
+
+
+async def refresh_log_aggregates(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    keys: Iterable[LogKey],
+    changed_log_ids: Optional[Iterable[uuid.UUID]] = None,
+) -> None:
+    """
+    Atualiza todos os agregados derivados de exercise_logs para as chaves (exercise_id, log_date) afetadas.
+
+    `changed_log_ids` são os logs criados, editados ou apagados pela escrita; None quando não
+    se sabe (backfill), o que força o recálculo completo dos recordes dos exercícios afetados.
+    Deve ser chamada depois do flush e antes do commit da escrita, para que os agregados
+    façam parte da mesma transação; o lock por usuário (lock_user_aggregates) vale até o commit.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    await lock_user_aggregates(db, user_id)
+    await refresh_exercise_daily_stats(db, user_id, keys)
+    await refresh_daily_activity(db, user_id, {log_date for _, log_date in keys})
+    await refresh_personal_records(
+        db, user_id, {exercise_id for exercise_id, _ in keys},
+        set(changed_log_ids) if changed_log_ids is not None else None,
+    )
+
+
+async def rebuild_user_aggregates(db: AsyncSession, user_id: uuid.UUID) -> None:
+    """Reconstrói todos os agregados de um usuário (backfill)."""
+    keys = (await db.execute(
+        select(models_log.ExerciseLog.exercise_id, models_log.ExerciseLog.log_date)\
+            .where(models_log.ExerciseLog.user_id == user_id)\
+            .distinct()
+    )).all()
+    await refresh_log_aggregates(db, user_id, [tuple(key) for key in keys])
+
+
+async def _rebuild_all() -> None:
+    from database import AsyncSessionLocal
+    from models import user as models_user
+
+    async with AsyncSessionLocal() as db:
+        user_ids = (await db.scalars(select(models_user.User.id))).all()
+    for user_id in user_ids:
+        async with AsyncSessionLocal() as db:
+            await rebuild_user_aggregates(db, user_id)
+            await db.commit()
+
+
+if __name__ == "__main__":
+    # Backfill dos agregados para dados existentes: python aggregates.py
+    import asyncio
+    asyncio.run(_rebuild_all())
@@ -0,0 +1,128 @@
+# auth_cache.py
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from dotenv import load_dotenv
+load_dotenv()
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Snapshot imutável do usuário autenticado, seguro para compartilhar entre requisições."""
+    id: uuid.UUID
+    username: str
+    email: str
+    is_active: bool
+    profile_picture_url: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, user) -> "AuthenticatedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_active=user.is_active,
+            profile_picture_url=user.profile_picture_url,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class PrincipalCache:
+    """Cache LRU com TTL de token JWT -> snapshot do usuário autenticado."""
+
+    def __init__(self, ttl_seconds: float = AUTH_CACHE_TTL_SECONDS, max_entries: int = AUTH_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str):
+        """Retorna o snapshot do usuário para o token, ou None se ausente/expirado."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, token_exp, user_key, snapshot = entry
+            if now >= expires_at or (token_exp is not None and time.time() >= token_exp):
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return snapshot
+
+    def set(self, token: str, snapshot, token_exp: Optional[float] = None) -> None:
+        """Armazena o snapshot; a entrada nunca sobrevive à expiração do próprio token."""
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        user_key = str(snapshot.id)
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (time.monotonic() + self.ttl_seconds, token_exp, user_key, snapshot)
+            self._tokens_by_user.setdefault(user_key, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id) -> None:
+        """Descarta todos os tokens em cache de um usuário (ex.: após PUT /auth/me)."""
+        with self._lock:
+            tokens = self._tokens_by_user.pop(str(user_id), set())
+            for token in tokens:
+                self._entries.pop(token, None)
+            if tokens:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_key = entry[2]
+        tokens = self._tokens_by_user.get(user_key)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_key]
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,314 @@
+# benchmarks/run.py
+"""
+Exercita todos os routers com clientes concorrentes e mede latência, vazão e consultas SQL.
+
+Uso (a partir da pasta backend, depois de rodar benchmarks.seed no mesmo DATABASE_URL):
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.run
+    DATABASE_URL=postgresql://... python -m benchmarks.run --concurrency 32 --requests 400
+    python -m benchmarks.run --update-baseline          # grava os resultados como novo baseline
+
+Por padrão a API roda no mesmo processo (httpx.ASGITransport), o que permite contar as
+consultas SQL de cada requisição. Com --base-url o alvo é um servidor externo e a contagem
+de consultas não está disponível.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import event
+
+from database import async_engine, async_read_engine, dispose_engines
+from benchmarks.seed import BENCH_PASSWORD
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Regressão sinalizada no relatório quando o p95 piora mais que isto em relação ao baseline.
+REGRESSION_THRESHOLD = 0.10
+
+_query_counter: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("bench_query_counter", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[["UserContext", random.Random], str]
+    body: Optional[Callable[["UserContext", random.Random], dict]] = None
+    # Endpoints que dependem de recursos exclusivos do PostgreSQL (LATERAL, pg_trgm, date_trunc).
+    postgres_only: bool = False
+    stream: bool = False
+
+
+@dataclass
+class UserContext:
+    username: str
+    headers: Dict[str, str]
+    block_ids: List[str] = field(default_factory=list)
+    tbe_ids_by_block: Dict[str, List[str]] = field(default_factory=dict)
+    exercise_ids: List[str] = field(default_factory=list)
+    log_ids: List[str] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def _log_payload(ctx: UserContext, rng: random.Random) -> dict:
+    block_id = rng.choice(ctx.block_ids)
+    return {
+        "training_block_id": block_id,
+        "exercise_id": rng.choice(ctx.exercise_ids),
+        "log_date": (date.today() - timedelta(days=rng.randint(0, 30))).isoformat(),
+        "sets_reps_data": [
+            {"set": number, "reps": rng.randint(5, 12), "weight": rng.choice([20, 40, 60, 80]), "unit": "kg"}
+            for number in range(1, 4)
+        ],
+    }
+
+
+def _reorder_payload(ctx: UserContext, rng: random.Random) -> dict:
+    block_id = ctx.block_ids[0]
+    ordered = list(ctx.tbe_ids_by_block[block_id])
+    rng.shuffle(ordered)
+    return {"ordered_ids": ordered}
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("auth.me", "GET", lambda ctx, rng: "/auth/me"),
+    Scenario("auth.update_me", "PUT", lambda ctx, rng: "/auth/me", lambda ctx, rng: {"email": f"{ctx.username}@example.com"}),
+    Scenario("exercises.list", "GET", lambda ctx, rng: "/exercises/"),
+    Scenario("exercises.get", "GET", lambda ctx, rng: f"/exercises/{rng.choice(ctx.exercise_ids)}"),
+    Scenario("exercises.search", "GET", lambda ctx, rng: f"/exercises/?search={rng.choice(['supino', 'agachamnto', 'rosca', 'remada'])}", postgres_only=True),
+    Scenario("exercises.autocomplete", "GET", lambda ctx, rng: f"/exercises/autocomplete?q={rng.choice(['sup', 'ag', 'ros', 'rem'])}"),
+    Scenario("exercises.by_training_block", "GET", lambda ctx, rng: f"/exercises/by_training_block/{rng.choice(ctx.block_ids)}"),
+    Scenario("training_blocks.list", "GET", lambda ctx, rng: "/training_blocks/"),
+    Scenario("training_blocks.get", "GET", lambda ctx, rng: f"/training_blocks/{rng.choice(ctx.block_ids)}"),
+    Scenario("training_blocks.workout", "GET", lambda ctx, rng: f"/training_blocks/{rng.choice(ctx.block_ids)}/workout", postgres_only=True),
+    Scenario("training_blocks.create", "POST", lambda ctx, rng: "/training_blocks/", lambda ctx, rng: {"title": f"bench {rng.random():.6f}"}),
+    Scenario("training_blocks.update", "PUT", lambda ctx, rng: f"/training_blocks/{rng.choice(ctx.block_ids)}", lambda ctx, rng: {"description": f"bench {rng.random():.6f}"}),
+    Scenario("training_block_exercises.by_block", "GET", lambda ctx, rng: f"/training_block_exercises/by_block/{rng.choice(ctx.block_ids)}"),
+    Scenario("training_block_exercises.reorder", "PUT", lambda ctx, rng: f"/training_block_exercises/by_block/{ctx.block_ids[0]}/order", _reorder_payload),
+    Scenario("exercise_logs.list", "GET", lambda ctx, rng: "/exercise_logs/?limit=50"),
+    Scenario("exercise_logs.list_compact", "GET", lambda ctx, rng: "/exercise_logs/?limit=50&view=compact"),
+    Scenario("exercise_logs.list_deep_page", "GET", lambda ctx, rng: f"/exercise_logs/?limit=50&cursor={ctx.next_cursor}" if ctx.next_cursor else "/exercise_logs/?limit=50&skip=1000"),
+    Scenario("exercise_logs.list_range", "GET", lambda ctx, rng: f"/exercise_logs/?from={(date.today() - timedelta(days=90)).isoformat()}&to={date.today().isoformat()}"),
+    Scenario("exercise_logs.list_heavy", "GET", lambda ctx, rng: "/exercise_logs/?limit=50&min_top_weight_kg=100"),
+    Scenario("exercise_logs.calendar", "GET", lambda ctx, rng: f"/exercise_logs/calendar?year={date.today().year}"),
+    Scenario("exercise_logs.get", "GET", lambda ctx, rng: f"/exercise_logs/{rng.choice(ctx.log_ids)}"),
+    Scenario("exercise_logs.create", "POST", lambda ctx, rng: "/exercise_logs/", _log_payload),
+    Scenario("exercise_logs.bulk", "POST", lambda ctx, rng: "/exercise_logs/bulk", lambda ctx, rng: {"logs": [_log_payload(ctx, rng) for _ in range(10)]}),
+    Scenario("exercise_logs.update", "PUT", lambda ctx, rng: f"/exercise_logs/{rng.choice(ctx.log_ids)}", lambda ctx, rng: {"notes": f"bench {rng.random():.6f}"}),
+    Scenario("exercise_logs.update_date", "PUT", lambda ctx, rng: f"/exercise_logs/{rng.choice(ctx.log_ids)}", lambda ctx, rng: {"log_date": (date.today() - timedelta(days=rng.randint(0, 30))).isoformat()}),
+    Scenario("exercise_logs.export", "GET", lambda ctx, rng: "/exercise_logs/export?format=ndjson", stream=True),
+    Scenario("analytics.progress", "GET", lambda ctx, rng: f"/analytics/exercises/{rng.choice(ctx.exercise_ids)}/progress?bucket=week", postgres_only=True),
+    Scenario("records.list", "GET", lambda ctx, rng: "/records/"),
+    Scenario("sync.delta", "GET", lambda ctx, rng: f"/sync/?since={(datetime.now() - timedelta(days=1)).isoformat()}"),
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # Nearest-rank: o menor valor com pelo menos pct% das amostras até ele.
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _login(client: httpx.AsyncClient, username: str) -> UserContext:
+    response = await client.post("/auth/token", data={"username": username, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    ctx = UserContext(username=username, headers=headers)
+
+    blocks = (await client.get("/training_blocks/", headers=headers)).json()
+    ctx.block_ids = [block["id"] for block in blocks]
+    for block_id in ctx.block_ids:
+        links = (await client.get(f"/training_block_exercises/by_block/{block_id}", headers=headers)).json()
+        ctx.tbe_ids_by_block[block_id] = [link["id"] for link in links]
+    exercise_ids = set()
+    for block_id in ctx.block_ids:
+        exercises = (await client.get(f"/exercises/by_training_block/{block_id}", headers=headers)).json()
+        exercise_ids.update(exercise["id"] for exercise in exercises)
+    ctx.exercise_ids = sorted(exercise_ids)
+    page = await client.get("/exercise_logs/?limit=200", headers=headers)
+    ctx.log_ids = [log["id"] for log in page.json()]
+    ctx.next_cursor = page.headers.get("x-next-cursor")
+    return ctx
+
+
+async def _run_scenario(client, scenario: Scenario, users: List[UserContext], total_requests: int, concurrency: int, seed: int, count_queries: bool) -> dict:
+    rng = random.Random(f"{seed}:{scenario.name}")
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    status_counts: Dict[int, int] = {}
+    remaining = iter(range(total_requests))
+
+    async def worker(worker_index: int):
+        nonlocal errors
+        for request_index in remaining:
+            ctx = users[(worker_index + request_index) % len(users)]
+            path = scenario.path(ctx, rng)
+            body = scenario.body(ctx, rng) if scenario.body else None
+            counter = [0]
+            token = _query_counter.set(counter if count_queries else None)
+            started = time.perf_counter()
+            try:
+                if scenario.stream:
+                    async with client.stream(scenario.method, path, headers=ctx.headers) as response:
+                        async for _ in response.aiter_bytes():
+                            pass
+                else:
+                    response = await client.request(scenario.method, path, headers=ctx.headers, json=body)
+                status_code = response.status_code
+            except httpx.HTTPError:
+                status_code = 0
+            finally:
+                elapsed = time.perf_counter() - started
+                _query_counter.reset(token)
+            latencies.append(elapsed * 1000.0)
+            queries.append(counter[0])
+            status_counts[status_code] = status_counts.get(status_code, 0) + 1
+            if status_code == 0 or status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    wall_time = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": {str(code): count for code, count in sorted(status_counts.items())},
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / wall_time, 2) if wall_time > 0 else 0.0,
+        "queries_per_request": round(statistics.fmean(queries), 2) if (count_queries and queries) else None,
+    }
+
+
+def _print_report(results: Dict[str, dict], baseline: Optional[dict]) -> List[str]:
+    header = f"{'endpoint':<36} {'n':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rps':>9} {'q/req':>6} {'Δp95':>8}"
+    print(header)
+    print("-" * len(header))
+    regressions = []
+    baseline_results = (baseline or {}).get("results", {})
+    for name, result in results.items():
+        delta = ""
+        previous = baseline_results.get(name)
+        if previous and previous.get("p95_ms"):
+            change = (result["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"]
+            delta = f"{change:+.0%}"
+            if change > REGRESSION_THRESHOLD:
+                regressions.append(name)
+            if (result["queries_per_request"] or 0) > (previous.get("queries_per_request") or 0) and previous.get("queries_per_request") is not None:
+                regressions.append(f"{name} (queries)")
+        queries = "-" if result["queries_per_request"] is None else f"{result['queries_per_request']:.1f}"
+        print(
+            f"{name:<36} {result['requests']:>6} {result['errors']:>5} "
+            f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} "
+            f"{result['throughput_rps']:>9.1f} {queries:>6} {delta:>8}"
+        )
+    return regressions
+
+
+async def run(args) -> int:
+    count_queries = args.base_url is None
+    if count_queries:
+        from main import app
+        for target in {async_engine.sync_engine, async_read_engine.sync_engine}:
+            event.listen(target, "before_cursor_execute", _count_query)
+        transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 0))
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0)
+    else:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60.0)
+
+    is_postgres = async_engine.dialect.name == "postgresql"
+    async with client:
+        users = [await _login(client, f"bench_user_{index}") for index in range(args.users)]
+        users = [ctx for ctx in users if ctx.block_ids and ctx.log_ids]
+        if not users:
+            print("Nenhum usuário de benchmark com dados: rode `python -m benchmarks.seed` antes.")
+            return 2
+
+        results = {}
+        for scenario in SCENARIOS:
+            if args.only and not any(scenario.name.startswith(prefix) for prefix in args.only):
+                continue
+            if scenario.postgres_only and not is_postgres and args.base_url is None:
+                print(f"(pulando {scenario.name}: requer PostgreSQL)")
+                continue
+            requests = max(1, args.requests // 10) if scenario.stream else args.requests
+            results[scenario.name] = await _run_scenario(
+                client, scenario, users, requests, args.concurrency, args.seed, count_queries
+            )
+
+    if count_queries:
+        for target in {async_engine.sync_engine, async_read_engine.sync_engine}:
+            event.remove(target, "before_cursor_execute", _count_query)
+        await dispose_engines()
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    regressions = _print_report(results, baseline)
+    report = {
+        "database": async_engine.dialect.name if args.base_url is None else "remote",
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "requests_per_endpoint": args.requests,
+        "python": platform.python_version(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print(f"Baseline gravado em {args.baseline}")
+    elif baseline is None:
+        print(f"Sem baseline em {args.baseline}; use --update-baseline para gravar um.")
+
+    if regressions:
+        print("Regressões em relação ao baseline: " + ", ".join(regressions))
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga da Gym Notes API.")
+    parser.add_argument("--users", type=int, default=10, help="usuários semeados usados como clientes")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requisições por endpoint")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-url", default=None, help="servidor externo (desativa a contagem de consultas)")
+    parser.add_argument("--only", nargs="*", help="prefixos de cenários a executar, ex.: exercise_logs")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--output", default=None, help="grava o relatório completo em JSON")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# catalog_cache.py
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models import exercise as models_exercise
+from schemas import exercise as schemas_exercise
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# Rede de segurança para escritas feitas por outros workers, que não incrementam a versão local.
+EXERCISE_CACHE_TTL_SECONDS = float(os.getenv("EXERCISE_CACHE_TTL_SECONDS", "30"))
+MAX_CACHED_PAGES = 256
+
+
+def make_etag(body: bytes) -> str:
+    """ETag forte derivado do conteúdo exato da resposta."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def cached_json_response(request: Request, body: bytes, etag: str, headers: Optional[dict] = None) -> Response:
+    """Resposta JSON pré-serializada, ou 304 se o cliente já tem esta versão."""
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class ExerciseCatalogCache:
+    """Catálogo de exercícios em memória, com corpos JSON e ETags já calculados."""
+
+    def __init__(self, ttl_seconds: float = EXERCISE_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self._items: List[Tuple[str, bytes]] = []
+        self._by_id: Dict[str, Tuple[bytes, str]] = {}
+        self._list_bodies: Dict[Tuple[int, int], Tuple[bytes, str]] = {}
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def invalidate(self) -> None:
+        """Incrementa a versão; a próxima leitura recarrega o catálogo."""
+        self.version += 1
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_version == self.version and (time.monotonic() - self._loaded_at) < self.ttl_seconds
+
+    async def _ensure_loaded(self, db: AsyncSession) -> None:
+        if self._is_fresh():
+            self.hits += 1
+            return
+        async with self._lock:
+            if self._is_fresh():
+                self.hits += 1
+                return
+            self.misses += 1
+            version = self.version
+            # Sempre pelo primário: uma réplica atrasada logo após invalidate() deixaria o
+            # catálogo antigo em cache por todo o TTL.
+            async with AsyncSessionLocal() as primary_db:
+                exercises = (await primary_db.scalars(
+                    select(models_exercise.Exercise).order_by(models_exercise.Exercise.name)
+                )).all()
+            items = []
+            by_id = {}
+            for exercise in exercises:
+                body = schemas_exercise.ExerciseInDB.model_validate(exercise).model_dump_json().encode()
+                items.append((str(exercise.id), body))
+                by_id[str(exercise.id)] = (body, make_etag(body))
+            self._items = items
+            self._by_id = by_id
+            self._list_bodies = {}
+            self._loaded_version = version
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    async def get_list(self, db: AsyncSession, skip: int, limit: int) -> Tuple[bytes, str]:
+        await self._ensure_loaded(db)
+        key = (skip, limit)
+        cached = self._list_bodies.get(key)
+        if cached is None:
+            if len(self._list_bodies) >= MAX_CACHED_PAGES:
+                self._list_bodies.clear()
+            body = b"[" + b",".join(body for _, body in self._items[skip:skip + limit]) + b"]"
+            cached = (body, make_etag(body))
+            self._list_bodies[key] = cached
+        return cached
+
+    async def get_item(self, db: AsyncSession, exercise_id: uuid.UUID) -> Optional[Tuple[bytes, str]]:
+        key = str(exercise_id)
+        await self._ensure_loaded(db)
+        entry = self._by_id.get(key)
+        if entry is None:
+            # Pode ter sido criado por outro worker desde a última carga: confirma pela PK.
+            exists = await db.scalar(select(models_exercise.Exercise.id).where(models_exercise.Exercise.id == exercise_id))
+            if exists is not None:
+                self.invalidate()
+                await self._ensure_loaded(db)
+                entry = self._by_id.get(key)
+        return entry
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "reloads": self.reloads,
+        }
+
+
+exercise_catalog = ExerciseCatalogCache()
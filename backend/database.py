@@ -1,27 +1,304 @@
 # 200.19.1.18 if outside of ifsul / postgres.gravatai.ifsul.edu.br if inside ifsul
-from sqlalchemy import create_engine
+import asyncio
+import time
+
+from sqlalchemy import DateTime, create_engine, event, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 from dotenv import load_dotenv
 
+import metrics
+
 load_dotenv()
 
-DATABASE_URL = (
+# DATABASE_URL completo tem precedência (ex.: sqlite:///bench.db no benchmark).
+DATABASE_URL = os.getenv("DATABASE_URL") or (
     f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
     f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
 )
+# Réplica somente leitura (opcional): mesmas credenciais, outro host, ou uma URL completa.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL") or (
+    f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+    f"@{os.getenv('DB_REPLICA_HOST')}:{os.getenv('DB_REPLICA_PORT') or os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+    if os.getenv("DB_REPLICA_HOST") else None
+)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Conexões mais velhas que isto são recicladas no checkout; cobre quedas de conexão ociosa
+# sem o round-trip extra do pre_ping, que fica desligado por padrão.
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "2"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5"))
+# Identifica as conexões da API em pg_stat_activity (o watermark do GET /sync só olha estas).
+DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "gym_notes_api")
+
+
+def to_async_url(url: str) -> str:
+    """Troca o driver síncrono pelo equivalente assíncrono (asyncpg / aiosqlite)."""
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
 
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+# Engine síncrono: usado apenas para DDL/scripts fora do loop de eventos.
 engine = create_engine(
         DATABASE_URL,
-        pool_pre_ping=True
+        pool_pre_ping=DB_POOL_PRE_PING
     )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Pool que mede quanto cada checkout esperou por uma conexão livre."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.db_pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def _pool_options(async_url: str) -> dict:
+    # SQLite em memória exige o StaticPool padrão do dialeto, que não aceita dimensionamento.
+    if ":memory:" in async_url:
+        return {"pool_pre_ping": DB_POOL_PRE_PING}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def _connect_args(async_url: str, **server_settings: str) -> dict:
+    """Parâmetros de sessão do PostgreSQL (asyncpg), sempre com o application_name da API."""
+    if not async_url.startswith("postgresql+asyncpg://"):
+        return {}
+    return {"server_settings": {"application_name": DB_APPLICATION_NAME, **server_settings}}
+
+
+def _instrument_statements(target_engine) -> None:
+    """Liga os eventos que alimentam as métricas de SQL por requisição (metrics.py)."""
+
+    @event.listens_for(target_engine, "before_cursor_execute")
+    def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(target_engine, "after_cursor_execute")
+    def _record_statement(conn, cursor, statement, parameters, context, executemany):
+        started_at = conn.info["statement_started_at"].pop()
+        metrics.record_statement(statement, time.perf_counter() - started_at)
+
+    @event.listens_for(target_engine, "handle_error")
+    def _discard_statement_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("statement_started_at"):
+            connection.info["statement_started_at"].pop()
+
+
+def _enable_sqlite_foreign_keys(target_engine) -> None:
+    """O SQLite só aplica FOREIGN KEY (e ON DELETE CASCADE) com o pragma ligado em cada conexão."""
+    if target_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(target_engine, "connect")
+    def _set_foreign_keys_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+_enable_sqlite_foreign_keys(engine)
+
+# Engine assíncrono (asyncpg): usado por todos os routers.
+async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args=_connect_args(ASYNC_DATABASE_URL),
+        **_pool_options(ASYNC_DATABASE_URL)
+    )
+_instrument_statements(async_engine.sync_engine)
+_enable_sqlite_foreign_keys(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+# Engine de leitura: a réplica, se configurada; senão o próprio primário.
+if REPLICA_DATABASE_URL:
+    ASYNC_REPLICA_DATABASE_URL = to_async_url(REPLICA_DATABASE_URL)
+    async_read_engine = create_async_engine(
+            ASYNC_REPLICA_DATABASE_URL,
+            # Garante no servidor que nada escrito por engano vá para a réplica.
+            connect_args=_connect_args(ASYNC_REPLICA_DATABASE_URL, default_transaction_read_only="on"),
+            **_pool_options(ASYNC_REPLICA_DATABASE_URL)
+        )
+    _instrument_statements(async_read_engine.sync_engine)
+    _enable_sqlite_foreign_keys(async_read_engine.sync_engine)
+else:
+    async_read_engine = async_engine
+
+AsyncReadSessionLocal = async_sessionmaker(
+        bind=async_read_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal() 
-    try:
-        yield db 
-    finally:
-        db.close() 
\ No newline at end of file
+class db_now(FunctionElement):
+    """
+    Hora do banco, para carimbos que o GET /sync compara (updated_at dos dados sincronizados,
+    deleted_at dos tombstones): um relógio só, em vez do de cada worker da API. No PostgreSQL
+    é now(), o início da transação que escreve.
+    """
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(db_now)
+def _compile_db_now(element, compiler, **kw):
+    return "now()"
+
+
+@compiles(db_now, "sqlite")
+def _compile_db_now_sqlite(element, compiler, **kw):
+    # Hora local com fração, no mesmo formato texto que o SQLAlchemy grava no SQLite (microssegundos,
+    # seis dígitos): assim um carimbo lido e devolvido como parâmetro compara igual ao gravado.
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime') || '000'"
+
+
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaHealth:
+    """
+    Atraso de replicação medido no máximo a cada REPLICA_LAG_CHECK_SECONDS.
+
+    Enquanto o atraso passar de REPLICA_MAX_LAG_SECONDS (ou a réplica não responder), as
+    leituras voltam para o primário.
+    """
+
+    def __init__(self, read_engine, max_lag_seconds: float, check_interval_seconds: float):
+        self.read_engine = read_engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lag_seconds = None
+        self.healthy = True
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+        self.check_failures = 0
+
+    def _is_stale(self) -> bool:
+        return (time.monotonic() - self._checked_at) >= self.check_interval_seconds
+
+    async def _check(self) -> None:
+        try:
+            async with self.read_engine.connect() as connection:
+                if self.read_engine.dialect.name == "postgresql":
+                    lag = float(await connection.scalar(REPLICA_LAG_QUERY))
+                else:
+                    lag = 0.0
+            self.lag_seconds = lag
+            self.healthy = lag <= self.max_lag_seconds
+        except Exception:
+            self.check_failures += 1
+            self.lag_seconds = None
+            self.healthy = False
+        self._checked_at = time.monotonic()
+
+    async def use_replica(self) -> bool:
+        if self._is_stale():
+            async with self._lock:
+                if self._is_stale():
+                    await self._check()
+        if self.healthy:
+            self.replica_reads += 1
+        else:
+            self.primary_fallbacks += 1
+        return self.healthy
+
+    def stats(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+            "check_failures": self.check_failures,
+        }
+
+
+replica_health = ReplicaHealth(async_read_engine, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_SECONDS)
+
+
+def _pool_status(target_engine) -> dict:
+    pool = target_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": DB_MAX_OVERFLOW,
+    }
+
+
+def pool_stats() -> dict:
+    """Ocupação dos pools (primário e réplica) e estado do roteamento de leituras, em formato plano."""
+    stats = {f"primary_{key}": value for key, value in _pool_status(async_engine).items()}
+    if async_read_engine is not async_engine:
+        stats.update({f"replica_{key}": value for key, value in _pool_status(async_read_engine).items()})
+        stats.update({
+            f"replica_{key}": int(value) if isinstance(value, bool) else value
+            for key, value in replica_health.stats().items()
+        })
+    return stats
+
+
+async def dispose_engines() -> None:
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
+
+async def read_sessionmaker() -> async_sessionmaker:
+    """Fábrica de sessões para leituras: a réplica quando saudável, senão o primário."""
+    if async_read_engine is not async_engine and await replica_health.use_replica():
+        return AsyncReadSessionLocal
+    return AsyncSessionLocal
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db():
+    """Sessão para handlers GET que só leem; pode estar até REPLICA_MAX_LAG_SECONDS atrasada."""
+    session_factory = await read_sessionmaker()
+    async with session_factory() as db:
+        yield db
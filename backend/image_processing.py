@@ -0,0 +1,95 @@
+# image_processing.py
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow é opcional: sem ele, as miniaturas não são geradas.
+    Image = None
+    ImageOps = None
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+# Limite de pixels decodificados por imagem: um PNG de poucos KB pode declarar dimensões
+# gigantes e esgotar a memória do worker ao ser aberto (decompression bomb).
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", "40000000"))
+if IMAGE_MAX_PIXELS <= 0:
+    raise ValueError("IMAGE_MAX_PIXELS must be a positive number of pixels")
+if Image is not None:
+    # Acima disso o Pillow só emite um aviso (o erro vem no dobro); a checagem em
+    # _render_thumbnails recusa já no limite.
+    Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+THUMBNAIL_SIZES = (64, 256)
+THUMBNAIL_QUALITY = 80
+WEBP_QUALITY = 80
+
+_image_executor: Optional[ProcessPoolExecutor] = None
+
+
+def thumbnail_filename(stem: str, size: int, extension: str = "jpg") -> str:
+    return f"{stem}_{size}.{extension}"
+
+
+def _save_atomically(image, target: str, **save_options) -> None:
+    if os.path.exists(target):
+        return
+    tmp_target = target + ".tmp"
+    image.save(tmp_target, **save_options)
+    os.replace(tmp_target, target)
+
+
+def _render_thumbnails(source_path: str, directory: str, stem: str) -> Dict[int, str]:
+    """
+    Executado num processo do pool: gera as miniaturas quadradas de source_path.
+
+    Cada imagem (original e miniaturas) ganha também uma variante .webp ao lado, que o
+    CachedStaticFiles serve para clientes que enviam Accept: image/webp.
+    """
+    generated = {}
+    with Image.open(source_path) as original:
+        # open só lê o cabeçalho: as dimensões são conhecidas antes de decodificar os pixels.
+        width, height = original.size
+        if width * height > IMAGE_MAX_PIXELS:
+            raise Image.DecompressionBombError(
+                f"Image size ({width * height} pixels) exceeds limit of {IMAGE_MAX_PIXELS} pixels"
+            )
+        image = ImageOps.exif_transpose(original).convert("RGB")
+        if not source_path.lower().endswith((".webp", ".gif")):
+            _save_atomically(image, os.path.splitext(source_path)[0] + ".webp", format="WEBP", quality=WEBP_QUALITY)
+        for size in THUMBNAIL_SIZES:
+            filename = thumbnail_filename(stem, size)
+            target = os.path.join(directory, filename)
+            thumbnail = ImageOps.fit(image, (size, size), method=Image.LANCZOS)
+            _save_atomically(thumbnail, target, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+            _save_atomically(thumbnail, os.path.splitext(target)[0] + ".webp", format="WEBP", quality=WEBP_QUALITY)
+            generated[size] = filename
+    return generated
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _image_executor
+
+
+async def generate_thumbnails(source_path: str, directory: str, stem: str) -> Dict[int, str]:
+    """Gera as miniaturas fora do loop de eventos; retorna {tamanho: nome do arquivo}."""
+    if Image is None:
+        return {}
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_executor(), _render_thumbnails, source_path, directory, stem)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # Arquivo que não é uma imagem decodificável (ou grande demais para decodificar com
+        # segurança): mantém o original, sem miniaturas.
+        return {}
+
+
+def shutdown() -> None:
+    if _image_executor is not None:
+        _image_executor.shutdown(wait=False, cancel_futures=True)
@@ -1,22 +1,33 @@
 # app/main.py
 from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from typing import List
-from fastapi.staticfiles import StaticFiles
 
 from routers import exercises as exercises
 from routers import training_blocks as training_blocks_router
 from routers import training_block_exercises as tbe_router
 from routers import exercise_logs as exercise_logs_router
 from routers import auth as auth_router
+from routers import analytics as analytics_router
+from routers import records as records_router
+from routers import sync as sync_router
 
 import os
 
 import models
 
-from database import engine, Base
+from database import dispose_engines, pool_stats
+import image_processing
+import metrics
+from static_files import CachedStaticFiles
+from auth_cache import principal_cache
+from catalog_cache import exercise_catalog
+from security import password_hashing_stats
+from account_deletion import account_deletion_jobs
+from response_cache import response_cache
 
-Base.metadata.create_all(bind=engine)
+# O schema é versionado com Alembic (backend/migrations): rode `alembic upgrade head` no deploy.
 
 app = FastAPI(
     title="Gym Notes API",
@@ -29,7 +40,7 @@ app = FastAPI(
 UPLOAD_DIRECTORY = "static/profile_pics"
 os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -48,17 +59,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+metrics.register_stats_collector("principal_cache", principal_cache.stats)
+metrics.register_stats_collector("exercise_catalog_cache", exercise_catalog.stats)
+metrics.register_stats_collector("password_hashing", password_hashing_stats)
+metrics.register_stats_collector("db_pool", pool_stats)
+metrics.register_stats_collector("account_deletion", account_deletion_jobs.stats)
+metrics.register_stats_collector("response_cache", response_cache.stats)
 
 app.include_router(auth_router.router)
 app.include_router(training_blocks_router.router)
 app.include_router(tbe_router.router)
 app.include_router(exercises.router)
 app.include_router(exercise_logs_router.router)
+app.include_router(analytics_router.router)
+app.include_router(records_router.router)
+app.include_router(sync_router.router)
+
+
+@app.on_event("startup")
+async def resume_account_deletions():
+    # Jobs de exclusão interrompidos (worker caído ou reiniciado) são retomados por algum worker.
+    account_deletion_jobs.start_resumer()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await account_deletion_jobs.stop()
+    await dispose_engines()
+    image_processing.shutdown()
 
 
 @app.get("/")
 def read_root():
-    return {"message": "Bem-vindo à Gym Notes API! Acesse /documentation para ver os endpoints."}
\ No newline at end of file
+    return {"message": "Bem-vindo à Gym Notes API! Acesse /documentation para ver os endpoints."}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """Métricas no formato texto do Prometheus (latência por rota, SQL por requisição, pool)."""
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,266 @@
+# metrics.py
+import contextvars
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+# Quantas instruções SQL por requisição são guardadas para o log de requisições lentas.
+SLOW_REQUEST_MAX_STATEMENTS = int(os.getenv("SLOW_REQUEST_MAX_STATEMENTS", "50"))
+SLOW_REQUEST_STATEMENT_CHARS = 500
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+slow_request_logger = logging.getLogger("gym_notes.slow_requests")
+
+
+class RequestStats:
+    """Instruções SQL executadas durante uma requisição; preenchido pelos eventos do engine."""
+
+    __slots__ = ("statement_count", "db_time", "statements")
+
+    def __init__(self):
+        self.statement_count = 0
+        self.db_time = 0.0
+        self.statements: List[Tuple[float, str]] = []
+
+    def record_statement(self, statement: str, elapsed: float) -> None:
+        self.statement_count += 1
+        self.db_time += elapsed
+        if len(self.statements) < SLOW_REQUEST_MAX_STATEMENTS:
+            self.statements.append((elapsed, statement[:SLOW_REQUEST_STATEMENT_CHARS]))
+
+
+current_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Histograma cumulativo no formato do Prometheus (buckets fixos, _sum e _count por série)."""
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...], label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = label_names
+        # label_values -> [contagem por bucket (não cumulativa, +Inf no fim), soma]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    labels = _format_labels(self.label_names, label_values, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+ROUTE_LABELS = ("method", "route")
+
+http_requests_total = Counter(
+    "gym_notes_http_requests_total", "Requisições HTTP concluídas.", ("method", "route", "status")
+)
+http_request_duration = Histogram(
+    "gym_notes_http_request_duration_seconds", "Latência das requisições HTTP até o fim do corpo.",
+    LATENCY_BUCKETS, ROUTE_LABELS
+)
+http_request_db_statements = Histogram(
+    "gym_notes_http_request_db_statements", "Instruções SQL executadas por requisição.",
+    STATEMENT_COUNT_BUCKETS, ROUTE_LABELS
+)
+http_request_db_time = Histogram(
+    "gym_notes_http_request_db_seconds", "Tempo gasto no banco por requisição.",
+    DB_TIME_BUCKETS, ROUTE_LABELS
+)
+http_slow_requests_total = Counter(
+    "gym_notes_http_slow_requests_total", f"Requisições acima de SLOW_REQUEST_MS ({SLOW_REQUEST_MS:g} ms).", ROUTE_LABELS
+)
+db_statements_total = Counter("gym_notes_db_statements_total", "Instruções SQL executadas (inclusive fora de requisições).")
+db_statement_duration = Histogram(
+    "gym_notes_db_statement_duration_seconds", "Duração de cada instrução SQL.", DB_TIME_BUCKETS
+)
+db_pool_checkout_wait = Histogram(
+    "gym_notes_db_pool_checkout_wait_seconds", "Espera para obter uma conexão do pool.", POOL_WAIT_BUCKETS
+)
+
+_METRICS = (
+    http_requests_total,
+    http_request_duration,
+    http_request_db_statements,
+    http_request_db_time,
+    http_slow_requests_total,
+    db_statements_total,
+    db_statement_duration,
+    db_pool_checkout_wait,
+)
+
+_stats_collectors: List[Tuple[str, Callable[[], dict]]] = []
+
+
+def register_stats_collector(prefix: str, collect: Callable[[], dict]) -> None:
+    """Expõe os valores numéricos de um dicionário stats() como gauges gym_notes_<prefix>_<chave>."""
+    _stats_collectors.append((prefix, collect))
+
+
+def _render_stats_collectors() -> List[str]:
+    lines = []
+    for prefix, collect in _stats_collectors:
+        for key, value in collect().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"gym_notes_{prefix}_{key}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+    return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    lines.extend(_render_stats_collectors())
+    return "\n".join(lines) + "\n"
+
+
+def record_statement(statement: str, elapsed: float) -> None:
+    """Chamado pelos eventos do engine em database.py após cada instrução SQL."""
+    db_statements_total.inc()
+    db_statement_duration.observe(elapsed)
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.record_statement(statement, elapsed)
+
+
+def _route_label(scope) -> str:
+    # O FastAPI grava a rota casada no escopo; usar o template (/exercise_logs/{log_id}) em vez do
+    # caminho real mantém a cardinalidade das séries limitada.
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    # Mounts (ex.: /static) não expõem a rota, mas deixam o prefixo em root_path.
+    root_path = scope.get("root_path")
+    if root_path:
+        return root_path + "/*"
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede cada requisição HTTP até o último byte do corpo (inclusive
+    StreamingResponse) e associa a ela as instruções SQL registradas via current_request_stats.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            self._observe(scope, status_code, elapsed, stats)
+
+    def _observe(self, scope, status_code: int, elapsed: float, stats: RequestStats) -> None:
+        method = scope["method"]
+        route = _route_label(scope)
+        http_requests_total.inc(method, route, str(status_code))
+        http_request_duration.observe(elapsed, method, route)
+        http_request_db_statements.observe(stats.statement_count, method, route)
+        http_request_db_time.observe(stats.db_time, method, route)
+
+        if elapsed * 1000.0 < SLOW_REQUEST_MS:
+            return
+        http_slow_requests_total.inc(method, route)
+        statements = "\n".join(
+            f"    [{statement_elapsed * 1000.0:.1f} ms] {statement}" for statement_elapsed, statement in stats.statements
+        )
+        omitted = stats.statement_count - len(stats.statements)
+        if omitted > 0:
+            statements += f"\n    ... mais {omitted} instruções"
+        slow_request_logger.warning(
+            "Requisição lenta: %s %s -> %s em %.1f ms (%d instruções SQL, %.1f ms no banco)\n%s",
+            method, scope.get("path", route), status_code, elapsed * 1000.0,
+            stats.statement_count, stats.db_time * 1000.0, statements,
+        )
@@ -0,0 +1,87 @@
+# migrations/env.py
+from logging.config import fileConfig
+
+from alembic import context
+import sqlalchemy as sa
+from sqlalchemy import engine_from_config, pool
+
+from database import Base, DATABASE_URL
+import models  # registra todas as tabelas em Base.metadata (usado pelo --autogenerate)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+# '%' precisa ser escapado no ConfigParser (senhas com caracteres especiais).
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+
+target_metadata = Base.metadata
+
+
+def _include_object_for(dialect_name: str):
+    """
+    Índices e constraints com ddl_if(dialect=...) (ex.: trigramas, unicidade DEFERRABLE) só
+    existem nesses bancos: no SQLite o autogenerate os veria como faltando e geraria DDL que
+    nem o create_all nem as migrations criam lá.
+    """
+    def include_object(obj, name, type_, reflected, compare_to):
+        ddl_if = getattr(obj, "_ddl_if", None)
+        if ddl_if is None or ddl_if.dialect is None:
+            return True
+        dialects = (ddl_if.dialect,) if isinstance(ddl_if.dialect, str) else ddl_if.dialect
+        return dialect_name in dialects
+    return include_object
+
+
+def _compare_type(context, inspected_column, metadata_column, inspected_type, metadata_type):
+    # O SQLite reflete a coluna UUID como NUMERIC (afinidade de tipo): não é uma mudança.
+    if context.dialect.name == "sqlite" and isinstance(metadata_type, sa.Uuid):
+        return False
+    return None
+
+
+def run_migrations_offline() -> None:
+    """Gera o SQL das migrations sem conectar (alembic upgrade head --sql)."""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=DATABASE_URL.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # O SQLite não tem ALTER TABLE completo: recria a tabela quando preciso.
+        render_as_batch=connection.dialect.name == "sqlite",
+        include_object=_include_object_for(connection.dialect.name),
+        compare_type=_compare_type,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # Conexão passada por quem usa a API do Alembic (ex.: os testes); senão, a do DATABASE_URL.
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        _run_migrations(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
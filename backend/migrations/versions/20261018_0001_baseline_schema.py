@@ -0,0 +1,100 @@
+"""baseline schema
+
+Tabelas como o create_all do main.py as criava. Bancos que já existiam antes das migrations
+passam por esta revisão sem alterações (tabelas existentes são ignoradas), então basta
+rodar `alembic upgrade head` em qualquer ambiente.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+UUID = postgresql.UUID(as_uuid=True)
+JSON_DOCUMENT = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ]
+
+
+def _create_table_if_missing(name, *columns):
+    if sa.inspect(op.get_bind()).has_table(name):
+        return
+    op.create_table(name, *columns)
+
+
+def upgrade() -> None:
+    _create_table_if_missing(
+        "users",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("username", sa.String(100), nullable=False, unique=True),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("profile_picture_url", sa.String(255)),
+        *_timestamps(),
+    )
+    _create_table_if_missing(
+        "exercises",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False, unique=True),
+        sa.Column("description", sa.Text()),
+        sa.Column("category", sa.String(100)),
+        *_timestamps(),
+    )
+    _create_table_if_missing(
+        "training_blocks",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("color_hex", sa.String(7)),
+        sa.Column("user_id", UUID, sa.ForeignKey("users.id"), nullable=False),
+        *_timestamps(),
+    )
+    _create_table_if_missing(
+        "training_block_exercises",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("training_block_id", UUID, sa.ForeignKey("training_blocks.id"), nullable=False),
+        sa.Column("exercise_id", UUID, sa.ForeignKey("exercises.id"), nullable=False),
+        sa.Column("order_in_block", sa.Integer(), nullable=False),
+        *_timestamps(),
+    )
+    _create_table_if_missing(
+        "exercise_logs",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("training_block_id", UUID, sa.ForeignKey("training_blocks.id"), nullable=False),
+        sa.Column("exercise_id", UUID, sa.ForeignKey("exercises.id"), nullable=False),
+        sa.Column("user_id", UUID, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("log_date", sa.Date(), nullable=False),
+        sa.Column("sets_reps_data", JSON_DOCUMENT),
+        sa.Column("notes", sa.Text()),
+        *_timestamps(),
+    )
+    _create_table_if_missing(
+        "exercise_daily_stats",
+        sa.Column("user_id", UUID, sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("exercise_id", UUID, sa.ForeignKey("exercises.id"), primary_key=True),
+        sa.Column("stat_date", sa.Date(), primary_key=True),
+        sa.Column("log_count", sa.Integer(), nullable=False),
+        sa.Column("set_count", sa.Integer(), nullable=False),
+        sa.Column("total_volume", sa.Float(), nullable=False),
+        sa.Column("top_set_weight", sa.Float(), nullable=False),
+        sa.Column("estimated_1rm", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+
+
+def downgrade() -> None:
+    for table in ("exercise_daily_stats", "exercise_logs", "training_block_exercises", "training_blocks", "exercises", "users"):
+        op.drop_table(table)
@@ -0,0 +1,167 @@
+"""production index plan
+
+Índices das chaves estrangeiras, índices de busca do catálogo e as constraints de unicidade
+de training_block_exercises. No PostgreSQL os índices são criados com CONCURRENTLY, sem
+bloquear escritas; índices e constraints que o create_all já tenha criado são mantidos, e
+os que uma execução interrompida tenha deixado INVALID são recriados.
+
+Nomes de exercício que só diferem em maiúsculas impedem o índice único em lower(name): a
+migration para antes de criar qualquer índice e lista os nomes a renomear ou mesclar.
+Vínculos repetidos (mesmo exercício duas vezes no bloco) são removidos e as posições
+renumeradas; cada linha removida ou renumerada é registrada no log da migration.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.migration.0002")
+
+EXERCISE_SEARCH_VECTOR = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(category, ''))"
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _unique_constraint_exists(table: str, name: str) -> bool:
+    return any(constraint["name"] == name for constraint in sa.inspect(op.get_bind()).get_unique_constraints(table))
+
+
+def _is_invalid_index(name: str) -> bool:
+    """Índice que um CREATE INDEX CONCURRENTLY interrompido deixou para trás (só PostgreSQL)."""
+    return bool(op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid"
+            " WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+        ),
+        {"name": name},
+    ).scalar())
+
+
+def _check_exercise_names_unique_ignoring_case() -> None:
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT name FROM exercises WHERE lower(name) IN ("
+        " SELECT lower(name) FROM exercises GROUP BY lower(name) HAVING count(*) > 1"
+        ") ORDER BY lower(name), name"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "exercises has names that differ only by case, which blocks the unique index "
+            "ix_exercises_name_lower: " + ", ".join(repr(name) for name in duplicates[:50])
+            + (" ..." if len(duplicates) > 50 else "")
+            + ". Rename them, or merge them by pointing exercise_logs and training_block_exercises "
+            "to a single exercise, then run the migration again."
+        )
+
+
+def _create_index(name: str, table: str, columns, unique: bool = False, **kwargs) -> None:
+    if _is_postgres():
+        # CONCURRENTLY não pode rodar dentro de uma transação.
+        with op.get_context().autocommit_block():
+            # if_not_exists pularia um índice INVALID de uma tentativa anterior.
+            if _is_invalid_index(name):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(name, table, columns, unique=unique, if_not_exists=True, postgresql_concurrently=True, **kwargs)
+    else:
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True, **kwargs)
+
+
+def _drop_index(name: str, table: str) -> None:
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def upgrade() -> None:
+    _check_exercise_names_unique_ignoring_case()
+
+    # Chaves estrangeiras. exercise_logs.user_id é coberta pelo índice composto, que começa
+    # por ela; training_block_exercises.training_block_id pela unicidade (bloco, exercício).
+    _create_index("ix_training_blocks_user_id", "training_blocks", ["user_id"])
+    _create_index("ix_exercise_logs_training_block_id", "exercise_logs", ["training_block_id"])
+    _create_index("ix_exercise_logs_exercise_id", "exercise_logs", ["exercise_id"])
+    _create_index("ix_exercise_logs_user_id_log_date_created_at", "exercise_logs", ["user_id", "log_date", "created_at"])
+
+    # Catálogo de exercícios: unicidade sem diferenciar maiúsculas e índices de busca.
+    _create_index("ix_exercises_name_lower", "exercises", [sa.text("lower(name)")], unique=True)
+    if _is_postgres():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        _create_index("ix_exercises_name_lower_prefix", "exercises", [sa.text("lower(name) text_pattern_ops")])
+        _create_index("ix_exercises_name_trgm", "exercises", ["name"], postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"})
+        _create_index("ix_exercises_category_trgm", "exercises", ["category"], postgresql_using="gin", postgresql_ops={"category": "gin_trgm_ops"})
+        _create_index("ix_exercises_search_vector", "exercises", [sa.text(EXERCISE_SEARCH_VECTOR)], postgresql_using="gin")
+
+    # training_block_exercises: sem as constraints, o mesmo exercício pode ter sido adicionado
+    # duas vezes ao bloco e posições podem se repetir. Mantém o vínculo mais antigo na ordem.
+    removed = op.get_bind().execute(sa.text(
+        "DELETE FROM training_block_exercises WHERE id IN ("
+        " SELECT id FROM ("
+        "  SELECT id, ROW_NUMBER() OVER ("
+        "   PARTITION BY training_block_id, exercise_id ORDER BY order_in_block, created_at, id"
+        "  ) AS position FROM training_block_exercises"
+        " ) ranked WHERE position > 1"
+        ") RETURNING id, training_block_id, exercise_id, order_in_block"
+    )).all()
+    for row in removed:
+        logger.warning(
+            "Removed duplicate training_block_exercises row %s (training_block_id=%s, exercise_id=%s, order_in_block=%s)",
+            row.id, row.training_block_id, row.exercise_id, row.order_in_block,
+        )
+    if not _unique_constraint_exists("training_block_exercises", "uq_training_block_exercises_block_exercise"):
+        with op.batch_alter_table("training_block_exercises") as batch_op:
+            batch_op.create_unique_constraint(
+                "uq_training_block_exercises_block_exercise", ["training_block_id", "exercise_id"]
+            )
+
+    if _is_postgres() and not _unique_constraint_exists("training_block_exercises", "uq_training_block_exercises_block_order"):
+        # Renumera 0..n-1 preservando a ordem atual antes de exigir posições únicas.
+        renumbered = op.get_bind().execute(sa.text(
+            "UPDATE training_block_exercises AS tbe SET order_in_block = ranked.position - 1"
+            " FROM ("
+            "  SELECT id, order_in_block AS previous_order, ROW_NUMBER() OVER ("
+            "   PARTITION BY training_block_id ORDER BY order_in_block, created_at, id"
+            "  ) AS position FROM training_block_exercises"
+            " ) ranked"
+            " WHERE tbe.id = ranked.id AND tbe.order_in_block <> ranked.position - 1"
+            " RETURNING tbe.id, tbe.training_block_id, ranked.previous_order, tbe.order_in_block"
+        )).all()
+        for row in renumbered:
+            logger.info(
+                "Renumbered training_block_exercises row %s (training_block_id=%s): order_in_block %s -> %s",
+                row.id, row.training_block_id, row.previous_order, row.order_in_block,
+            )
+        op.create_unique_constraint(
+            "uq_training_block_exercises_block_order", "training_block_exercises",
+            ["training_block_id", "order_in_block"],
+            deferrable=True, initially="IMMEDIATE",
+        )
+
+
+def downgrade() -> None:
+    if _is_postgres() and _unique_constraint_exists("training_block_exercises", "uq_training_block_exercises_block_order"):
+        op.drop_constraint("uq_training_block_exercises_block_order", "training_block_exercises", type_="unique")
+    if _unique_constraint_exists("training_block_exercises", "uq_training_block_exercises_block_exercise"):
+        with op.batch_alter_table("training_block_exercises") as batch_op:
+            batch_op.drop_constraint("uq_training_block_exercises_block_exercise", type_="unique")
+
+    if _is_postgres():
+        for name in ("ix_exercises_search_vector", "ix_exercises_category_trgm", "ix_exercises_name_trgm", "ix_exercises_name_lower_prefix"):
+            _drop_index(name, "exercises")
+    _drop_index("ix_exercises_name_lower", "exercises")
+
+    _drop_index("ix_exercise_logs_user_id_log_date_created_at", "exercise_logs")
+    _drop_index("ix_exercise_logs_exercise_id", "exercise_logs")
+    _drop_index("ix_exercise_logs_training_block_id", "exercise_logs")
+    _drop_index("ix_training_blocks_user_id", "training_blocks")
@@ -0,0 +1,67 @@
+"""on delete cascade for user-owned rows
+
+As chaves estrangeiras que apontam para users e training_blocks passam a ter ON DELETE
+CASCADE, para que apagar um bloco ou uma conta remova os filhos num único statement no
+banco (os relacionamentos usam passive_deletes). No PostgreSQL a nova constraint é criada
+NOT VALID e validada fora da transação, sem bloquear escritas durante a varredura.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (tabela, coluna, tabela referenciada)
+CASCADE_FOREIGN_KEYS = (
+    ("training_blocks", "user_id", "users"),
+    ("training_block_exercises", "training_block_id", "training_blocks"),
+    ("exercise_logs", "training_block_id", "training_blocks"),
+    ("exercise_logs", "user_id", "users"),
+    ("exercise_daily_stats", "user_id", "users"),
+)
+
+# Nomes determinísticos para as FKs sem nome do SQLite, usados só no modo batch.
+SQLITE_NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _foreign_key_name(table: str, column: str) -> str:
+    for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys(table):
+        if foreign_key["constrained_columns"] == [column]:
+            return foreign_key["name"]
+    raise RuntimeError(f"Foreign key {table}.{column} not found")
+
+
+def _replace_foreign_key(table: str, column: str, referred_table: str, ondelete) -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        name = _foreign_key_name(table, column)
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(
+            name, table, referred_table, [column], ["id"],
+            ondelete=ondelete, postgresql_not_valid=True,
+        )
+        with op.get_context().autocommit_block():
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT "{name}"')
+        return
+
+    name = SQLITE_NAMING_CONVENTION["fk"] % {
+        "table_name": table, "column_0_name": column, "referred_table_name": referred_table,
+    }
+    with op.batch_alter_table(table, naming_convention=SQLITE_NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_="foreignkey")
+        batch_op.create_foreign_key(name, referred_table, [column], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    for table, column, referred_table in CASCADE_FOREIGN_KEYS:
+        _replace_foreign_key(table, column, referred_table, "CASCADE")
+
+
+def downgrade() -> None:
+    for table, column, referred_table in reversed(CASCADE_FOREIGN_KEYS):
+        _replace_foreign_key(table, column, referred_table, None)
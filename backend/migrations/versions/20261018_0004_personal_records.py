@@ -0,0 +1,42 @@
+"""personal records
+
+Tabela personal_records, mantida pelas rotas de escrita de exercise_logs. Para preencher
+os recordes de dados existentes, rode `python aggregates.py` depois da migração.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+UUID = postgresql.UUID(as_uuid=True)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "personal_records",
+        sa.Column("user_id", UUID, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("exercise_id", UUID, sa.ForeignKey("exercises.id"), primary_key=True),
+        sa.Column("reps", sa.Integer(), primary_key=True),
+        sa.Column("weight_kg", sa.Float(), nullable=False),
+        sa.Column("estimated_1rm", sa.Float(), nullable=False),
+        sa.Column("achieved_on", sa.Date(), nullable=False),
+        sa.Column("exercise_log_id", UUID, sa.ForeignKey("exercise_logs.id", ondelete="SET NULL")),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_personal_records_exercise_log_id", "personal_records", ["exercise_log_id"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_personal_records_exercise_log_id", table_name="personal_records", if_exists=True)
+    op.drop_table("personal_records")
@@ -0,0 +1,39 @@
+"""daily activity rollup
+
+Tabela daily_activity (um resumo por usuário e dia), lida por GET /exercise_logs/calendar e
+mantida pelas rotas de escrita de exercise_logs. Para preencher os dias de dados existentes,
+rode `python aggregates.py` depois da migração.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+UUID = postgresql.UUID(as_uuid=True)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_activity",
+        sa.Column("user_id", UUID, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("activity_date", sa.Date(), primary_key=True),
+        sa.Column("session_count", sa.Integer(), nullable=False),
+        sa.Column("exercise_count", sa.Integer(), nullable=False),
+        sa.Column("log_count", sa.Integer(), nullable=False),
+        sa.Column("set_count", sa.Integer(), nullable=False),
+        sa.Column("total_volume", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_activity")
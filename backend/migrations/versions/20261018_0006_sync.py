@@ -0,0 +1,62 @@
+"""delta sync: tombstones and updated_at indexes
+
+Tabela sync_tombstones, gravada pelas rotas de exclusão, e índices (dono, updated_at) usados
+por GET /sync. No PostgreSQL os índices são criados com CONCURRENTLY.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+UUID = postgresql.UUID(as_uuid=True)
+
+# (nome, tabela, colunas)
+SYNC_INDEXES = (
+    ("ix_training_blocks_user_id_updated_at", "training_blocks", ["user_id", "updated_at"]),
+    ("ix_training_block_exercises_block_id_updated_at", "training_block_exercises", ["training_block_id", "updated_at"]),
+    ("ix_exercise_logs_user_id_updated_at", "exercise_logs", ["user_id", "updated_at"]),
+)
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("table_name", sa.String(50), primary_key=True),
+        sa.Column("row_id", UUID, primary_key=True),
+        sa.Column("user_id", UUID, sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index("ix_sync_tombstones_user_id_deleted_at", "sync_tombstones", ["user_id", "deleted_at"], if_not_exists=True)
+
+    for name, table, columns in SYNC_INDEXES:
+        if _is_postgres():
+            # CONCURRENTLY não pode rodar dentro de uma transação.
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+        else:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(SYNC_INDEXES):
+        if _is_postgres():
+            with op.get_context().autocommit_block():
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+        else:
+            op.drop_index(name, table_name=table, if_exists=True)
+
+    op.drop_index("ix_sync_tombstones_user_id_deleted_at", table_name="sync_tombstones", if_exists=True)
+    op.drop_table("sync_tombstones")
@@ -0,0 +1,105 @@
+"""derived set totals on exercise_logs
+
+Colunas set_count, total_volume_kg, top_weight_kg e estimated_1rm_kg em exercise_logs,
+calculadas a partir de sets_reps_data (pesos em lb convertidos para kg) e mantidas pelas
+rotas de escrita. Os logs existentes são preenchidos aqui, em lotes; os índices por usuário
+são criados depois, com CONCURRENTLY no PostgreSQL.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+LB_TO_KG = 0.45359237
+BACKFILL_BATCH_SIZE = 1000
+
+TOTAL_COLUMNS = (
+    ("set_count", sa.Integer()),
+    ("total_volume_kg", sa.Float()),
+    ("top_weight_kg", sa.Float()),
+    ("estimated_1rm_kg", sa.Float()),
+)
+
+# (nome, colunas)
+TOTAL_INDEXES = (
+    ("ix_exercise_logs_user_id_top_weight_kg", ["user_id", "top_weight_kg"]),
+    ("ix_exercise_logs_user_id_total_volume_kg", ["user_id", "total_volume_kg"]),
+)
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _log_totals(sets) -> dict:
+    # Cópia congelada de aggregates.log_totals: a migração não deve mudar se o código mudar.
+    totals = {"set_count": 0, "total_volume_kg": 0.0, "top_weight_kg": 0.0, "estimated_1rm_kg": 0.0}
+    for set_data in sets or []:
+        weight = float(set_data.get("weight") or 0.0)
+        if (set_data.get("unit") or "kg").lower() in ("lb", "lbs"):
+            weight *= LB_TO_KG
+        reps = int(set_data.get("reps") or 0)
+        totals["set_count"] += 1
+        totals["total_volume_kg"] += weight * reps
+        totals["top_weight_kg"] = max(totals["top_weight_kg"], weight)
+        if reps > 0 and weight > 0:
+            totals["estimated_1rm_kg"] = max(totals["estimated_1rm_kg"], weight if reps == 1 else weight * (1 + reps / 30.0))
+    return totals
+
+
+def _backfill() -> None:
+    logs = sa.table(
+        "exercise_logs",
+        sa.column("id", sa.Uuid()),
+        sa.column("sets_reps_data", sa.JSON()),
+        *(sa.column(name, type_) for name, type_ in TOTAL_COLUMNS),
+    )
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        query = sa.select(logs.c.id, logs.c.sets_reps_data).order_by(logs.c.id).limit(BACKFILL_BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(logs.c.id > last_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            return
+        bind.execute(
+            logs.update().where(logs.c.id == sa.bindparam("log_id")),
+            [{"log_id": log_id, **_log_totals(sets_reps_data)} for log_id, sets_reps_data in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("exercise_logs") as batch_op:
+        for name, type_ in TOTAL_COLUMNS:
+            batch_op.add_column(sa.Column(name, type_, nullable=False, server_default="0"))
+    _backfill()
+
+    for name, columns in TOTAL_INDEXES:
+        if _is_postgres():
+            # CONCURRENTLY não pode rodar dentro de uma transação.
+            with op.get_context().autocommit_block():
+                op.create_index(name, "exercise_logs", columns, if_not_exists=True, postgresql_concurrently=True)
+        else:
+            op.create_index(name, "exercise_logs", columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(TOTAL_INDEXES):
+        if _is_postgres():
+            with op.get_context().autocommit_block():
+                op.drop_index(name, table_name="exercise_logs", if_exists=True, postgresql_concurrently=True)
+        else:
+            op.drop_index(name, table_name="exercise_logs", if_exists=True)
+
+    with op.batch_alter_table("exercise_logs") as batch_op:
+        for name, _ in reversed(TOTAL_COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,56 @@
+"""persistent account deletion jobs
+
+Tabela account_deletion_jobs: o estado das exclusões de conta sai da memória do worker, para
+que qualquer worker informe o progresso e um job interrompido seja retomado (account_deletion.py).
+Contas desativadas por DELETE /auth/me antes desta migração, com dados ainda no banco, podem
+ser concluídas com `python account_deletion.py <user_id>`.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+UUID = postgresql.UUID(as_uuid=True)
+
+ACTIVE_JOB = sa.text("status IN ('pending', 'running')")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "account_deletion_jobs",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("user_id", UUID, nullable=False),
+        sa.Column("username", sa.String(100), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("total_rows", sa.Integer(), nullable=False),
+        sa.Column("deleted_rows", sa.Integer(), nullable=False),
+        sa.Column("current_table", sa.String(50)),
+        sa.Column("error", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        if_not_exists=True,
+    )
+    # Tabela nova e vazia: os índices não precisam de CONCURRENTLY.
+    op.create_index(
+        "uq_account_deletion_jobs_active_user_id", "account_deletion_jobs", ["user_id"],
+        unique=True, postgresql_where=ACTIVE_JOB, sqlite_where=ACTIVE_JOB, if_not_exists=True,
+    )
+    op.create_index(
+        "ix_account_deletion_jobs_status_heartbeat_at", "account_deletion_jobs", ["status", "heartbeat_at"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_account_deletion_jobs_status_heartbeat_at", table_name="account_deletion_jobs", if_exists=True)
+    op.drop_index("uq_account_deletion_jobs_active_user_id", table_name="account_deletion_jobs", if_exists=True)
+    op.drop_table("account_deletion_jobs")
@@ -5,6 +5,11 @@ from . import exercise
 from . import training_block_exercise
 from . import exercise_log
 from . import user
+from . import exercise_daily_stat
+from . import personal_record
+from . import daily_activity
+from . import sync_tombstone
+from . import account_deletion_job
 
 # Opcionalmente, você pode re-exportá-los para facilitar a importação em outros lugares:
 # from .training_block import TrainingBlock
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, String, Text, Integer, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+from database import Base, db_now
+
+ACTIVE_STATUSES = ("pending", "running")
+
+class AccountDeletionJob(Base):
+    """
+    Exclusão de conta em segundo plano (account_deletion.py). Persistida para que qualquer worker
+    informe o progresso e retome o job se o processo que o executava cair.
+    """
+    __tablename__ = "account_deletion_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Sem FK: a linha de users é apagada no fim do job e o registro do job continua.
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    # Dono do job depois que a conta sumir: o token que consulta o progresso precisa deste sub.
+    username = Column(String(100), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending | running | completed | failed
+    total_rows = Column(Integer, nullable=False, default=0)
+    deleted_rows = Column(Integer, nullable=False, default=0)
+    current_table = Column(String(50))
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), default=db_now())
+    # Renovado a cada lote; job ativo sem renovação recente é retomado por outro worker.
+    heartbeat_at = Column(DateTime(timezone=True), nullable=False, default=db_now())
+    finished_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<AccountDeletionJob(id={self.id}, user_id={self.user_id}, status='{self.status}')>"
+
+
+# No máximo um job ativo por usuário, mesmo com vários workers.
+Index(
+    "uq_account_deletion_jobs_active_user_id",
+    AccountDeletionJob.user_id,
+    unique=True,
+    postgresql_where=AccountDeletionJob.status.in_(ACTIVE_STATUSES),
+    sqlite_where=AccountDeletionJob.status.in_(ACTIVE_STATUSES),
+)
+# Jobs ativos com heartbeat antigo (retomada).
+Index("ix_account_deletion_jobs_status_heartbeat_at", AccountDeletionJob.status, AccountDeletionJob.heartbeat_at)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from database import Base
+
+class DailyActivity(Base):
+    """Resumo diário de treino por usuário (calendário), mantido pelas rotas de escrita de exercise_logs."""
+    __tablename__ = "daily_activity"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    activity_date = Column(Date, primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+    exercise_count = Column(Integer, nullable=False, default=0)
+    log_count = Column(Integer, nullable=False, default=0)
+    set_count = Column(Integer, nullable=False, default=0)
+    total_volume = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<DailyActivity(user_id={self.user_id}, activity_date={self.activity_date})>"
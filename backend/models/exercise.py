@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy import Column, String, Text, DateTime, DDL, Index, event, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -20,4 +20,34 @@ class Exercise(Base):
     exercise_logs = relationship("ExerciseLog", back_populates="exercise")
 
     def __repr__(self):
-        return f"<Exercise(id={self.id}, name='{self.name}')>"
\ No newline at end of file
+        return f"<Exercise(id={self.id}, name='{self.name}')>"
+
+
+# Expressão de busca textual; constantes como text() para que a consulta case exatamente com
+# a expressão do índice (parâmetros ligados impediriam o uso do índice). Não literal_column:
+# o Index abaixo acha a tabela pela primeira coluna da expressão, e ela seria a constante.
+EXERCISE_SEARCH_VECTOR = func.to_tsvector(
+    text("'simple'"),
+    func.coalesce(Exercise.name, text("''")).op("||")(text("' '"))
+        .op("||")(func.coalesce(Exercise.category, text("''")))
+)
+
+# Unicidade sem diferenciar maiúsculas: substitui a checagem por ilike, que exigia varredura.
+Index("ix_exercises_name_lower", func.lower(Exercise.name), unique=True)
+# Os índices abaixo só existem no PostgreSQL (o SQLite do benchmark não tem pg_trgm/tsvector).
+# Autocomplete por prefixo: lower(name) LIKE 'abc%'.
+Index(
+    "ix_exercises_name_lower_prefix",
+    func.lower(Exercise.name).label("name_lower"),
+    postgresql_ops={"name_lower": "text_pattern_ops"},
+).ddl_if(dialect="postgresql")
+# Busca tolerante a erros de digitação (similarity / word_similarity / ILIKE '%...%').
+Index("ix_exercises_name_trgm", Exercise.name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}).ddl_if(dialect="postgresql")
+Index("ix_exercises_category_trgm", Exercise.category, postgresql_using="gin", postgresql_ops={"category": "gin_trgm_ops"}).ddl_if(dialect="postgresql")
+Index("ix_exercises_search_vector", EXERCISE_SEARCH_VECTOR, postgresql_using="gin").ddl_if(dialect="postgresql")
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from database import Base
+
+class ExerciseDailyStat(Base):
+    """Agregado diário por (usuário, exercício), mantido pelas rotas de escrita de exercise_logs."""
+    __tablename__ = "exercise_daily_stats"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    exercise_id = Column(UUID(as_uuid=True), ForeignKey("exercises.id"), primary_key=True)
+    stat_date = Column(Date, primary_key=True)
+    log_count = Column(Integer, nullable=False, default=0)
+    set_count = Column(Integer, nullable=False, default=0)
+    total_volume = Column(Float, nullable=False, default=0.0)
+    top_set_weight = Column(Float, nullable=False, default=0.0)
+    estimated_1rm = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<ExerciseDailyStat(user_id={self.user_id}, exercise_id={self.exercise_id}, stat_date={self.stat_date})>"
@@ -1,23 +1,38 @@
-from sqlalchemy import Column, String, Text, Date, ForeignKey, DateTime
+from sqlalchemy import Column, String, Text, Integer, Float, Date, ForeignKey, DateTime, Index, JSON
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
 import uuid
 
-from database import Base
+from database import Base, db_now
 
 class ExerciseLog(Base):
     __tablename__ = "exercise_logs"
+    __table_args__ = (
+        # Cobre o filtro por usuário + ordenação/paginação por cursor de read_exercise_logs
+        # (e, por começar em user_id, também a FK de users).
+        Index("ix_exercise_logs_user_id_log_date_created_at", "user_id", "log_date", "created_at"),
+        # Linhas alteradas desde a última sincronização (GET /sync).
+        Index("ix_exercise_logs_user_id_updated_at", "user_id", "updated_at"),
+        # Filtros por carga/volume (ex.: top set >= 100 kg) resolvidos no banco.
+        Index("ix_exercise_logs_user_id_top_weight_kg", "user_id", "top_weight_kg"),
+        Index("ix_exercise_logs_user_id_total_volume_kg", "user_id", "total_volume_kg"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    training_block_id = Column(UUID(as_uuid=True), ForeignKey("training_blocks.id"), nullable=False)
-    exercise_id = Column(UUID(as_uuid=True), ForeignKey("exercises.id"), nullable=False)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    training_block_id = Column(UUID(as_uuid=True), ForeignKey("training_blocks.id", ondelete="CASCADE"), nullable=False, index=True)
+    exercise_id = Column(UUID(as_uuid=True), ForeignKey("exercises.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     log_date = Column(Date, default=date.today, nullable=False)
-    sets_reps_data = Column(JSONB)
+    sets_reps_data = Column(JSON().with_variant(JSONB(), "postgresql"))
     notes = Column(Text)
+    # Derivadas de sets_reps_data com pesos em kg (aggregates.log_totals), gravadas em toda escrita.
+    set_count = Column(Integer, nullable=False, default=0)
+    total_volume_kg = Column(Float, nullable=False, default=0.0)
+    top_weight_kg = Column(Float, nullable=False, default=0.0)
+    estimated_1rm_kg = Column(Float, nullable=False, default=0.0)
     created_at = Column(DateTime(timezone=True), default=datetime.now)
-    updated_at = Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+    updated_at = Column(DateTime(timezone=True), default=db_now(), onupdate=db_now())
 
     user = relationship("User", back_populates="exercise_logs")
     training_block = relationship("TrainingBlock", back_populates="exercise_logs")
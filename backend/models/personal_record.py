@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from database import Base
+
+class PersonalRecord(Base):
+    """Melhor série por (usuário, exercício, repetições), mantida pelas rotas de escrita de exercise_logs."""
+    __tablename__ = "personal_records"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    exercise_id = Column(UUID(as_uuid=True), ForeignKey("exercises.id"), primary_key=True)
+    reps = Column(Integer, primary_key=True)
+    weight_kg = Column(Float, nullable=False)
+    estimated_1rm = Column(Float, nullable=False)
+    achieved_on = Column(Date, nullable=False)
+    # SET NULL: apagar o log que detém o recorde marca a linha para recálculo em aggregates.py.
+    exercise_log_id = Column(UUID(as_uuid=True), ForeignKey("exercise_logs.id", ondelete="SET NULL"), index=True)
+    updated_at = Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<PersonalRecord(user_id={self.user_id}, exercise_id={self.exercise_id}, reps={self.reps}, weight_kg={self.weight_kg})>"
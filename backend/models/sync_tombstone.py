@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, ForeignKey, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from database import Base, db_now
+
+class SyncTombstone(Base):
+    """Registro de uma linha apagada, para que GET /sync informe exclusões aos clientes offline."""
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    table_name = Column(String(50), primary_key=True)
+    row_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), default=db_now(), nullable=False)
+
+    def __repr__(self):
+        return f"<SyncTombstone(table_name={self.table_name}, row_id={self.row_id}, user_id={self.user_id})>"
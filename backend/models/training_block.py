@@ -1,25 +1,30 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey 
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
 
-from database import Base
+from database import Base, db_now
 
 class TrainingBlock(Base):
     __tablename__ = "training_blocks"
+    __table_args__ = (
+        # Linhas alteradas desde a última sincronização (GET /sync).
+        Index("ix_training_blocks_user_id_updated_at", "user_id", "updated_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     color_hex = Column(String(7), default='#FFFFFF')
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), default=datetime.now)
-    updated_at = Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+    updated_at = Column(DateTime(timezone=True), default=db_now(), onupdate=db_now())
 
     user = relationship("User", back_populates="training_blocks")
-    block_exercises = relationship("TrainingBlockExercise", back_populates="training_block", cascade="all, delete-orphan")
-    exercise_logs = relationship("ExerciseLog", back_populates="training_block", cascade="all, delete-orphan")
+    # passive_deletes: o ON DELETE CASCADE do banco remove os filhos num único DELETE, sem carregá-los.
+    block_exercises = relationship("TrainingBlockExercise", back_populates="training_block", cascade="all, delete-orphan", passive_deletes=True)
+    exercise_logs = relationship("ExerciseLog", back_populates="training_block", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<TrainingBlock(id={self.id}, title='{self.title}, user_id={self.user_id}', user_id={self.user_id})>"
\ No newline at end of file
@@ -1,20 +1,33 @@
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
 
-from database import Base
+from database import Base, db_now
 
 class TrainingBlockExercise(Base):
     __tablename__ = "training_block_exercises"
+    __table_args__ = (
+        # DEFERRABLE: a checagem ocorre no fim do statement, então um único UPDATE pode permutar posições.
+        # O SQLite não aceita DEFERRABLE em UNIQUE, então lá a constraint não é criada.
+        UniqueConstraint(
+            "training_block_id", "order_in_block",
+            name="uq_training_block_exercises_block_order",
+            deferrable=True, initially="IMMEDIATE",
+        ).ddl_if(dialect="postgresql"),
+        # Um exercício aparece no máximo uma vez por bloco; também serve de índice da FK training_block_id.
+        UniqueConstraint("training_block_id", "exercise_id", name="uq_training_block_exercises_block_exercise"),
+        # Vínculos alterados desde a última sincronização, a partir dos blocos do usuário (GET /sync).
+        Index("ix_training_block_exercises_block_id_updated_at", "training_block_id", "updated_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    training_block_id = Column(UUID(as_uuid=True), ForeignKey("training_blocks.id"), nullable=False)
+    training_block_id = Column(UUID(as_uuid=True), ForeignKey("training_blocks.id", ondelete="CASCADE"), nullable=False)
     exercise_id = Column(UUID(as_uuid=True), ForeignKey("exercises.id"), nullable=False)
     order_in_block = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime(timezone=True), default=datetime.now)
-    updated_at = Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+    updated_at = Column(DateTime(timezone=True), default=db_now(), onupdate=db_now())
 
     training_block = relationship("TrainingBlock", back_populates="block_exercises")
     exercise = relationship("Exercise", back_populates="training_block_exercises")
@@ -19,8 +19,10 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), default=datetime.now)
     updated_at = Column(DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
 
-    training_blocks = relationship("TrainingBlock", back_populates="user", cascade="all, delete-orphan")
-    exercise_logs = relationship("ExerciseLog", back_populates="user", cascade="all, delete-orphan")
+    # passive_deletes: o ON DELETE CASCADE do banco remove os filhos; contas grandes são
+    # apagadas em lotes por account_deletion.py.
+    training_blocks = relationship("TrainingBlock", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    exercise_logs = relationship("ExerciseLog", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>"
\ No newline at end of file
@@ -0,0 +1,52 @@
+# pagination.py
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    """Cursor de paginação malformado ou adulterado."""
+
+
+def encode_log_cursor(log_date: date, created_at: datetime, log_id: uuid.UUID) -> str:
+    """Gera um cursor opaco a partir da chave de ordenação (log_date, created_at, id)."""
+    raw = json.dumps([log_date.isoformat(), created_at.isoformat(), str(log_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_log_cursor(cursor: Optional[str]) -> Optional[Tuple[date, datetime, uuid.UUID]]:
+    """Decodifica um cursor gerado por encode_log_cursor."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        log_date, created_at, log_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(log_date), datetime.fromisoformat(created_at), uuid.UUID(log_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+def encode_sync_cursor(watermark: datetime, positions: Dict[str, Tuple[datetime, uuid.UUID]]) -> str:
+    """
+    Cursor opaco do GET /sync: o watermark da primeira página e, para cada coleção que ainda
+    tem linhas, a última chave (carimbo, id) entregue. Coleção ausente já terminou.
+    """
+    raw = json.dumps(
+        [watermark.isoformat(), {name: [stamp.isoformat(), str(row_id)] for name, (stamp, row_id) in positions.items()}],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> Tuple[datetime, Dict[str, Tuple[datetime, uuid.UUID]]]:
+    """Decodifica um cursor gerado por encode_sync_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        watermark, positions = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(watermark), {
+            name: (datetime.fromisoformat(stamp), uuid.UUID(row_id)) for name, (stamp, row_id) in positions.items()
+        }
+    except (ValueError, TypeError, AttributeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
@@ -0,0 +1,66 @@
+# rate_limit.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+LOGIN_RATE_LIMIT_BURST = int(os.getenv("LOGIN_RATE_LIMIT_BURST", "5"))
+LOGIN_RATE_LIMIT_PER_MINUTE = float(os.getenv("LOGIN_RATE_LIMIT_PER_MINUTE", "5"))
+LOGIN_IP_RATE_LIMIT_BURST = int(os.getenv("LOGIN_IP_RATE_LIMIT_BURST", "20"))
+LOGIN_IP_RATE_LIMIT_PER_MINUTE = float(os.getenv("LOGIN_IP_RATE_LIMIT_PER_MINUTE", "20"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+
+
+class TokenBucketLimiter:
+    """Token bucket por chave (ex.: username ou IP), com número de chaves limitado por LRU."""
+
+    def __init__(self, capacity: int, refill_per_minute: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def consume(self, key: str) -> Tuple[bool, float]:
+        """Consome um token; retorna (permitido, segundos até o próximo token)."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(self.capacity), now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                tokens, updated_at = bucket
+                bucket[0] = min(float(self.capacity), tokens + (now - updated_at) * self.refill_per_second)
+                bucket[1] = now
+
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                self.allowed += 1
+                return True, 0.0
+
+            self.limited += 1
+            if self.refill_per_second <= 0:
+                return False, 60.0
+            return False, (1.0 - bucket[0]) / self.refill_per_second
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "keys": len(self._buckets),
+                "allowed": self.allowed,
+                "limited": self.limited,
+            }
+
+
+login_username_limiter = TokenBucketLimiter(LOGIN_RATE_LIMIT_BURST, LOGIN_RATE_LIMIT_PER_MINUTE)
+login_ip_limiter = TokenBucketLimiter(LOGIN_IP_RATE_LIMIT_BURST, LOGIN_IP_RATE_LIMIT_PER_MINUTE)
@@ -0,0 +1,226 @@
+# response_cache.py
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from catalog_cache import cached_json_response, make_etag
+
+from dotenv import load_dotenv
+load_dotenv()
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # redis é opcional: sem ele só o backend em memória fica disponível.
+    redis_asyncio = None
+
+# Rede de segurança para escritas feitas por outros workers no backend em memória, que não
+# incrementam a versão local (com Redis a versão é compartilhada).
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+# Ex.: redis://localhost:6379/0. Vazio: LRU em memória.
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL")
+
+logger = logging.getLogger("gym_notes.response_cache")
+
+
+class InMemoryBackend:
+    """LRU com TTL no próprio processo; as versões por usuário também são locais."""
+
+    name = "memory"
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    async def get_version(self, user_key: str) -> int:
+        return self._versions.get(user_key, 0)
+
+    async def bump_version(self, user_key: str) -> None:
+        with self._lock:
+            self._versions[user_key] = self._versions.get(user_key, 0) + 1
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "max_entries": self.max_entries, "evictions": self.evictions}
+
+
+class RedisBackend:
+    """Redis (ou compatível) compartilhado entre workers; entradas expiram pelo próprio servidor."""
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl_seconds: float, key_prefix: str = "gym_notes:response_cache"):
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self._client = redis_asyncio.from_url(url)
+
+    async def get_version(self, user_key: str) -> int:
+        return int(await self._client.get(f"{self.key_prefix}:version:{user_key}") or 0)
+
+    async def bump_version(self, user_key: str) -> None:
+        await self._client.incr(f"{self.key_prefix}:version:{user_key}")
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(f"{self.key_prefix}:{key}")
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self._client.set(f"{self.key_prefix}:{key}", value, px=int(self.ttl_seconds * 1000))
+
+    def stats(self) -> dict:
+        return {}
+
+
+class CacheLookup:
+    """Resultado de ResponseCache.lookup: a resposta em cache, ou o lugar onde guardar a nova."""
+
+    def __init__(self, cache: "ResponseCache", key: Optional[str], value: Optional[bytes]):
+        self._cache = cache
+        self._key = key
+        self._value = value
+
+    @property
+    def hit(self) -> bool:
+        return self._value is not None
+
+    def response(self, request: Request) -> Response:
+        headers_line, body = self._value.split(b"\n", 1)
+        headers = json.loads(headers_line)
+        return cached_json_response(request, body, headers.pop("ETag"), headers)
+
+    async def store(self, request: Request, body: bytes, headers: Optional[dict] = None) -> Response:
+        """Guarda o corpo JSON já serializado (e cabeçalhos extras) e devolve a resposta."""
+        headers = dict(headers or {})
+        etag = make_etag(body)
+        if self._key is not None:
+            value = json.dumps({**headers, "ETag": etag}).encode() + b"\n" + body
+            await self._cache._set(self._key, value)
+        return cached_json_response(request, body, etag, headers)
+
+
+class ResponseCache:
+    """
+    Cache de respostas GET por usuário.
+
+    A chave inclui uma versão por usuário, incrementada por invalidate_user() após cada escrita
+    nos blocos, vínculos e logs dele; respostas de versões antigas deixam de ser encontradas e
+    saem por LRU/TTL. Falhas do backend nunca derrubam a requisição: viram um miss.
+
+    Os misses precisam ler do primário (get_db), como o catálogo em catalog_cache.py: logo
+    após uma escrita, uma réplica atrasada guardaria o corpo antigo sob a versão nova, e o
+    usuário não veria a própria escrita até a próxima escrita ou o TTL. A sessão só abre
+    conexão na primeira consulta, então um hit sem consultas não ocupa o pool do primário.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @staticmethod
+    def _request_key(request: Request) -> str:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    async def lookup(self, request: Request, user_id: uuid.UUID, *vary) -> CacheLookup:
+        """
+        Procura a resposta desta requisição para o usuário. `vary` acrescenta à chave o que mais
+        a resposta embute (ex.: a versão do catálogo de exercícios).
+        """
+        user_key = str(user_id)
+        try:
+            # A versão é lida antes da consulta: se uma escrita terminar no meio, a resposta
+            # fica guardada sob a versão antiga e não é servida depois.
+            version = await self.backend.get_version(user_key)
+            key = ":".join([user_key, str(version), *map(str, vary), self._request_key(request)])
+            value = await self.backend.get(key)
+        except Exception:
+            logger.exception("Response cache lookup failed")
+            self.errors += 1
+            self.misses += 1
+            return CacheLookup(self, None, None)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return CacheLookup(self, key, value)
+
+    async def _set(self, key: str, value: bytes) -> None:
+        try:
+            await self.backend.set(key, value)
+            self.stores += 1
+        except Exception:
+            logger.exception("Response cache store failed")
+            self.errors += 1
+
+    async def invalidate_user(self, user_id: uuid.UUID) -> None:
+        """Chamada depois do commit de toda escrita que muda respostas em cache do usuário."""
+        try:
+            await self.backend.bump_version(str(user_id))
+            self.invalidations += 1
+        except Exception:
+            logger.exception("Response cache invalidation failed")
+            self.errors += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "stores": self.stores,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            **self.backend.stats(),
+        }
+
+
+def json_list_body(schema, items) -> bytes:
+    """Corpo JSON de uma lista, validando cada item pelo schema (como o response_model faria)."""
+    return b"[" + b",".join(schema.model_validate(item).model_dump_json().encode() for item in items) + b"]"
+
+
+def _make_backend():
+    if RESPONSE_CACHE_REDIS_URL:
+        if redis_asyncio is None:
+            raise RuntimeError("RESPONSE_CACHE_REDIS_URL is set but the redis package is not installed")
+        return RedisBackend(RESPONSE_CACHE_REDIS_URL, RESPONSE_CACHE_TTL_SECONDS)
+    return InMemoryBackend(RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_make_backend())
@@ -0,0 +1,59 @@
+# routers/analytics.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Date, cast, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date
+import uuid
+
+from models import exercise as models_exercise
+from models import exercise_daily_stat as models_stat
+from schemas import analytics as schemas_analytics
+from database import get_read_db
+from auth_cache import AuthenticatedUser
+from routers.auth import get_current_user
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"],
+)
+
+@router.get("/exercises/{exercise_id}/progress", response_model=schemas_analytics.ExerciseProgress)
+async def read_exercise_progress(
+    exercise_id: uuid.UUID,
+    bucket: str = Query("week", pattern="^(day|week|month)$"),
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    exercise = await db.scalar(select(models_exercise.Exercise.id).where(models_exercise.Exercise.id == exercise_id))
+    if exercise is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
+
+    stat = models_stat.ExerciseDailyStat
+    # bucket já foi validado pelo pattern; como literal, SELECT e GROUP BY usam a mesma expressão.
+    period_start = cast(func.date_trunc(literal_column(f"'{bucket}'"), stat.stat_date), Date).label("period_start")
+    query = select(
+                period_start,
+                func.sum(stat.log_count).label("log_count"),
+                func.sum(stat.set_count).label("set_count"),
+                func.sum(stat.total_volume).label("total_volume"),
+                func.max(stat.top_set_weight).label("top_set_weight"),
+                func.max(stat.estimated_1rm).label("estimated_1rm"),
+            )\
+            .where(stat.user_id == current_user.id)\
+            .where(stat.exercise_id == exercise_id)
+
+    if from_date:
+        query = query.where(stat.stat_date >= from_date)
+    if to_date:
+        query = query.where(stat.stat_date <= to_date)
+
+    rows = (await db.execute(query.group_by(period_start).order_by(period_start))).all()
+
+    return {
+        "exercise_id": exercise_id,
+        "bucket": bucket,
+        "points": [row._asdict() for row in rows],
+    }
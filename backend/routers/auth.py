@@ -1,16 +1,27 @@
 # routers/auth.py
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, UploadFile, File
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from starlette.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+import hashlib
 import os
 import uuid
 
 from models import user as models_user
 from schemas import user as schemas_user
 from database import get_db
-from security import verify_password, get_password_hash, create_access_token, decode_access_token
+from security import (
+    verify_password_async, get_password_hash_async, create_access_token, decode_access_token,
+    PasswordHashingBusy, password_hashing_stats,
+)
+from rate_limit import login_username_limiter, login_ip_limiter
+from image_processing import generate_thumbnails
+from auth_cache import AuthenticatedUser, principal_cache
+from account_deletion import account_deletion_jobs, job_status
 
 router = APIRouter(
     prefix="/auth",
@@ -19,12 +30,18 @@ router = APIRouter(
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        if not cached_user.is_active:
+            raise credentials_exception
+        return cached_user
+
     payload = decode_access_token(token)
     if payload is None:
         raise credentials_exception
@@ -33,45 +50,95 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     if username is None:
         raise credentials_exception
 
-    user = db.query(models_user.User).filter(models_user.User.username == username).first()
+    user = await db.scalar(select(models_user.User).where(models_user.User.username == username))
     if user is None:
         raise credentials_exception
-    return user
+
+    current_user = AuthenticatedUser.from_model(user)
+    principal_cache.set(token, current_user, token_exp=payload.get("exp"))
+    # Contas desativadas (inclusive as em exclusão) não usam mais tokens já emitidos.
+    if not current_user.is_active:
+        raise credentials_exception
+    return current_user
+
+async def _hash_password(password: str) -> str:
+    try:
+        return await get_password_hash_async(password)
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+def _enforce_login_rate_limit(request: Request, username: str) -> None:
+    client_ip = request.client.host if request.client else "unknown"
+    for limiter, key in ((login_ip_limiter, f"ip:{client_ip}"), (login_username_limiter, f"user:{username.lower()}")):
+        allowed, retry_after = limiter.consume(key)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+            )
 
 @router.post("/register", response_model=schemas_user.UserInDB, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_data: schemas_user.UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_user_by_username = db.query(models_user.User).filter(models_user.User.username == user_data.username).first()
-    if db_user_by_username:
+    # Checagem antes do hash (que é caro); username e email numa só consulta.
+    taken_usernames = (await db.scalars(
+        select(models_user.User.username).where(or_(
+            models_user.User.username == user_data.username,
+            models_user.User.email == user_data.email,
+        ))
+    )).all()
+    if user_data.username in taken_usernames:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username already registered")
-
-    db_user_by_email = db.query(models_user.User).filter(models_user.User.email == user_data.email).first()
-    if db_user_by_email:
+    if taken_usernames:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
 
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await _hash_password(user_data.password)
 
-    db_user = models_user.User(
-        username=user_data.username,
-        email=user_data.email,
-        hashed_password=hashed_password,
-        profile_picture_url=str(user_data.profile_picture_url) if user_data.profile_picture_url else None 
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    try:
+        db_user = await db.scalar(
+            insert(models_user.User).values(
+                username=user_data.username,
+                email=user_data.email,
+                hashed_password=hashed_password,
+                profile_picture_url=str(user_data.profile_picture_url) if user_data.profile_picture_url else None
+            ).returning(models_user.User)
+        )
+        await db.commit()
+    except IntegrityError:
+        # Cadastro concorrente com o mesmo username/email entre a checagem e o INSERT.
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username or email already registered")
     return db_user
 
 @router.post("/token", response_model=schemas_user.Token)
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(models_user.User).filter(models_user.User.username == form_data.username).first()
+    _enforce_login_rate_limit(request, form_data.username)
+
+    user = await db.scalar(select(models_user.User).where(models_user.User.username == form_data.username))
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    password_ok = False
+    if user:
+        try:
+            password_ok = await verify_password_async(form_data.password, user.hashed_password)
+        except PasswordHashingBusy:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -85,46 +152,162 @@ async def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=schemas_user.UserInDB) 
-async def read_users_me(current_user: models_user.User = Depends(get_current_user)):
+async def read_users_me(current_user: AuthenticatedUser = Depends(get_current_user)):
     return current_user
 
 @router.put("/me", response_model=schemas_user.UserInDB)
 async def update_users_me(
     user_update_data: schemas_user.UserUpdate,
-    current_user: models_user.User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user), 
+    db: AsyncSession = Depends(get_db)
 ):
     update_data = user_update_data.model_dump(exclude_unset=True, exclude={"password"})
 
     if user_update_data.password is not None:
-        current_user.hashed_password = get_password_hash(user_update_data.password)
+        update_data["hashed_password"] = await _hash_password(user_update_data.password)
 
     if "profile_picture_url" in update_data:
         update_data["profile_picture_url"] = str(update_data["profile_picture_url"])
 
-    for key, value in update_data.items():
-        setattr(current_user, key, value)
+    db_user = await db.scalar(
+        update(models_user.User)\
+            .where(models_user.User.id == current_user.id)\
+            .values(**update_data)\
+            .returning(models_user.User)
+    )
+    if db_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    await db.commit()
+    principal_cache.invalidate_user(db_user.id)
+    return db_user
 
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+@router.delete("/me", response_model=schemas_user.AccountDeletionStatus, status_code=status.HTTP_202_ACCEPTED)
+async def delete_users_me(
+    response: Response,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Desativa a conta e agenda a exclusão dos dados em segundo plano.
+
+    A resposta traz o job; o progresso é consultado em GET /auth/deletion_jobs/{job_id}
+    com o mesmo token. A desativação e o registro do job são um só commit: se o worker cair
+    antes de começar, outro retoma o job (ver account_deletion.py).
+    """
+    db_user = await db.get(models_user.User, current_user.id)
+    if db_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    db_user.is_active = False
+    job = await account_deletion_jobs.create(db, db_user.id, db_user.username)
+    await db.commit()
+    principal_cache.invalidate_user(db_user.id)
+
+    account_deletion_jobs.launch(job.id)
+    response.headers["Location"] = f"/auth/deletion_jobs/{job.id.hex}"
+    return job_status(job)
+
+@router.get("/deletion_jobs/{job_id}", response_model=schemas_user.AccountDeletionStatus)
+async def read_account_deletion_job(
+    job_id: str,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Progresso de uma exclusão de conta, lido do banco (qualquer worker responde). Só o dono
+    consulta: a conta já está desativada e some no fim do job, então vale o token emitido para
+    ela (assinatura e validade), sem exigir conta ativa.
+    """
+    payload = decode_access_token(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deletion job not found")
+    job = await account_deletion_jobs.get(db, job_uuid)
+    # Job de outro usuário responde como inexistente.
+    if job is None or job.username != payload.get("sub"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deletion job not found")
+    return job_status(job)
+
+@router.get("/cache_stats")
+async def read_principal_cache_stats(current_user: AuthenticatedUser = Depends(get_current_user)):
+    return principal_cache.stats()
+
+@router.get("/hashing_stats")
+async def read_password_hashing_stats(current_user: AuthenticatedUser = Depends(get_current_user)):
+    return {
+        "password_hashing": password_hashing_stats(),
+        "login_rate_limit": {
+            "username": login_username_limiter.stats(),
+            "ip": login_ip_limiter.stats(),
+        },
+    }
 
 UPLOAD_DIRECTORY = "static/profile_pics"
 os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
 
+MAX_PROFILE_PICTURE_BYTES = int(os.getenv("MAX_PROFILE_PICTURE_BYTES", str(5 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Folga para os cabeçalhos multipart ao comparar com o Content-Length da requisição.
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
 @router.post("/upload_profile_picture")
-async def upload_profile_picture(file: UploadFile = File(...)):
-    file_extension = file.filename.split(".")[-1] if "." in file.filename else "jpg"
+async def upload_profile_picture(request: Request, file: UploadFile = File(...)):
+    file_extension = file.filename.split(".")[-1].lower() if "." in file.filename else "jpg"
     allowed_extensions = ["jpg", "jpeg", "png", "gif", "bmp", "webp"]
     if not file.content_type.startswith("image/") and file_extension not in allowed_extensions:
         raise HTTPException(status_code=400, detail="File must be a supported image type.")
-    
-    unique_filename = f"{uuid.uuid4()}.{file_extension if file_extension else 'jpg'}"
+    if file_extension not in allowed_extensions:
+        file_extension = "jpg"
+
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the {MAX_PROFILE_PICTURE_BYTES} byte limit."
+    )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_PROFILE_PICTURE_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise too_large
+
+    # Grava em blocos num arquivo temporário enquanto calcula o hash; o nome final é o hash do
+    # conteúdo, então imagens idênticas são armazenadas uma única vez.
+    hasher = hashlib.sha256()
+    size = 0
+    tmp_path = os.path.join(UPLOAD_DIRECTORY, f".upload-{uuid.uuid4().hex}.tmp")
+    buffer = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_PROFILE_PICTURE_BYTES:
+                raise too_large
+            hasher.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(os.remove, tmp_path)
+        raise
+    await run_in_threadpool(buffer.close)
+
+    if size == 0:
+        await run_in_threadpool(os.remove, tmp_path)
+        raise HTTPException(status_code=400, detail="Empty file.")
+
+    content_hash = hasher.hexdigest()[:32]
+    unique_filename = f"{content_hash}.{file_extension}"
     file_path = os.path.join(UPLOAD_DIRECTORY, unique_filename)
+    if await run_in_threadpool(os.path.exists, file_path):
+        await run_in_threadpool(os.remove, tmp_path)
+    else:
+        await run_in_threadpool(os.replace, tmp_path, file_path)
 
-    with open(file_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
+    thumbnails = await generate_thumbnails(file_path, UPLOAD_DIRECTORY, content_hash)
 
-    return {"filename": unique_filename, "url": f"/static/profile_pics/{unique_filename}"}
\ No newline at end of file
+    return {
+        "filename": unique_filename,
+        "url": f"/static/profile_pics/{unique_filename}",
+        "thumbnails": {str(size): f"/static/profile_pics/{name}" for size, name in thumbnails.items()},
+    }
@@ -1,133 +1,527 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, exists, insert, literal, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
 from datetime import date
+import csv
+import io
+import json
+import uuid
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele o modo compacto usa o encoder padrão.
+    orjson = None
 
 from models import exercise_log as models_log
 from models import exercise as models_exercise
 from models import training_block as models_training_block
+from models import daily_activity as models_activity
 from schemas import exercise_log as schemas_log
-from database import get_db
-from models.user import User
+from database import db_now, get_db, get_read_db, read_sessionmaker
+from auth_cache import AuthenticatedUser
 from routers.auth import get_current_user
+from pagination import encode_log_cursor, decode_log_cursor, InvalidCursor
+from aggregates import log_totals, refresh_log_aggregates, set_weight_kg
+from tombstones import record_tombstones
+from response_cache import response_cache, json_list_body
+from catalog_cache import exercise_catalog
 
 router = APIRouter(
     prefix="/exercise_logs",
     tags=["Exercise Logs"],
 )
 
+# Nomes padrão do PostgreSQL para as FKs de exercise_logs (ver migração 0003).
+EXERCISE_FOREIGN_KEY = "exercise_logs_exercise_id_fkey"
+TRAINING_BLOCK_FOREIGN_KEY = "exercise_logs_training_block_id_fkey"
+
+def _missing_reference(error: IntegrityError) -> Optional[str]:
+    """Detalhe do 404 quando a violação foi da FK do exercício ou do bloco; None para qualquer outra."""
+    message = str(error.orig)
+    if EXERCISE_FOREIGN_KEY in message:
+        return "Exercise not found"
+    if TRAINING_BLOCK_FOREIGN_KEY in message:
+        return "Training block not found"
+    # O SQLite não nomeia a FK; lá as escritas são serializadas e o bloco já é conferido no WHERE.
+    if "FOREIGN KEY constraint failed" in message:
+        return "Exercise not found"
+    return None
+
+def _owned_block(training_block_id: uuid.UUID, user_id: uuid.UUID):
+    return exists()\
+        .where(models_training_block.TrainingBlock.id == training_block_id)\
+        .where(models_training_block.TrainingBlock.user_id == user_id)
+
 @router.post("/", response_model=schemas_log.ExerciseLogInDB, status_code=status.HTTP_201_CREATED)
-def create_exercise_log(
+async def create_exercise_log(
     log: schemas_log.ExerciseLogCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    training_block = db.query(models_training_block.TrainingBlock)\
-                    .filter(models_training_block.TrainingBlock.id == log.training_block_id)\
-                    .filter(models_training_block.TrainingBlock.user_id == current_user.id)\
-                    .first()
-    if not training_block:
+    """
+    Um único INSERT ... SELECT ... RETURNING: a linha só é inserida se o bloco for do usuário
+    (condição no WHERE), o exercício é garantido pela FK e o log volta já completo.
+    """
+    log_data = log.model_dump()
+    values = {
+        "id": uuid.uuid4(),
+        **log_data,
+        **log_totals(log_data["sets_reps_data"]),
+        "user_id": current_user.id,
+    }
+    columns = models_log.ExerciseLog.__table__.c
+    # created_at e updated_at pelo relógio do banco, como o default de updated_at (ver database.db_now).
+    row = select(*(literal(value, columns[key].type) for key, value in values.items()), db_now(), db_now())\
+        .where(_owned_block(log.training_block_id, current_user.id))
+    try:
+        db_log = await db.scalar(
+            insert(models_log.ExerciseLog)\
+                .from_select([*values, "created_at", "updated_at"], row)\
+                .returning(models_log.ExerciseLog)
+        )
+    except IntegrityError as error:
+        await db.rollback()
+        detail = _missing_reference(error)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    if db_log is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training block not found")
 
-    exercise = db.query(models_exercise.Exercise).filter(models_exercise.Exercise.id == log.exercise_id).first()
-    if not exercise:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
+    await refresh_log_aggregates(db, current_user.id, [(db_log.exercise_id, db_log.log_date)], [db_log.id])
+    await db.commit()
+    await response_cache.invalidate_user(current_user.id)
+    return db_log
 
-    db_log = models_log.ExerciseLog(
-        **log.model_dump(),
-        user_id=current_user.id
+@router.post("/bulk", response_model=schemas_log.ExerciseLogBulkResult, status_code=status.HTTP_201_CREATED)
+async def create_exercise_logs_bulk(
+    payload: schemas_log.ExerciseLogBulkCreate,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Registra todos os logs de uma sessão de treino de uma vez.
+
+    Blocos e exercícios referenciados são validados com uma consulta cada, e os logs
+    válidos são inseridos num único INSERT multi-linha; os inválidos voltam em `errors`.
+    Se nenhum log for válido, a resposta é 422 com a lista de erros.
+    """
+    training_block_ids = {log.training_block_id for log in payload.logs}
+    exercise_ids = {log.exercise_id for log in payload.logs}
+
+    # FOR KEY SHARE: blocos e exercícios validados não podem ser apagados antes do INSERT
+    # (no SQLite as escritas já são serializadas e a cláusula é omitida).
+    owned_training_block_ids = set((await db.scalars(
+        select(models_training_block.TrainingBlock.id)\
+            .where(models_training_block.TrainingBlock.id.in_(training_block_ids))\
+            .where(models_training_block.TrainingBlock.user_id == current_user.id)\
+            .with_for_update(read=True, key_share=True)
+    )).all())
+    existing_exercise_ids = set((await db.scalars(
+        select(models_exercise.Exercise.id)\
+            .where(models_exercise.Exercise.id.in_(exercise_ids))\
+            .with_for_update(read=True, key_share=True)
+    )).all())
+
+    rows = []
+    errors = []
+    for index, log in enumerate(payload.logs):
+        if log.training_block_id not in owned_training_block_ids:
+            errors.append({"index": index, "detail": "Training block not found"})
+        elif log.exercise_id not in existing_exercise_ids:
+            errors.append({"index": index, "detail": "Exercise not found"})
+        else:
+            log_data = log.model_dump()
+            rows.append({**log_data, **log_totals(log_data["sets_reps_data"]), "user_id": current_user.id})
+
+    if not rows:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=errors)
+
+    try:
+        created = (await db.scalars(
+            insert(models_log.ExerciseLog).returning(models_log.ExerciseLog, sort_by_parameter_order=True),
+            rows
+        )).all()
+    except IntegrityError as error:
+        await db.rollback()
+        detail = _missing_reference(error)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{detail} while saving the batch, try again.")
+    await refresh_log_aggregates(
+        db, current_user.id, [(log.exercise_id, log.log_date) for log in created], [log.id for log in created]
     )
-    db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
-    return db_log
+    await db.commit()
+    await response_cache.invalidate_user(current_user.id)
+
+    return {"created": created, "errors": errors}
+
+def _compact_body(content: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(jsonable_encoder(content)).encode()
+
+def _compact_logs_page(logs) -> dict:
+    """Logs só com ids; exercícios e blocos referenciados aparecem uma vez em `included`."""
+    exercises = {}
+    training_blocks = {}
+    items = []
+    for log in logs:
+        items.append({
+            "id": log.id,
+            "training_block_id": log.training_block_id,
+            "exercise_id": log.exercise_id,
+            "user_id": log.user_id,
+            "log_date": log.log_date,
+            "sets_reps_data": log.sets_reps_data,
+            "set_count": log.set_count,
+            "total_volume_kg": log.total_volume_kg,
+            "top_weight_kg": log.top_weight_kg,
+            "estimated_1rm_kg": log.estimated_1rm_kg,
+            "notes": log.notes,
+            "created_at": log.created_at,
+            "updated_at": log.updated_at,
+        })
+        exercise_key = str(log.exercise_id)
+        if exercise_key not in exercises:
+            exercise = log.exercise
+            exercises[exercise_key] = {
+                "id": exercise.id,
+                "name": exercise.name,
+                "description": exercise.description,
+                "category": exercise.category,
+                "created_at": exercise.created_at,
+                "updated_at": exercise.updated_at,
+            }
+        block_key = str(log.training_block_id)
+        if block_key not in training_blocks:
+            block = log.training_block
+            training_blocks[block_key] = {
+                "id": block.id,
+                "title": block.title,
+                "description": block.description,
+                "color_hex": block.color_hex,
+                "user_id": block.user_id,
+                "created_at": block.created_at,
+                "updated_at": block.updated_at,
+            }
+    return {
+        "logs": items,
+        "included": {"exercises": exercises, "training_blocks": training_blocks},
+    }
 
 @router.get("/", response_model=List[schemas_log.ExerciseLogWithDetails])
-def read_exercise_logs(
-    current_user: User = Depends(get_current_user),
-    training_block_id: Optional[str] = None,
-    exercise_id: Optional[str] = None,
+async def read_exercise_logs(
+    request: Request,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    training_block_id: Optional[uuid.UUID] = None,
+    exercise_id: Optional[uuid.UUID] = None,
     log_date: Optional[date] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    min_top_weight_kg: Optional[float] = Query(None, ge=0),
+    min_volume_kg: Optional[float] = Query(None, ge=0),
+    min_set_count: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=500),
+    view: str = Query("full", pattern="^(full|compact)$"),
+    # Primário, não a réplica: o miss grava sob a versão nova (ver response_cache.py).
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(models_log.ExerciseLog)\
+    """
+    Lista os logs do usuário, do mais recente para o mais antigo.
+
+    A paginação por cursor é preferível a skip: o cabeçalho X-Next-Cursor da resposta
+    deve ser repassado em `cursor` para buscar a página seguinte.
+
+    Com `view=compact` a resposta é `{"logs": [...], "included": {"exercises": {id: ...},
+    "training_blocks": {id: ...}}}`: cada exercício/bloco aparece uma única vez e o corpo é
+    serializado direto, sem validar um ExerciseLogWithDetails por log.
+
+    `min_top_weight_kg`, `min_volume_kg` e `min_set_count` filtram pelas colunas derivadas das
+    séries (pesos em kg), indexadas por usuário.
+
+    As páginas ficam no cache de respostas do usuário até a próxima escrita dele.
+    """
+    try:
+        after = decode_log_cursor(cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    # Os logs embutem exercícios: uma edição no catálogo também invalida a página.
+    cached = await response_cache.lookup(request, current_user.id, exercise_catalog.version)
+    if cached.hit:
+        return cached.response(request)
+
+    query = select(models_log.ExerciseLog)\
             .options(joinedload(models_log.ExerciseLog.exercise))\
             .options(joinedload(models_log.ExerciseLog.training_block))\
-            .filter(models_log.ExerciseLog.user_id == current_user.id) 
+            .where(models_log.ExerciseLog.user_id == current_user.id)
 
     if training_block_id:
-        query = query.filter(models_log.ExerciseLog.training_block_id == training_block_id)
+        query = query.where(models_log.ExerciseLog.training_block_id == training_block_id)
     if exercise_id:
-        query = query.filter(models_log.ExerciseLog.exercise_id == exercise_id)
+        query = query.where(models_log.ExerciseLog.exercise_id == exercise_id)
     if log_date:
-        query = query.filter(models_log.ExerciseLog.log_date == log_date)
+        query = query.where(models_log.ExerciseLog.log_date == log_date)
+    if from_date:
+        query = query.where(models_log.ExerciseLog.log_date >= from_date)
+    if to_date:
+        query = query.where(models_log.ExerciseLog.log_date <= to_date)
+    if min_top_weight_kg is not None:
+        query = query.where(models_log.ExerciseLog.top_weight_kg >= min_top_weight_kg)
+    if min_volume_kg is not None:
+        query = query.where(models_log.ExerciseLog.total_volume_kg >= min_volume_kg)
+    if min_set_count is not None:
+        query = query.where(models_log.ExerciseLog.set_count >= min_set_count)
+
+    sort_key = tuple_(models_log.ExerciseLog.log_date, models_log.ExerciseLog.created_at, models_log.ExerciseLog.id)
+    if after:
+        query = query.where(sort_key < tuple_(*after))
+    elif skip:
+        query = query.offset(skip)
+
+    query = query.order_by(
+        models_log.ExerciseLog.log_date.desc(),
+        models_log.ExerciseLog.created_at.desc(),
+        models_log.ExerciseLog.id.desc()
+    ).limit(limit + 1)
+    logs = (await db.scalars(query)).all()
+
+    headers = {}
+    if len(logs) > limit:
+        logs = logs[:limit]
+        last = logs[-1]
+        headers["X-Next-Cursor"] = encode_log_cursor(last.log_date, last.created_at, last.id)
 
-    logs = query.order_by(models_log.ExerciseLog.log_date.desc(), models_log.ExerciseLog.created_at.desc()).offset(skip).limit(limit).all()
+    if view == "compact":
+        return await cached.store(request, _compact_body(_compact_logs_page(logs)), headers)
+    return await cached.store(request, json_list_body(schemas_log.ExerciseLogWithDetails, logs), headers)
 
-    return logs
+EXPORT_COLUMNS = [
+    "log_id", "log_date", "training_block", "exercise", "set", "reps",
+    "weight", "unit", "weight_kg", "rpe", "set_notes", "log_notes",
+]
+EXPORT_BATCH_SIZE = 500
+
+def _export_rows(row):
+    sets = row.sets_reps_data or [{}]
+    for set_data in sets:
+        yield {
+            "log_id": str(row.id),
+            "log_date": row.log_date.isoformat(),
+            "training_block": row.training_block_title,
+            "exercise": row.exercise_name,
+            "set": set_data.get("set"),
+            "reps": set_data.get("reps"),
+            "weight": set_data.get("weight"),
+            "unit": set_data.get("unit"),
+            "weight_kg": round(set_weight_kg(set_data), 3) if set_data else None,
+            "rpe": set_data.get("rpe"),
+            "set_notes": set_data.get("notes"),
+            "log_notes": row.notes,
+        }
+
+@router.get("/export")
+async def export_exercise_logs(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Exporta todo o histórico do usuário em CSV ou NDJSON, uma linha por série.
+
+    As linhas vêm de um cursor no servidor em lotes de EXPORT_BATCH_SIZE, então a memória
+    usada não cresce com o tamanho do histórico.
+    """
+    query = select(
+                models_log.ExerciseLog.id,
+                models_log.ExerciseLog.log_date,
+                models_log.ExerciseLog.sets_reps_data,
+                models_log.ExerciseLog.notes,
+                models_exercise.Exercise.name.label("exercise_name"),
+                models_training_block.TrainingBlock.title.label("training_block_title"),
+            )\
+            .join(models_exercise.Exercise, models_exercise.Exercise.id == models_log.ExerciseLog.exercise_id)\
+            .join(models_training_block.TrainingBlock, models_training_block.TrainingBlock.id == models_log.ExerciseLog.training_block_id)\
+            .where(models_log.ExerciseLog.user_id == current_user.id)
+    if from_date:
+        query = query.where(models_log.ExerciseLog.log_date >= from_date)
+    if to_date:
+        query = query.where(models_log.ExerciseLog.log_date <= to_date)
+    query = query.order_by(
+        models_log.ExerciseLog.log_date,
+        models_log.ExerciseLog.created_at,
+        models_log.ExerciseLog.id
+    ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    session_factory = await read_sessionmaker()
+
+    async def generate():
+        # Sessão própria: a de get_db pode ser fechada antes do fim do streaming.
+        async with session_factory() as db:
+            result = await db.stream(query)
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+                writer.writeheader()
+                yield buffer.getvalue()
+            async for partition in result.partitions():
+                if export_format == "csv":
+                    buffer = io.StringIO()
+                    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+                    for row in partition:
+                        writer.writerows(_export_rows(row))
+                    yield buffer.getvalue()
+                else:
+                    yield "".join(
+                        json.dumps(item, ensure_ascii=False) + "\n"
+                        for row in partition
+                        for item in _export_rows(row)
+                    )
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="exercise_logs.{export_format}"'}
+    )
+
+@router.get("/calendar", response_model=schemas_log.ExerciseLogCalendar)
+async def read_exercise_log_calendar(
+    year: Optional[int] = Query(None, ge=1, le=9999),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Dias com treino no ano, a partir de daily_activity (no máximo 366 linhas pela chave primária)."""
+    year = year or date.today().year
+    activity = models_activity.DailyActivity
+    rows = (await db.execute(
+        select(
+            activity.activity_date.label("date"),
+            activity.session_count,
+            activity.exercise_count,
+            activity.log_count,
+            activity.set_count,
+            activity.total_volume,
+        )\
+            .where(activity.user_id == current_user.id)\
+            .where(activity.activity_date >= date(year, 1, 1))\
+            .where(activity.activity_date <= date(year, 12, 31))\
+            .order_by(activity.activity_date)
+    )).all()
+    return {"year": year, "days": [row._asdict() for row in rows]}
 
 @router.get("/{log_id}", response_model=schemas_log.ExerciseLogWithDetails)
-def read_exercise_log(
-    log_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def read_exercise_log(
+    log_id: uuid.UUID,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    db_log = db.query(models_log.ExerciseLog)\
-                .options(joinedload(models_log.ExerciseLog.exercise))\
-                .options(joinedload(models_log.ExerciseLog.training_block))\
-                .filter(models_log.ExerciseLog.id == log_id)\
-                .filter(models_log.ExerciseLog.user_id == current_user.id)\
-                .first()
+    db_log = await db.scalar(
+        select(models_log.ExerciseLog)\
+            .options(joinedload(models_log.ExerciseLog.exercise))\
+            .options(joinedload(models_log.ExerciseLog.training_block))\
+            .where(models_log.ExerciseLog.id == log_id)\
+            .where(models_log.ExerciseLog.user_id == current_user.id)
+    )
     if db_log is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise log not found")
     return db_log
 
 @router.put("/{log_id}", response_model=schemas_log.ExerciseLogInDB)
-def update_exercise_log(
-    log_id: str,
+async def update_exercise_log(
+    log_id: uuid.UUID,
     log_update: schemas_log.ExerciseLogUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    db_log = db.query(models_log.ExerciseLog)\
-            .filter(models_log.ExerciseLog.id == log_id)\
-            .filter(models_log.ExerciseLog.user_id == current_user.id)\
-            .first()
-    if db_log is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise log not found")
+    """
+    UPDATE ... RETURNING com o dono (e o novo bloco, se houver) no WHERE. Só quando o log muda
+    de exercício ou de dia a chave antiga dos agregados é lida antes, com a linha travada.
+    """
+    update_data = log_update.model_dump(exclude_unset=True)
+    if "sets_reps_data" in update_data:
+        update_data.update(log_totals(update_data["sets_reps_data"]))
 
-    if log_update.training_block_id and log_update.training_block_id != db_log.training_block_id:
-        new_training_block = db.query(models_training_block.TrainingBlock)\
-                            .filter(models_training_block.TrainingBlock.id == log_update.training_block_id)\
-                            .filter(models_training_block.TrainingBlock.user_id == current_user.id)\
-                            .first()
-        if not new_training_block:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="New training block not found or not owned by user.")
+    keys = []
+    if "exercise_id" in update_data or "log_date" in update_data:
+        previous_key = (await db.execute(
+            select(models_log.ExerciseLog.exercise_id, models_log.ExerciseLog.log_date)\
+                .where(models_log.ExerciseLog.id == log_id)\
+                .where(models_log.ExerciseLog.user_id == current_user.id)\
+                .with_for_update()
+        )).one_or_none()
+        if previous_key is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise log not found")
+        keys.append(tuple(previous_key))
 
-    update_data = log_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_log, key, value)
+    statement = update(models_log.ExerciseLog)\
+        .where(models_log.ExerciseLog.id == log_id)\
+        .where(models_log.ExerciseLog.user_id == current_user.id)\
+        .values(**update_data)\
+        .returning(models_log.ExerciseLog)
+    if log_update.training_block_id:
+        statement = statement.where(_owned_block(log_update.training_block_id, current_user.id))
+    try:
+        db_log = await db.scalar(statement)
+    except IntegrityError as error:
+        await db.rollback()
+        detail = _missing_reference(error)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+    if db_log is None:
+        # Falhou o WHERE; só aqui vale uma consulta a mais para dizer qual condição.
+        log_exists = log_update.training_block_id and await db.scalar(
+            select(models_log.ExerciseLog.id)\
+                .where(models_log.ExerciseLog.id == log_id)\
+                .where(models_log.ExerciseLog.user_id == current_user.id)
+        )
+        if log_exists:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="New training block not found or not owned by user.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise log not found")
 
-    db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
+    keys.append((db_log.exercise_id, db_log.log_date))
+    await refresh_log_aggregates(db, current_user.id, keys, [db_log.id])
+    await db.commit()
+    await response_cache.invalidate_user(current_user.id)
     return db_log
 
 @router.delete("/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_exercise_log(
-    log_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def delete_exercise_log(
+    log_id: uuid.UUID,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    db_log = db.query(models_log.ExerciseLog)\
-            .filter(models_log.ExerciseLog.id == log_id)\
-            .filter(models_log.ExerciseLog.user_id == current_user.id)\
-            .first()
-    if db_log is None:
+    owned_log = (
+        models_log.ExerciseLog.id == log_id,
+        models_log.ExerciseLog.user_id == current_user.id,
+    )
+    # O tombstone precisa ler a linha antes do DELETE; se ela não existir, nada é inserido
+    # e a transação é descartada com o 404.
+    await record_tombstones(
+        db, "exercise_logs",
+        select(models_log.ExerciseLog.user_id, models_log.ExerciseLog.id).where(*owned_log)
+    )
+    deleted = (await db.execute(
+        delete(models_log.ExerciseLog)\
+            .where(*owned_log)\
+            .returning(models_log.ExerciseLog.exercise_id, models_log.ExerciseLog.log_date)\
+            .execution_options(synchronize_session=False)
+    )).one_or_none()
+    if deleted is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise log not found")
 
-    db.delete(db_log)
-    db.commit()
-    return {"message": "Exercise log deleted successfully"}
\ No newline at end of file
+    await refresh_log_aggregates(db, current_user.id, [tuple(deleted)], [log_id])
+    await db.commit()
+    await response_cache.invalidate_user(current_user.id)
+    return {"message": "Exercise log deleted successfully"}
@@ -1,120 +1,178 @@
 # routers/exercises.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import delete, func, insert, literal, literal_column, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+import uuid
 
 from models import exercise as models_exercise
+from models import training_block_exercise as models_tbe
 from schemas import exercise as schemas_exercise
-from database import get_db
+from database import get_db, get_read_db
+from auth_cache import AuthenticatedUser
+from routers.auth import get_current_user
+from catalog_cache import exercise_catalog, cached_json_response
 
 router = APIRouter(
-    prefix="/exercises",  
-    tags=["Exercises"],   
+    prefix="/exercises",
+    tags=["Exercises"],
 )
 
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def exercise_search_clauses(term: str):
+    """
+    (filtro, rank) da busca ranqueada e tolerante a erros: full-text + trigramas
+    (word_similarity), todos indexados. Só PostgreSQL.
+    """
+    # A configuração vai como constante, como em EXERCISE_SEARCH_VECTOR: um parâmetro ligado
+    # chegaria como $1::VARCHAR pelo asyncpg e não há plainto_tsquery(varchar, text).
+    ts_query = func.plainto_tsquery(literal_column("'simple'"), term)
+    rank = func.greatest(
+        func.word_similarity(term, models_exercise.Exercise.name),
+        func.ts_rank(models_exercise.EXERCISE_SEARCH_VECTOR, ts_query)
+    )
+    condition = or_(
+        models_exercise.EXERCISE_SEARCH_VECTOR.op("@@")(ts_query),
+        literal(term).op("<%")(models_exercise.Exercise.name),
+        models_exercise.Exercise.name.ilike(f"%{_escape_like(term)}%", escape="\\")
+    )
+    return condition, rank
+
 @router.post("/", response_model=schemas_exercise.ExerciseInDB, status_code=status.HTTP_201_CREATED)
-def create_exercise(
+async def create_exercise(
     exercise: schemas_exercise.ExerciseCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    existing_exercise = db.query(models_exercise.Exercise).filter(
-        models_exercise.Exercise.name.ilike(exercise.name) 
-    ).first()
-
-    if existing_exercise:
+    # O índice único ix_exercises_name_lower decide o conflito de nome, sem consulta prévia.
+    try:
+        db_exercise = await db.scalar(
+            insert(models_exercise.Exercise).values(**exercise.model_dump()).returning(models_exercise.Exercise)
+        )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, 
+            status_code=status.HTTP_409_CONFLICT,
             detail="Exercise with this name already exists."
         )
-
-    db_exercise = models_exercise.Exercise(**exercise.model_dump())
-    db.add(db_exercise)
-    db.commit()
-    db.refresh(db_exercise)
+    exercise_catalog.invalidate()
     return db_exercise
 
 @router.get("/", response_model=List[schemas_exercise.ExerciseInDB])
-def read_exercises(
-    skip: int = 0,
-    limit: int = 100,
-    category: Optional[str] = None, 
-    search: Optional[str] = None,   
-    db: Session = Depends(get_db)
+async def read_exercises(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0),
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(models_exercise.Exercise)
+    if not category and not (search and search.strip()):
+        body, etag = await exercise_catalog.get_list(db, skip, limit)
+        return cached_json_response(request, body, etag)
+
+    query = select(models_exercise.Exercise)
 
     if category:
-        query = query.filter(models_exercise.Exercise.category.ilike(f"%{category}%")) 
+        query = query.where(models_exercise.Exercise.category.ilike(f"%{category}%"))
 
-    if search:
-        query = query.filter(models_exercise.Exercise.name.ilike(f"%{search}%")) 
+    if search and search.strip():
+        condition, rank = exercise_search_clauses(search.strip())
+        query = query.where(condition).order_by(rank.desc(), models_exercise.Exercise.name)
+    else:
+        query = query.order_by(models_exercise.Exercise.name)
 
-    exercises = query.offset(skip).limit(limit).all()
-    print(exercises)
+    exercises = (await db.scalars(query.offset(skip).limit(limit))).all()
     return exercises
 
+@router.get("/autocomplete", response_model=List[schemas_exercise.ExerciseSuggestion])
+async def autocomplete_exercises(
+    q: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db)
+):
+    prefix = _escape_like(q.strip().lower())
+    suggestions = (await db.execute(
+        select(models_exercise.Exercise.id, models_exercise.Exercise.name, models_exercise.Exercise.category)\
+            .where(func.lower(models_exercise.Exercise.name).like(f"{prefix}%", escape="\\"))\
+            .order_by(func.lower(models_exercise.Exercise.name))\
+            .limit(limit)
+    )).all()
+    return suggestions
+
 @router.get("/{exercise_id}", response_model=schemas_exercise.ExerciseInDB)
-def read_exercise(
-    exercise_id: str, 
-    db: Session = Depends(get_db)
+async def read_exercise(
+    request: Request,
+    exercise_id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    db_exercise = db.query(models_exercise.Exercise).filter(models_exercise.Exercise.id == exercise_id).first()
-    if db_exercise is None:
+    cached = await exercise_catalog.get_item(db, exercise_id)
+    if cached is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
-    return db_exercise
+    body, etag = cached
+    return cached_json_response(request, body, etag)
 
 @router.put("/{exercise_id}", response_model=schemas_exercise.ExerciseInDB)
-def update_exercise(
-    exercise_id: str,
+async def update_exercise(
+    exercise_id: uuid.UUID,
     exercise_update: schemas_exercise.ExerciseUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_exercise = db.query(models_exercise.Exercise).filter(models_exercise.Exercise.id == exercise_id).first()
-    if db_exercise is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
-
-    if exercise_update.name is not None and exercise_update.name != db_exercise.name:
-        existing_exercise = db.query(models_exercise.Exercise).filter(
-            models_exercise.Exercise.name.ilike(exercise_update.name)
-        ).first()
-        if existing_exercise and existing_exercise.id != db_exercise.id:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Another exercise with this name already exists."
-            )
-
-    update_data = exercise_update.model_dump(exclude_unset=True) 
-    for key, value in update_data.items():
-        setattr(db_exercise, key, value)
-
-    db.add(db_exercise)
-    db.commit()
-    db.refresh(db_exercise)
+    try:
+        db_exercise = await db.scalar(
+            update(models_exercise.Exercise)\
+                .where(models_exercise.Exercise.id == exercise_id)\
+                .values(**exercise_update.model_dump(exclude_unset=True))\
+                .returning(models_exercise.Exercise)
+        )
+        if db_exercise is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another exercise with this name already exists."
+        )
+    exercise_catalog.invalidate()
     return db_exercise
 
 @router.delete("/{exercise_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_exercise(
-    exercise_id: str,
-    db: Session = Depends(get_db)
+async def delete_exercise(
+    exercise_id: uuid.UUID,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    db_exercise = db.query(models_exercise.Exercise).filter(models_exercise.Exercise.id == exercise_id).first()
-    if db_exercise is None:
+    """
+    Um único DELETE, sem carregar vínculos nem logs: exercício ainda usado em algum bloco,
+    log ou agregado viola a FK (sem cascade) e vira 409.
+    """
+    try:
+        deleted_id = await db.scalar(
+            delete(models_exercise.Exercise)\
+                .where(models_exercise.Exercise.id == exercise_id)\
+                .returning(models_exercise.Exercise.id)
+        )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Exercise is still used by training blocks or logs.")
+    if deleted_id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
-
-
-    db.delete(db_exercise)
-    db.commit()
-    return {"message": "Exercise deleted successfully"} 
+    exercise_catalog.invalidate()
+    return {"message": "Exercise deleted successfully"}
 
 @router.get("/by_training_block/{training_block_id}", response_model=List[schemas_exercise.ExerciseInDB])
-def get_exercises_by_training_block(
-    training_block_id: str,
-    db: Session = Depends(get_db)
+async def get_exercises_by_training_block(
+    training_block_id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    exercises = db.query(models_exercise.Exercise)\
-                  .join(models_exercise.TrainingBlockExercise)\
-                  .filter(models_exercise.TrainingBlockExercise.training_block_id == training_block_id)\
-                  .all()
-    if not exercises:
-        pass
-    return exercises
\ No newline at end of file
+    exercises = (await db.scalars(
+        select(models_exercise.Exercise)\
+            .join(models_tbe.TrainingBlockExercise)\
+            .where(models_tbe.TrainingBlockExercise.training_block_id == training_block_id)
+    )).all()
+    return exercises
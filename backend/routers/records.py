@@ -0,0 +1,47 @@
+# routers/records.py
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import uuid
+
+from models import exercise as models_exercise
+from models import personal_record as models_record
+from schemas import record as schemas_record
+from database import get_read_db
+from auth_cache import AuthenticatedUser
+from routers.auth import get_current_user
+
+router = APIRouter(
+    prefix="/records",
+    tags=["Personal Records"],
+)
+
+@router.get("/", response_model=List[schemas_record.PersonalRecord])
+async def read_personal_records(
+    exercise_id: Optional[uuid.UUID] = None,
+    reps: Optional[int] = None,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Recordes já mantidos na escrita: leitura pela chave primária (usuário, exercício, reps).
+    record = models_record.PersonalRecord
+    query = select(
+                record.exercise_id,
+                models_exercise.Exercise.name.label("exercise_name"),
+                record.reps,
+                record.weight_kg,
+                record.estimated_1rm,
+                record.achieved_on,
+                record.exercise_log_id,
+            )\
+            .join(models_exercise.Exercise, models_exercise.Exercise.id == record.exercise_id)\
+            .where(record.user_id == current_user.id)
+
+    if exercise_id:
+        query = query.where(record.exercise_id == exercise_id)
+    if reps is not None:
+        query = query.where(record.reps == reps)
+
+    rows = (await db.execute(query.order_by(models_exercise.Exercise.name, record.reps))).all()
+    return [row._asdict() for row in rows]
@@ -0,0 +1,146 @@
+# routers/sync.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Select, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime, timedelta
+import os
+
+from models import training_block as models_training_block
+from models import training_block_exercise as models_tbe
+from models import exercise_log as models_log
+from models import sync_tombstone as models_tombstone
+from schemas import sync as schemas_sync
+from database import DB_APPLICATION_NAME, db_now, get_db
+from auth_cache import AuthenticatedUser
+from routers.auth import get_current_user
+from pagination import encode_sync_cursor, decode_sync_cursor, InvalidCursor
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["Sync"],
+)
+
+# updated_at e deleted_at vêm do relógio do banco (database.db_now), no PostgreSQL o início da
+# transação que escreve. Uma linha ainda invisível para esta leitura pertence a uma transação
+# em andamento agora ou que começará depois; por isso o watermark é o início da transação
+# aberta mais antiga da API (ou now()), sem depender de relógios nem de quanto o commit
+# demora. Só contam as conexões da própria API (application_name, ver database.py) com
+# transação aberta: consultas analíticas, autovacuum e sessões de outros sistemas não prendem
+# o watermark. E ele nunca recua mais que SYNC_WATERMARK_MAX_LAG_SECONDS: uma sessão esquecida
+# em transação não faz todo cliente baixar tudo de novo; escritas da API precisam terminar
+# antes disso (statement_timeout / idle_in_transaction_session_timeout menores que o limite).
+# A busca usa >=: as linhas no limite voltam na próxima chamada e o cliente, que as aplica
+# como upsert, só as recebe de novo.
+SYNC_WATERMARK_MAX_LAG_SECONDS = float(os.getenv("SYNC_WATERMARK_MAX_LAG_SECONDS", "60"))
+SYNC_WATERMARK_QUERY = text(
+    "SELECT least(now(), greatest(min(xact_start), now() - make_interval(secs => :max_lag))) "
+    "FROM pg_stat_activity "
+    "WHERE datname = current_database() AND application_name = :application_name AND state <> 'idle'"
+)
+# SQLite (benchmark): não há pg_stat_activity; o watermark recua esta margem a partir da hora
+# do banco, supondo que nenhuma transação leve mais que isso entre gravar e fazer commit.
+SYNC_WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+async def _sync_watermark(db: AsyncSession) -> datetime:
+    """Lido antes dos dados: tudo com carimbo menor já está visível para as consultas seguintes."""
+    if db.bind.dialect.name == "postgresql":
+        return await db.scalar(
+            SYNC_WATERMARK_QUERY,
+            {"max_lag": SYNC_WATERMARK_MAX_LAG_SECONDS, "application_name": DB_APPLICATION_NAME},
+        )
+    return await db.scalar(select(db_now())) - SYNC_WATERMARK_OVERLAP
+
+
+def _changes_page(query: Select, stamp, row_id, since: Optional[datetime], after, limit: int) -> Select:
+    """Uma página de `query` em ordem de (carimbo, id), a partir da chave `after` (keyset)."""
+    if since is not None:
+        query = query.where(stamp >= since)
+    if after is not None:
+        query = query.where(tuple_(stamp, row_id) > tuple_(*after))
+    # Uma linha a mais só para saber se há próxima página.
+    return query.order_by(stamp, row_id).limit(limit + 1)
+
+@router.get("/", response_model=schemas_sync.SyncChanges)
+async def read_changes(
+    since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=2000),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    # Primário: numa réplica atrasada o watermark ficaria à frente dos dados lidos.
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Blocos, vínculos e logs do usuário alterados depois de `since`, mais as exclusões
+    (tombstones). Sem `since`, devolve tudo (sincronização completa, sem tombstones).
+
+    Cada coleção vem em páginas de até `limit` linhas, ordenadas por (carimbo, id). Enquanto
+    houver `next_cursor`, o cliente repete a chamada com o mesmo `since` e `cursor=next_cursor`;
+    depois da última página, envia o `watermark` recebido como `since` na próxima sincronização.
+    """
+    positions = {}
+    if cursor is not None:
+        try:
+            watermark, positions = decode_sync_cursor(cursor)
+        except InvalidCursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    else:
+        watermark = await _sync_watermark(db)
+    if since is not None:
+        # Sem fuso, `since` é hora local. No PostgreSQL a comparação é entre instantes
+        # (timestamptz); no SQLite os carimbos são texto em hora local, sem fuso.
+        since = since.astimezone()
+        if db.bind.dialect.name != "postgresql":
+            since = since.replace(tzinfo=None)
+
+    tombstone = models_tombstone.SyncTombstone
+    collections = [
+        (
+            "training_blocks",
+            select(models_training_block.TrainingBlock)\
+                .where(models_training_block.TrainingBlock.user_id == current_user.id),
+            models_training_block.TrainingBlock.updated_at, models_training_block.TrainingBlock.id,
+        ),
+        (
+            "training_block_exercises",
+            select(models_tbe.TrainingBlockExercise)\
+                .join(models_training_block.TrainingBlock, models_training_block.TrainingBlock.id == models_tbe.TrainingBlockExercise.training_block_id)\
+                .where(models_training_block.TrainingBlock.user_id == current_user.id),
+            models_tbe.TrainingBlockExercise.updated_at, models_tbe.TrainingBlockExercise.id,
+        ),
+        (
+            "exercise_logs",
+            select(models_log.ExerciseLog).where(models_log.ExerciseLog.user_id == current_user.id),
+            models_log.ExerciseLog.updated_at, models_log.ExerciseLog.id,
+        ),
+    ]
+    if since is not None:
+        collections.append((
+            "tombstones",
+            select(tombstone.table_name.label("table"), tombstone.row_id.label("id"), tombstone.deleted_at)\
+                .where(tombstone.user_id == current_user.id),
+            tombstone.deleted_at, tombstone.row_id,
+        ))
+
+    changes = {"watermark": watermark, "full": since is None, "tombstones": []}
+    next_positions = {}
+    for name, query, stamp, row_id in collections:
+        # Na continuação, coleção fora do cursor já foi entregue por inteiro.
+        if cursor is not None and name not in positions:
+            changes[name] = []
+            continue
+        page = _changes_page(query, stamp, row_id, since, positions.get(name), limit)
+        if name == "tombstones":
+            rows = [row._asdict() for row in (await db.execute(page)).all()]
+            key = lambda row: (row["deleted_at"], row["id"])
+        else:
+            rows = (await db.scalars(page)).all()
+            key = lambda row: (row.updated_at, row.id)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_positions[name] = key(rows[-1])
+        changes[name] = rows
+
+    changes["next_cursor"] = encode_sync_cursor(watermark, next_positions) if next_positions else None
+    return changes
@@ -1,98 +1,244 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List
+import uuid
 
 from models import training_block_exercise as models_tbe
 from models import training_block as models_training_block
-from models import exercise as models_exercise
 from schemas import training_block_exercise as schemas_tbe
-from database import get_db
+from database import db_now, get_db, get_read_db
+from auth_cache import AuthenticatedUser
+from routers.auth import get_current_user
+from tombstones import record_tombstones
+from response_cache import response_cache, json_list_body
+from catalog_cache import exercise_catalog
 
 router = APIRouter(
     prefix="/training_block_exercises",
     tags=["Training Block Exercises"],
 )
 
+BLOCK_EXERCISE_CONSTRAINT = "uq_training_block_exercises_block_exercise"
+
+def _is_duplicate_exercise(error: IntegrityError) -> bool:
+    """True se a violação foi da unicidade (bloco, exercício), e não da posição no bloco."""
+    message = str(error.orig)
+    # PostgreSQL cita o nome da constraint; SQLite cita as colunas.
+    return BLOCK_EXERCISE_CONSTRAINT in message or "training_block_exercises.exercise_id" in message
+
+def _is_missing_exercise(error: IntegrityError) -> bool:
+    """True se a violação foi da FK para exercises (exercício inexistente)."""
+    message = str(error.orig).lower()
+    # PostgreSQL cita a constraint da FK; SQLite só informa que uma FK falhou.
+    return "foreign key" in message
+
+def _owned_block_ids(user_id: uuid.UUID):
+    """Subconsulta dos blocos do usuário, para pôr o dono no WHERE das escritas nos vínculos."""
+    return select(models_training_block.TrainingBlock.id).where(models_training_block.TrainingBlock.user_id == user_id)
+
+async def _block_owner_id(db: AsyncSession, training_block_id: uuid.UUID) -> uuid.UUID:
+    """Dono do bloco, cuja versão do cache de respostas muda a cada escrita nos vínculos."""
+    return await db.scalar(
+        select(models_training_block.TrainingBlock.user_id).where(models_training_block.TrainingBlock.id == training_block_id)
+    )
+
 @router.post("/", response_model=schemas_tbe.TrainingBlockExerciseInDB, status_code=status.HTTP_201_CREATED)
-def add_exercise_to_training_block(
+async def add_exercise_to_training_block(
     tbe: schemas_tbe.TrainingBlockExerciseCreate,
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    training_block = db.query(models_training_block.TrainingBlock).filter(models_training_block.TrainingBlock.id == tbe.training_block_id).first()
-    if not training_block:
+    # Ocupação das posições de um bloco do usuário numa só consulta; sem linha, o bloco não existe (ou é alheio).
+    block = (await db.execute(
+        select(
+            func.max(models_tbe.TrainingBlockExercise.order_in_block).label("max_order"),
+            func.count(models_tbe.TrainingBlockExercise.id).filter(
+                models_tbe.TrainingBlockExercise.order_in_block == tbe.order_in_block
+            ).label("order_taken"),
+        )
+            .select_from(models_training_block.TrainingBlock)
+            .outerjoin(models_tbe.TrainingBlockExercise, models_tbe.TrainingBlockExercise.training_block_id == models_training_block.TrainingBlock.id)
+            .where(models_training_block.TrainingBlock.id == tbe.training_block_id)
+            .where(models_training_block.TrainingBlock.user_id == current_user.id)
+            .group_by(models_training_block.TrainingBlock.id)
+    )).one_or_none()
+    if block is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training block not found")
 
-    exercise = db.query(models_exercise.Exercise).filter(models_exercise.Exercise.id == tbe.exercise_id).first()
-    if not exercise:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
-
-    existing_tbe = db.query(models_tbe.TrainingBlockExercise).filter(
-        models_tbe.TrainingBlockExercise.training_block_id == tbe.training_block_id,
-        models_tbe.TrainingBlockExercise.exercise_id == tbe.exercise_id
-    ).first()
-    if existing_tbe:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Exercise already exists in this training block.")
-
-    db_tbe = models_tbe.TrainingBlockExercise(**tbe.model_dump())
-    db.add(db_tbe)
-    db.commit()
-    db.refresh(db_tbe)
+    values = tbe.model_dump()
+    # Sem posição, o exercício vai para o fim do bloco; posição explícita já ocupada é conflito.
+    if tbe.order_in_block is None:
+        values["order_in_block"] = 0 if block.max_order is None else block.max_order + 1
+    elif block.order_taken:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Position already taken in this training block; omit order_in_block to append or use PUT /training_block_exercises/by_block/{training_block_id}/order to reorder."
+        )
+    try:
+        db_tbe = await db.scalar(
+            insert(models_tbe.TrainingBlockExercise).values(**values).returning(models_tbe.TrainingBlockExercise)
+        )
+        await db.commit()
+    except IntegrityError as error:
+        await db.rollback()
+        # A FK e a unicidade (bloco, exercício) substituem as consultas prévias, que tinham corrida entre requisições.
+        if _is_missing_exercise(error):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
+        if _is_duplicate_exercise(error):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Exercise already exists in this training block.")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Position already taken in this training block, try again.")
+    await response_cache.invalidate_user(current_user.id)
     return db_tbe
 
 @router.get("/by_block/{training_block_id}", response_model=List[schemas_tbe.TrainingBlockExerciseWithDetails])
-def get_exercises_for_training_block(
-    training_block_id: str,
-    db: Session = Depends(get_db)
+async def get_exercises_for_training_block(
+    training_block_id: uuid.UUID,
+    request: Request,
+    # Primário, não a réplica: o miss grava sob a versão nova (ver response_cache.py).
+    db: AsyncSession = Depends(get_db)
 ):
-    training_block = db.query(models_training_block.TrainingBlock).filter(models_training_block.TrainingBlock.id == training_block_id).first()
-    if not training_block:
+    owner_id = await _block_owner_id(db, training_block_id)
+    if owner_id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training block not found.")
 
-    block_exercises = db.query(models_tbe.TrainingBlockExercise)\
-                        .options(joinedload(models_tbe.TrainingBlockExercise.exercise))\
-                        .filter(models_tbe.TrainingBlockExercise.training_block_id == training_block_id)\
-                        .order_by(models_tbe.TrainingBlockExercise.order_in_block)\
-                        .all()
+    # Os vínculos embutem exercícios: uma edição no catálogo também invalida a resposta.
+    cached = await response_cache.lookup(request, owner_id, exercise_catalog.version)
+    if cached.hit:
+        return cached.response(request)
+
+    block_exercises = (await db.scalars(
+        select(models_tbe.TrainingBlockExercise)\
+            .options(joinedload(models_tbe.TrainingBlockExercise.exercise))\
+            .where(models_tbe.TrainingBlockExercise.training_block_id == training_block_id)\
+            .order_by(models_tbe.TrainingBlockExercise.order_in_block)
+    )).all()
+    return await cached.store(request, json_list_body(schemas_tbe.TrainingBlockExerciseWithDetails, block_exercises))
+
+@router.put("/by_block/{training_block_id}/order", response_model=List[schemas_tbe.TrainingBlockExerciseWithDetails])
+async def reorder_training_block_exercises(
+    training_block_id: uuid.UUID,
+    reorder: schemas_tbe.TrainingBlockExerciseReorder,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Aplica a ordem completa dos exercícios do bloco num único UPDATE, na mesma transação.
+
+    `ordered_ids` deve conter cada vínculo do bloco exatamente uma vez; a posição na lista
+    vira o novo order_in_block. Só o dono do bloco pode reordená-lo.
+    """
+    if len(set(reorder.ordered_ids)) != len(reorder.ordered_ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ordered_ids contains duplicates.")
+
+    # O dono vai no WHERE do SELECT que trava os vínculos: bloco alheio não trava nada.
+    current_ids = set((await db.scalars(
+        select(models_tbe.TrainingBlockExercise.id)\
+            .join(models_training_block.TrainingBlock, models_training_block.TrainingBlock.id == models_tbe.TrainingBlockExercise.training_block_id)\
+            .where(models_tbe.TrainingBlockExercise.training_block_id == training_block_id)\
+            .where(models_training_block.TrainingBlock.user_id == current_user.id)\
+            .with_for_update(of=models_tbe.TrainingBlockExercise)
+    )).all())
+    if not current_ids:
+        training_block = await db.scalar(
+            select(models_training_block.TrainingBlock.id)\
+                .where(models_training_block.TrainingBlock.id == training_block_id)\
+                .where(models_training_block.TrainingBlock.user_id == current_user.id)
+        )
+        if not training_block:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training block not found.")
+    if current_ids != set(reorder.ordered_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ordered_ids must list every exercise of the training block exactly once."
+        )
+
+    new_order = {tbe_id: position for position, tbe_id in enumerate(reorder.ordered_ids)}
+    await db.execute(
+        update(models_tbe.TrainingBlockExercise)\
+            .where(models_tbe.TrainingBlockExercise.training_block_id == training_block_id)\
+            .values(
+                order_in_block=case(new_order, value=models_tbe.TrainingBlockExercise.id),
+                updated_at=db_now()
+            )\
+            .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await response_cache.invalidate_user(current_user.id)
+
+    block_exercises = (await db.scalars(
+        select(models_tbe.TrainingBlockExercise)\
+            .options(joinedload(models_tbe.TrainingBlockExercise.exercise))\
+            .where(models_tbe.TrainingBlockExercise.training_block_id == training_block_id)\
+            .order_by(models_tbe.TrainingBlockExercise.order_in_block)\
+            .execution_options(populate_existing=True)
+    )).all()
     return block_exercises
 
 @router.get("/{tbe_id}", response_model=schemas_tbe.TrainingBlockExerciseInDB)
-def get_training_block_exercise(
-    tbe_id: str,
-    db: Session = Depends(get_db)
+async def get_training_block_exercise(
+    tbe_id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    db_tbe = db.query(models_tbe.TrainingBlockExercise).filter(models_tbe.TrainingBlockExercise.id == tbe_id).first()
+    db_tbe = await db.scalar(select(models_tbe.TrainingBlockExercise).where(models_tbe.TrainingBlockExercise.id == tbe_id))
     if not db_tbe:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training Block Exercise link not found")
     return db_tbe
 
 @router.put("/{tbe_id}", response_model=schemas_tbe.TrainingBlockExerciseInDB)
-def update_training_block_exercise(
-    tbe_id: str,
+async def update_training_block_exercise(
+    tbe_id: uuid.UUID,
     tbe_update: schemas_tbe.TrainingBlockExerciseUpdate,
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    db_tbe = db.query(models_tbe.TrainingBlockExercise).filter(models_tbe.TrainingBlockExercise.id == tbe_id).first()
-    if not db_tbe:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training Block Exercise link not found")
-
-    update_data = tbe_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_tbe, key, value)
-
-    db.add(db_tbe)
-    db.commit()
-    db.refresh(db_tbe)
+    try:
+        # O dono vai no WHERE: vínculo de bloco alheio não casa e vira 404.
+        db_tbe = await db.scalar(
+            update(models_tbe.TrainingBlockExercise)\
+                .where(models_tbe.TrainingBlockExercise.id == tbe_id)\
+                .where(models_tbe.TrainingBlockExercise.training_block_id.in_(_owned_block_ids(current_user.id)))\
+                .values(**tbe_update.model_dump(exclude_unset=True))\
+                .returning(models_tbe.TrainingBlockExercise)
+        )
+        if not db_tbe:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training Block Exercise link not found")
+        await db.commit()
+    except IntegrityError as error:
+        await db.rollback()
+        if _is_duplicate_exercise(error):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Exercise already exists in this training block.")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Position already taken in this training block; use PUT /training_block_exercises/by_block/{training_block_id}/order to reorder."
+        )
+    await response_cache.invalidate_user(current_user.id)
     return db_tbe
 
 @router.delete("/{tbe_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_training_block_exercise(
-    tbe_id: str,
-    db: Session = Depends(get_db)
+async def delete_training_block_exercise(
+    tbe_id: uuid.UUID,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    db_tbe = db.query(models_tbe.TrainingBlockExercise).filter(models_tbe.TrainingBlockExercise.id == tbe_id).first()
-    if not db_tbe:
+    owned = (
+        (models_tbe.TrainingBlockExercise.id == tbe_id)
+        & models_tbe.TrainingBlockExercise.training_block_id.in_(_owned_block_ids(current_user.id))
+    )
+    # O tombstone sai do mesmo filtro do DELETE: vínculo alheio não gera tombstone nem é apagado.
+    await record_tombstones(
+        db, "training_block_exercises",
+        select(literal(current_user.id, models_training_block.TrainingBlock.user_id.type), models_tbe.TrainingBlockExercise.id)\
+            .where(owned)
+    )
+    deleted_id = await db.scalar(
+        delete(models_tbe.TrainingBlockExercise).where(owned).returning(models_tbe.TrainingBlockExercise.id)
+    )
+    if deleted_id is None:
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training Block Exercise link not found")
-
-    db.delete(db_tbe)
-    db.commit()
-    return {"message": "Training Block Exercise link deleted successfully"}
\ No newline at end of file
+    await db.commit()
+    await response_cache.invalidate_user(current_user.id)
+    return {"message": "Training Block Exercise link deleted successfully"}
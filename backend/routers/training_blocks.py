@@ -1,97 +1,198 @@
 # routers/training_blocks.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import delete, insert, literal, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from typing import List, Optional
+import uuid
 
 from models import training_block as models_training_block
+from models import training_block_exercise as models_tbe
+from models import exercise as models_exercise
+from models import exercise_log as models_log
 from schemas import training_block as schemas_training_block
-from models.user import User
+from schemas import workout as schemas_workout
+from auth_cache import AuthenticatedUser
 from routers.auth import get_current_user
-from database import get_db
+from database import get_db, get_read_db
+from aggregates import refresh_log_aggregates
+from tombstones import record_tombstones
+from response_cache import response_cache, json_list_body
 
 router = APIRouter(
     prefix="/training_blocks",
-    tags=["Training Blocks"], 
+    tags=["Training Blocks"],
 )
 
 @router.post("/", response_model=schemas_training_block.TrainingBlockInDB, status_code=status.HTTP_201_CREATED)
-def create_training_block(
+async def create_training_block(
     training_block: schemas_training_block.TrainingBlockCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    db_training_block = models_training_block.TrainingBlock(
-        **training_block.model_dump(),
-        user_id=current_user.id
+    db_training_block = await db.scalar(
+        insert(models_training_block.TrainingBlock)\
+            .values(**training_block.model_dump(), user_id=current_user.id)\
+            .returning(models_training_block.TrainingBlock)
     )
-    db.add(db_training_block)
-    db.commit()
-    db.refresh(db_training_block)
+    await db.commit()
+    await response_cache.invalidate_user(current_user.id)
     return db_training_block
 
 @router.get("/", response_model=List[schemas_training_block.TrainingBlockInDB])
-def read_training_blocks(
-    current_user: User = Depends(get_current_user),
+async def read_training_blocks(
+    request: Request,
+    current_user: AuthenticatedUser = Depends(get_current_user),
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    # Primário, não a réplica: o miss grava sob a versão nova (ver response_cache.py).
+    db: AsyncSession = Depends(get_db)
 ):
-    training_blocks = db.query(models_training_block.TrainingBlock)\
-                        .filter(models_training_block.TrainingBlock.user_id == current_user.id)\
-                        .offset(skip).limit(limit).all()
-    return training_blocks
+    cached = await response_cache.lookup(request, current_user.id)
+    if cached.hit:
+        return cached.response(request)
+
+    training_blocks = (await db.scalars(
+        select(models_training_block.TrainingBlock)\
+            .where(models_training_block.TrainingBlock.user_id == current_user.id)\
+            .offset(skip).limit(limit)
+    )).all()
+    return await cached.store(request, json_list_body(schemas_training_block.TrainingBlockInDB, training_blocks))
 
 @router.get("/{block_id}", response_model=schemas_training_block.TrainingBlockInDB)
-def read_training_block(
-    block_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def read_training_block(
+    block_id: uuid.UUID,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    db_training_block = db.query(models_training_block.TrainingBlock)\
-                        .filter(models_training_block.TrainingBlock.id == block_id)\
-                        .filter(models_training_block.TrainingBlock.user_id == current_user.id)\
-                        .first()
+    db_training_block = await db.scalar(
+        select(models_training_block.TrainingBlock)\
+            .where(models_training_block.TrainingBlock.id == block_id)\
+            .where(models_training_block.TrainingBlock.user_id == current_user.id)
+    )
     if db_training_block is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training block not found")
     return db_training_block
 
+@router.get("/{block_id}/workout", response_model=schemas_workout.TrainingBlockWorkout)
+async def read_training_block_workout(
+    block_id: uuid.UUID,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Bloco, exercícios ordenados e o último log do usuário para cada exercício, numa única consulta.
+
+    O último log vem de um LEFT JOIN LATERAL ... LIMIT 1 por exercício, que usa o índice
+    (user_id, log_date, created_at) de exercise_logs.
+    """
+    latest_log_subquery = select(models_log.ExerciseLog)\
+                            .where(models_log.ExerciseLog.user_id == current_user.id)\
+                            .where(models_log.ExerciseLog.exercise_id == models_tbe.TrainingBlockExercise.exercise_id)\
+                            .order_by(
+                                models_log.ExerciseLog.log_date.desc(),
+                                models_log.ExerciseLog.created_at.desc(),
+                                models_log.ExerciseLog.id.desc()
+                            )\
+                            .limit(1)\
+                            .lateral("latest_log")
+    latest_log = aliased(models_log.ExerciseLog, latest_log_subquery)
+
+    rows = (await db.execute(
+        select(models_training_block.TrainingBlock, models_tbe.TrainingBlockExercise, models_exercise.Exercise, latest_log)\
+            .outerjoin(models_tbe.TrainingBlockExercise, models_tbe.TrainingBlockExercise.training_block_id == models_training_block.TrainingBlock.id)\
+            .outerjoin(models_exercise.Exercise, models_exercise.Exercise.id == models_tbe.TrainingBlockExercise.exercise_id)\
+            .outerjoin(latest_log, true())\
+            .where(models_training_block.TrainingBlock.id == block_id)\
+            .where(models_training_block.TrainingBlock.user_id == current_user.id)\
+            .order_by(models_tbe.TrainingBlockExercise.order_in_block)
+    )).all()
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training block not found")
+
+    db_training_block = rows[0][0]
+    workout = schemas_training_block.TrainingBlockInDB.model_validate(db_training_block).model_dump()
+    workout["exercises"] = [
+        {
+            "id": block_exercise.id,
+            "training_block_id": block_exercise.training_block_id,
+            "exercise_id": block_exercise.exercise_id,
+            "order_in_block": block_exercise.order_in_block,
+            "created_at": block_exercise.created_at,
+            "updated_at": block_exercise.updated_at,
+            "exercise": exercise,
+            "last_log": last_log,
+        }
+        for _, block_exercise, exercise, last_log in rows
+        if block_exercise is not None
+    ]
+    return workout
+
 @router.put("/{block_id}", response_model=schemas_training_block.TrainingBlockInDB)
-def update_training_block(
-    block_id: str,
+async def update_training_block(
+    block_id: uuid.UUID,
     training_block_update: schemas_training_block.TrainingBlockUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    db_training_block = db.query(models_training_block.TrainingBlock)\
-                        .filter(models_training_block.TrainingBlock.id == block_id)\
-                        .filter(models_training_block.TrainingBlock.user_id == current_user.id)\
-                        .first()
+    db_training_block = await db.scalar(
+        update(models_training_block.TrainingBlock)\
+            .where(models_training_block.TrainingBlock.id == block_id)\
+            .where(models_training_block.TrainingBlock.user_id == current_user.id)\
+            .values(**training_block_update.model_dump(exclude_unset=True))\
+            .returning(models_training_block.TrainingBlock)
+    )
     if db_training_block is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training block not found")
 
-    update_data = training_block_update.model_dump(exclude_unset=True) 
-    for key, value in update_data.items():
-        setattr(db_training_block, key, value)
-
-    db.add(db_training_block)
-    db.commit()
-    db.refresh(db_training_block)
+    await db.commit()
+    await response_cache.invalidate_user(current_user.id)
     return db_training_block
 
 @router.delete("/{block_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_training_block(
-    block_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def delete_training_block(
+    block_id: uuid.UUID,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    db_training_block = db.query(models_training_block.TrainingBlock)\
-                        .filter(models_training_block.TrainingBlock.id == block_id)\
-                        .filter(models_training_block.TrainingBlock.user_id == current_user.id)\
-                        .first()
-    
-    if db_training_block is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training block not found")
+    # Todo passo filtra pelo dono: bloco alheio não gera tombstones nem chaves, e o DELETE não casa.
+    owned_block = select(models_training_block.TrainingBlock.id)\
+        .where(models_training_block.TrainingBlock.id == block_id)\
+        .where(models_training_block.TrainingBlock.user_id == current_user.id)
 
-    db.delete(db_training_block)
-    db.commit()
-    return {"message": "Training block deleted successfully"}
\ No newline at end of file
+    # Só as chaves dos agregados: os logs e vínculos saem pelo ON DELETE CASCADE (passive_deletes).
+    affected_keys = (await db.execute(
+        select(models_log.ExerciseLog.exercise_id, models_log.ExerciseLog.log_date)\
+            .where(models_log.ExerciseLog.training_block_id.in_(owned_block))\
+            .distinct()
+    )).all()
+
+    # Os filhos apagados pelo cascade também precisam chegar aos clientes via GET /sync.
+    await record_tombstones(
+        db, "exercise_logs",
+        select(models_log.ExerciseLog.user_id, models_log.ExerciseLog.id).where(models_log.ExerciseLog.training_block_id.in_(owned_block))
+    )
+    await record_tombstones(
+        db, "training_block_exercises",
+        select(literal(current_user.id, models_training_block.TrainingBlock.user_id.type), models_tbe.TrainingBlockExercise.id)\
+            .where(models_tbe.TrainingBlockExercise.training_block_id.in_(owned_block))
+    )
+    await record_tombstones(
+        db, "training_blocks",
+        select(models_training_block.TrainingBlock.user_id, models_training_block.TrainingBlock.id)\
+            .where(models_training_block.TrainingBlock.id.in_(owned_block))
+    )
+    deleted_id = await db.scalar(
+        delete(models_training_block.TrainingBlock)\
+            .where(models_training_block.TrainingBlock.id == block_id)\
+            .where(models_training_block.TrainingBlock.user_id == current_user.id)\
+            .returning(models_training_block.TrainingBlock.id)
+    )
+    if deleted_id is None:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Training block not found")
+    # Nenhum log restante mudou; recordes dos logs apagados ficaram com exercise_log_id NULL.
+    await refresh_log_aggregates(db, current_user.id, [tuple(key) for key in affected_keys], changed_log_ids=())
+    await db.commit()
+    await response_cache.invalidate_user(current_user.id)
+    return {"message": "Training block deleted successfully"}
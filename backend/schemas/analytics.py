@@ -0,0 +1,17 @@
+from pydantic import BaseModel, UUID4
+from datetime import date
+from typing import List
+
+class ProgressPoint(BaseModel):
+    period_start: date
+    log_count: int
+    set_count: int
+    total_volume: float
+    top_set_weight: float
+    estimated_1rm: float
+
+class ExerciseProgress(BaseModel):
+    exercise_id: UUID4
+    bucket: str
+    unit: str = "kg"
+    points: List[ProgressPoint]
@@ -20,4 +20,12 @@ class ExerciseInDB(ExerciseBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ExerciseSuggestion(BaseModel):
+    id: UUID4
+    name: str
+    category: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -24,6 +24,9 @@ class ExerciseLogBase(BaseModel):
 class ExerciseLogCreate(ExerciseLogBase):
     pass
 
+class ExerciseLogBulkCreate(BaseModel):
+    logs: List[ExerciseLogCreate] = Field(..., min_length=1, max_length=200)
+
 class ExerciseLogUpdate(BaseModel):
     training_block_id: Optional[UUID4] = None
     exercise_id: Optional[UUID4] = None
@@ -34,6 +37,10 @@ class ExerciseLogUpdate(BaseModel):
 class ExerciseLogInDB(ExerciseLogBase):
     id: UUID4
     user_id: UUID4
+    set_count: int = 0
+    total_volume_kg: float = 0.0
+    top_weight_kg: float = 0.0
+    estimated_1rm_kg: float = 0.0
     created_at: datetime
     updated_at: datetime
 
@@ -45,4 +52,25 @@ class ExerciseLogWithDetails(ExerciseLogInDB):
     training_block: TrainingBlockInDB
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ExerciseLogBulkError(BaseModel):
+    index: int
+    detail: str
+
+class ExerciseLogBulkResult(BaseModel):
+    created: List[ExerciseLogInDB]
+    errors: List[ExerciseLogBulkError]
+
+class CalendarDay(BaseModel):
+    date: date
+    session_count: int
+    exercise_count: int
+    log_count: int
+    set_count: int
+    total_volume: float
+
+class ExerciseLogCalendar(BaseModel):
+    year: int
+    unit: str = "kg"
+    days: List[CalendarDay]
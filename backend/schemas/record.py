@@ -0,0 +1,13 @@
+from pydantic import BaseModel, UUID4
+from datetime import date
+from typing import Optional
+
+class PersonalRecord(BaseModel):
+    exercise_id: UUID4
+    exercise_name: str
+    reps: int
+    weight_kg: float
+    estimated_1rm: float
+    achieved_on: date
+    exercise_log_id: Optional[UUID4] = None
+    unit: str = "kg"
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, UUID4
+from datetime import datetime
+from typing import List, Optional
+
+from schemas.training_block import TrainingBlockInDB
+from schemas.training_block_exercise import TrainingBlockExerciseInDB
+from schemas.exercise_log import ExerciseLogInDB
+
+class Tombstone(BaseModel):
+    table: str
+    id: UUID4
+    deleted_at: datetime
+
+class SyncChanges(BaseModel):
+    watermark: datetime
+    full: bool
+    training_blocks: List[TrainingBlockInDB]
+    training_block_exercises: List[TrainingBlockExerciseInDB]
+    exercise_logs: List[ExerciseLogInDB]
+    tombstones: List[Tombstone]
+    # Presente enquanto houver mais páginas; o watermark só deve ser guardado após a última.
+    next_cursor: Optional[str] = None
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, UUID4
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from schemas.exercise import ExerciseInDB
 from schemas.training_block import TrainingBlockInDB
@@ -11,11 +11,15 @@ class TrainingBlockExerciseBase(BaseModel):
     order_in_block: int = Field(0, ge=0) 
 
 class TrainingBlockExerciseCreate(TrainingBlockExerciseBase):
-    pass
+    # Omitida (ou null), o exercício vai para o fim do bloco.
+    order_in_block: Optional[int] = Field(None, ge=0)
 
 class TrainingBlockExerciseUpdate(BaseModel):
     order_in_block: Optional[int] = Field(None, ge=0)
 
+class TrainingBlockExerciseReorder(BaseModel):
+    ordered_ids: List[UUID4] = Field(..., min_length=1)
+
 class TrainingBlockExerciseInDB(TrainingBlockExerciseBase):
     id: UUID4
     created_at: datetime
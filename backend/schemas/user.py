@@ -42,4 +42,16 @@ class Token(BaseModel):
     token_type: str = "bearer"
 
 class TokenData(BaseModel):
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+
+
+class AccountDeletionStatus(BaseModel):
+    id: str
+    status: str
+    total_rows: int
+    deleted_rows: int
+    progress: float
+    current_table: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
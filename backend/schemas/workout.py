@@ -0,0 +1,11 @@
+from typing import List, Optional
+
+from schemas.exercise_log import ExerciseLogInDB
+from schemas.training_block import TrainingBlockInDB
+from schemas.training_block_exercise import TrainingBlockExerciseWithDetails
+
+class WorkoutExercise(TrainingBlockExerciseWithDetails):
+    last_log: Optional[ExerciseLogInDB] = None
+
+class TrainingBlockWorkout(TrainingBlockInDB):
+    exercises: List[WorkoutExercise]
@@ -1,5 +1,8 @@
 # security.py
+import asyncio
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -16,6 +19,21 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt é caro de propósito: roda num pool dedicado para não travar o loop de eventos.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_lock = threading.Lock()
+_hash_in_flight = 0
+_hash_running = 0
+_hash_rejected = 0
+_hash_completed = 0
+
+
+class PasswordHashingBusy(Exception):
+    """O pool de hashing atingiu o limite de fila configurado."""
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se a senha em texto puro corresponde à senha com hash."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -24,6 +42,53 @@ def get_password_hash(password: str) -> str:
     """Gera o hash de uma senha."""
     return pwd_context.hash(password)
 
+def _run_hash_job(fn, *args):
+    global _hash_running, _hash_completed
+    with _hash_lock:
+        _hash_running += 1
+    try:
+        return fn(*args)
+    finally:
+        with _hash_lock:
+            _hash_running -= 1
+            _hash_completed += 1
+
+def _hash_job_done(_future) -> None:
+    global _hash_in_flight
+    with _hash_lock:
+        _hash_in_flight -= 1
+
+async def _submit_hash_job(fn, *args):
+    global _hash_in_flight, _hash_rejected
+    with _hash_lock:
+        if _hash_in_flight >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+            _hash_rejected += 1
+            raise PasswordHashingBusy()
+        _hash_in_flight += 1
+    future = _hash_executor.submit(_run_hash_job, fn, *args)
+    future.add_done_callback(_hash_job_done)
+    return await asyncio.wrap_future(future)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Versão assíncrona de verify_password, executada no pool de hashing."""
+    return await _submit_hash_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Versão assíncrona de get_password_hash, executada no pool de hashing."""
+    return await _submit_hash_job(get_password_hash, password)
+
+def password_hashing_stats() -> dict:
+    """Estado atual do pool de hashing (profundidade da fila, jobs em execução, rejeições)."""
+    with _hash_lock:
+        return {
+            "workers": PASSWORD_HASH_WORKERS,
+            "max_queue": PASSWORD_HASH_MAX_QUEUE,
+            "queue_depth": _hash_in_flight - _hash_running,
+            "running": _hash_running,
+            "completed": _hash_completed,
+            "rejected": _hash_rejected,
+        }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Cria um novo JWT."""
     to_encode = data.copy()
@@ -0,0 +1,83 @@
+# static_files.py
+import mimetypes
+import os
+import re
+
+from starlette.datastructures import Headers
+from starlette.staticfiles import StaticFiles
+
+# Nomes gerados pelo upload: hash do conteúdo (+ tamanho da miniatura). Nunca mudam de conteúdo.
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{32}(_\d+)?\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=300"
+
+WEBP_SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepts(header_value: str, token: str) -> bool:
+    """True se o cabeçalho Accept/Accept-Encoding lista o token com q > 0."""
+    for part in header_value.split(","):
+        value, *params = [item.strip() for item in part.split(";")]
+        if value.lower() != token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            return True
+    return False
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles com cache longo para arquivos endereçados por conteúdo e variantes pré-geradas.
+
+    Se o cliente aceita image/webp e existe <nome>.webp ao lado do original, a variante WebP é
+    servida; arquivos de texto com .br/.gz pré-comprimidos são servidos com Content-Encoding.
+    Range/ETag/Last-Modified continuam por conta do FileResponse do Starlette.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        original_path = str(full_path)
+        served_path = original_path
+        content_encoding = None
+        vary = []
+
+        root, extension = os.path.splitext(original_path)
+        if extension.lower() in WEBP_SOURCE_EXTENSIONS:
+            vary.append("Accept")
+            webp_path = root + ".webp"
+            if _accepts(request_headers.get("accept", ""), "image/webp") and os.path.isfile(webp_path):
+                served_path = webp_path
+        elif extension.lower() not in (".webp", ".gif"):
+            vary.append("Accept-Encoding")
+            accept_encoding = request_headers.get("accept-encoding", "")
+            for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+                if _accepts(accept_encoding, encoding) and os.path.isfile(original_path + suffix):
+                    served_path = original_path + suffix
+                    content_encoding = encoding
+                    break
+
+        if served_path != original_path:
+            stat_result = os.stat(served_path)
+        response = super().file_response(served_path, stat_result, scope, status_code)
+
+        if content_encoding:
+            response.headers["content-encoding"] = content_encoding
+            media_type, _ = mimetypes.guess_type(original_path)
+            if media_type:
+                response.headers["content-type"] = media_type
+        if vary:
+            response.headers["vary"] = ", ".join(vary)
+        if CONTENT_ADDRESSED_NAME.match(os.path.basename(original_path)):
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["cache-control"] = DEFAULT_CACHE_CONTROL
+        return response
@@ -0,0 +1,110 @@
+# tests/conftest.py
+"""
+Fixtures comuns: a API roda sobre um SQLite descartável (o mesmo caminho do benchmark), com
+usuários gravados direto no banco e tokens de security.create_access_token, sem pagar o
+bcrypt a cada teste.
+"""
+import os
+import tempfile
+import uuid
+from types import SimpleNamespace
+
+# Lidas na importação de database, rate_limit e response_cache: precisam vir antes delas.
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="gym_notes_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DB_DIR, 'test.db')}"
+os.environ["REPLICA_DATABASE_URL"] = ""
+os.environ["DB_REPLICA_HOST"] = ""
+os.environ["RESPONSE_CACHE_REDIS_URL"] = ""
+os.environ["LOGIN_IP_RATE_LIMIT_BURST"] = "1000"
+
+import httpx
+import pytest
+from sqlalchemy import insert
+
+from database import Base, engine, dispose_engines
+from security import create_access_token, get_password_hash
+from models import user as models_user
+from main import app
+
+TEST_PASSWORD = "secret123"
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def password_hash():
+    return get_password_hash(TEST_PASSWORD)
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    # As conexões do pool ficam presas ao loop de eventos deste teste.
+    await dispose_engines()
+
+
+@pytest.fixture
+def make_user(password_hash):
+    """Cria um usuário ativo; devolve id, username, senha e os headers com o token."""
+    def _make_user():
+        username = f"user_{uuid.uuid4().hex[:12]}"
+        user_id = uuid.uuid4()
+        with engine.begin() as connection:
+            connection.execute(insert(models_user.User).values(
+                id=user_id, username=username, email=f"{username}@example.com",
+                hashed_password=password_hash, is_active=True,
+            ))
+        token = create_access_token({"sub": username})
+        return SimpleNamespace(
+            id=user_id, username=username, password=TEST_PASSWORD,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    return _make_user
+
+
+@pytest.fixture
+def make_exercise(client):
+    async def _make_exercise(name=None, category="Peito"):
+        response = await client.post("/exercises/", json={"name": name or f"Exercise {uuid.uuid4().hex[:12]}", "category": category})
+        assert response.status_code == 201, response.text
+        return response.json()
+    return _make_exercise
+
+
+@pytest.fixture
+def make_block(client):
+    async def _make_block(user, title="Bloco A"):
+        response = await client.post("/training_blocks/", headers=user.headers, json={"title": title})
+        assert response.status_code == 201, response.text
+        return response.json()
+    return _make_block
+
+
+@pytest.fixture
+def make_log(client):
+    async def _make_log(user, block, exercise, sets=((5, 100.0),), log_date=None, unit="kg"):
+        payload = {
+            "training_block_id": block["id"],
+            "exercise_id": exercise["id"],
+            "sets_reps_data": [
+                {"set": index + 1, "reps": reps, "weight": weight, "unit": unit}
+                for index, (reps, weight) in enumerate(sets)
+            ],
+        }
+        if log_date is not None:
+            payload["log_date"] = str(log_date)
+        response = await client.post("/exercise_logs/", headers=user.headers, json=payload)
+        assert response.status_code == 201, response.text
+        return response.json()
+    return _make_log
@@ -0,0 +1,82 @@
+"""
+Exclusão de conta: DELETE /auth/me desativa a conta e registra o job, que apaga os dados
+em lotes; só o dono consulta o progresso, e jobs sem heartbeat são retomados.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from account_deletion import account_deletion_jobs
+from database import engine
+from models import account_deletion_job as models_job
+from models import exercise_log as models_log
+from models import training_block as models_training_block
+from models import user as models_user
+from security import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+
+async def _wait_for_jobs():
+    while account_deletion_jobs._tasks:
+        await asyncio.gather(*account_deletion_jobs._tasks)
+
+
+def _count(model, condition):
+    with engine.connect() as connection:
+        return connection.scalar(select(func.count()).select_from(model).where(condition))
+
+
+async def test_account_is_deleted_in_batches_and_progress_is_owner_only(
+    client, make_user, make_exercise, make_block, make_log, monkeypatch
+):
+    monkeypatch.setattr(account_deletion_jobs, "batch_size", 2)
+    user, other = make_user(), make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    for day in range(1, 6):
+        await make_log(user, block, exercise, log_date=f"2026-01-0{day}")
+
+    response = await client.delete("/auth/me", headers=user.headers)
+    assert response.status_code == 202, response.text
+    location = response.headers["Location"]
+    assert (await client.get("/auth/me", headers=user.headers)).status_code == 401
+
+    await _wait_for_jobs()
+
+    job = (await client.get(location, headers=user.headers)).json()
+    assert job["status"] == "completed"
+    # 5 logs + 1 bloco + a linha de users.
+    assert (job["deleted_rows"], job["total_rows"], job["progress"]) == (7, 7, 1.0)
+    assert _count(models_user.User, models_user.User.id == user.id) == 0
+    assert _count(models_log.ExerciseLog, models_log.ExerciseLog.user_id == user.id) == 0
+    assert _count(models_training_block.TrainingBlock, models_training_block.TrainingBlock.user_id == user.id) == 0
+
+    assert (await client.get(location, headers=other.headers)).status_code == 404
+    assert (await client.get(location, headers={"Authorization": "Bearer garbage"})).status_code == 401
+    assert (await client.get("/auth/deletion_jobs/not-a-uuid", headers=user.headers)).status_code == 404
+
+
+async def test_stale_job_is_resumed(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    await make_log(user, await make_block(user), exercise)
+    job_id = uuid.uuid4()
+    with engine.begin() as connection:
+        connection.execute(update(models_user.User).where(models_user.User.id == user.id).values(is_active=False))
+        connection.execute(models_job.AccountDeletionJob.__table__.insert().values(
+            id=job_id, user_id=user.id, username=user.username, status="running",
+            heartbeat_at=datetime.now() - timedelta(seconds=account_deletion_jobs.stale_seconds + 60),
+        ))
+
+    assert await account_deletion_jobs.resume_stale() == 1
+    await _wait_for_jobs()
+
+    token = create_access_token({"sub": user.username})
+    response = await client.get(f"/auth/deletion_jobs/{job_id.hex}", headers={"Authorization": f"Bearer {token}"})
+    assert response.json()["status"] == "completed"
+    assert _count(models_user.User, models_user.User.id == user.id) == 0
+    assert await account_deletion_jobs.resume_stale() == 0
@@ -0,0 +1,106 @@
+"""
+Contas dos agregados (kg, 1RM de Epley, totais por log) e exercise_daily_stats mantida a
+cada escrita em exercise_logs.
+"""
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from aggregates import LB_TO_KG, best_sets_by_reps, estimate_1rm, log_totals, set_weight_kg
+from database import engine
+from models import exercise_daily_stat as models_stat
+
+
+def test_set_weight_is_normalized_to_kg():
+    assert set_weight_kg({"weight": 100, "unit": "kg"}) == 100
+    assert set_weight_kg({"weight": 100}) == 100
+    assert set_weight_kg({"weight": 100, "unit": "LBS"}) == pytest.approx(45.359237)
+    assert set_weight_kg({"weight": 100, "unit": "lb"}) == pytest.approx(100 * LB_TO_KG)
+    assert set_weight_kg({"weight": None}) == 0.0
+
+
+def test_estimate_1rm_uses_epley():
+    assert estimate_1rm(100, 1) == 100
+    assert estimate_1rm(100, 5) == pytest.approx(100 * (1 + 5 / 30))
+    assert estimate_1rm(100, 0) == 0.0
+    assert estimate_1rm(0, 5) == 0.0
+
+
+def test_log_totals_sum_sets_in_kg():
+    totals = log_totals([
+        {"set": 1, "reps": 5, "weight": 100, "unit": "kg"},
+        {"set": 2, "reps": 10, "weight": 100, "unit": "lb"},
+    ])
+
+    assert totals["set_count"] == 2
+    assert totals["total_volume_kg"] == pytest.approx(500 + 1000 * LB_TO_KG)
+    assert totals["top_weight_kg"] == 100
+    assert totals["estimated_1rm_kg"] == pytest.approx(estimate_1rm(100, 5))
+
+
+def test_log_totals_of_no_sets_are_zero():
+    assert log_totals(None) == {"set_count": 0, "total_volume_kg": 0.0, "top_weight_kg": 0.0, "estimated_1rm_kg": 0.0}
+
+
+def test_best_sets_keep_heaviest_weight_per_rep_count():
+    best = best_sets_by_reps([
+        {"reps": 5, "weight": 80},
+        {"reps": 5, "weight": 90},
+        {"reps": 3, "weight": 100},
+        {"reps": 0, "weight": 120},
+    ])
+    assert best == {5: (90, estimate_1rm(90, 5)), 3: (100, estimate_1rm(100, 3))}
+
+
+def _daily_stat(user_id, exercise_id, stat_date):
+    with engine.connect() as connection:
+        return connection.execute(
+            select(models_stat.ExerciseDailyStat)
+                .where(models_stat.ExerciseDailyStat.user_id == user_id)
+                .where(models_stat.ExerciseDailyStat.exercise_id == uuid.UUID(exercise_id))
+                .where(models_stat.ExerciseDailyStat.stat_date == stat_date)
+        ).one_or_none()
+
+
+@pytest.mark.anyio
+async def test_daily_stats_follow_log_writes(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    day = date(2026, 4, 10)
+
+    first = await make_log(user, block, exercise, sets=((5, 100.0),), log_date=day)
+    await make_log(user, block, exercise, sets=((3, 110.0), (3, 110.0)), log_date=day)
+    stat = _daily_stat(user.id, exercise["id"], day)
+    assert (stat.log_count, stat.set_count) == (2, 3)
+    assert stat.total_volume == pytest.approx(500 + 660)
+    assert stat.top_set_weight == 110
+
+    response = await client.put(f"/exercise_logs/{first['id']}", headers=user.headers, json={
+        "sets_reps_data": [{"set": 1, "reps": 5, "weight": 120.0}],
+    })
+    assert response.status_code == 200, response.text
+    stat = _daily_stat(user.id, exercise["id"], day)
+    assert stat.total_volume == pytest.approx(600 + 660)
+    assert stat.top_set_weight == 120
+
+    response = await client.delete(f"/exercise_logs/{first['id']}", headers=user.headers)
+    assert response.status_code == 204
+    stat = _daily_stat(user.id, exercise["id"], day)
+    assert (stat.log_count, stat.top_set_weight) == (1, 110)
+
+
+@pytest.mark.anyio
+async def test_moving_a_log_to_another_day_moves_its_stats(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    log = await make_log(user, block, exercise, log_date=date(2026, 4, 1))
+
+    response = await client.put(f"/exercise_logs/{log['id']}", headers=user.headers, json={"log_date": "2026-04-02"})
+    assert response.status_code == 200, response.text
+
+    assert _daily_stat(user.id, exercise["id"], date(2026, 4, 1)) is None
+    assert _daily_stat(user.id, exercise["id"], date(2026, 4, 2)).log_count == 1
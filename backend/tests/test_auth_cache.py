@@ -0,0 +1,115 @@
+"""
+Cache de usuários autenticados: TTL, LRU, validade do próprio token e invalidação nas
+escritas do usuário.
+"""
+import uuid
+
+import pytest
+
+import auth_cache
+from auth_cache import AuthenticatedUser, PrincipalCache, principal_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(auth_cache, "time", fake)
+    return fake
+
+
+def _snapshot(username="ana", is_active=True):
+    return AuthenticatedUser(
+        id=uuid.uuid4(), username=username, email=f"{username}@example.com", is_active=is_active,
+        profile_picture_url=None, created_at=None, updated_at=None,
+    )
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    user = _snapshot()
+    cache.set("token", user)
+
+    clock.now += 59
+    assert cache.get("token") is user
+    clock.now += 1
+    assert cache.get("token") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_entry_never_outlives_token_expiration(clock):
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    cache.set("token", _snapshot(), token_exp=clock.now + 5)
+
+    clock.now += 5
+    assert cache.get("token") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = PrincipalCache(ttl_seconds=60, max_entries=2)
+    first, second, third = _snapshot("a"), _snapshot("b"), _snapshot("c")
+    cache.set("a", first)
+    cache.set("b", second)
+    cache.get("a")
+    cache.set("c", third)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is first
+    assert cache.get("c") is third
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_user_drops_every_token_of_that_user(clock):
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    user, other = _snapshot("a"), _snapshot("b")
+    cache.set("a1", user)
+    cache.set("a2", user)
+    cache.set("b1", other)
+
+    cache.invalidate_user(user.id)
+
+    assert cache.get("a1") is None
+    assert cache.get("a2") is None
+    assert cache.get("b1") is other
+
+
+def test_disabled_cache_stores_nothing(clock):
+    cache = PrincipalCache(ttl_seconds=0, max_entries=10)
+    cache.set("token", _snapshot())
+    assert cache.get("token") is None
+
+
+@pytest.mark.anyio
+async def test_repeated_requests_hit_the_cache(client, make_user):
+    user = make_user()
+
+    first = await client.get("/auth/me", headers=user.headers)
+    hits_before = principal_cache.hits
+    second = await client.get("/auth/me", headers=user.headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert principal_cache.hits == hits_before + 1
+
+
+@pytest.mark.anyio
+async def test_profile_update_is_visible_on_next_request(client, make_user):
+    user = make_user()
+    await client.get("/auth/me", headers=user.headers)
+
+    new_email = f"{user.username}.new@example.com"
+    response = await client.put("/auth/me", headers=user.headers, json={"email": new_email})
+    assert response.status_code == 200, response.text
+
+    response = await client.get("/auth/me", headers=user.headers)
+    assert response.json()["email"] == new_email
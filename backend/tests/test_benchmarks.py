@@ -0,0 +1,84 @@
+"""
+Suíte de benchmark: o gerador sintético é reprodutível pelo --seed e o relatório aponta
+regressões de p95 e de consultas por requisição contra o baseline.
+"""
+import random
+
+import pytest
+
+from aggregates import log_totals
+from benchmarks.run import REGRESSION_THRESHOLD, _print_report, percentile
+from benchmarks.seed import build_exercises, build_sets, build_user_data
+
+STAMP_KEYS = ("created_at", "updated_at")
+
+
+def _without_stamps(rows):
+    return [{key: value for key, value in row.items() if key not in STAMP_KEYS} for row in rows]
+
+
+def _generate(seed_value):
+    rng = random.Random(seed_value)
+    exercises = build_exercises(rng, 20)
+    user, blocks, links, logs = build_user_data(rng, 0, "hash", exercises, years=0.25, sessions_per_week=4)
+    return [_without_stamps(rows) for rows in (exercises, [user], blocks, links, logs)]
+
+
+def test_same_seed_generates_same_data():
+    assert _generate(7) == _generate(7)
+    assert _generate(7) != _generate(8)
+
+
+def test_generated_logs_are_consistent():
+    _, [user], blocks, links, logs = _generate(3)
+    block_ids = {block["id"] for block in blocks}
+    linked = {(link["training_block_id"], link["exercise_id"]) for link in links}
+
+    assert logs
+    for log in logs:
+        assert log["user_id"] == user["id"]
+        assert log["training_block_id"] in block_ids
+        assert (log["training_block_id"], log["exercise_id"]) in linked
+        assert log["set_count"] == log_totals(log["sets_reps_data"])["set_count"]
+
+
+def test_sets_use_plate_increments():
+    rng = random.Random(1)
+    for _ in range(50):
+        sets = build_sets(rng, base_weight=60.0, progress=1.2)
+        assert 3 <= len(sets) <= 5
+        assert len({(s["weight"], s["unit"]) for s in sets}) == 1
+        assert sets[0]["weight"] % 2.5 == 0
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+
+def _result(p95_ms, queries_per_request):
+    return {
+        "requests": 10, "errors": 0, "p50_ms": 1.0, "p95_ms": p95_ms, "p99_ms": p95_ms,
+        "throughput_rps": 100.0, "queries_per_request": queries_per_request,
+    }
+
+
+def test_report_flags_latency_and_query_regressions(capsys):
+    baseline = {"results": {"a": _result(10.0, 2.0), "b": _result(10.0, 2.0), "c": _result(10.0, 2.0)}}
+    results = {
+        "a": _result(10.0 * (1 + REGRESSION_THRESHOLD) + 0.5, 2.0),
+        "b": _result(10.0, 3.0),
+        "c": _result(9.0, 2.0),
+    }
+
+    regressions = _print_report(results, baseline)
+
+    assert regressions == ["a", "b (queries)"]
+    assert "endpoint" in capsys.readouterr().out
+
+
+def test_report_without_baseline_has_no_regressions(capsys):
+    assert _print_report({"a": _result(10.0, None)}, None) == []
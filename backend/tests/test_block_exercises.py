@@ -0,0 +1,105 @@
+"""
+Vínculos bloco–exercício: posição omitida vai para o fim, posição ocupada é 409, o
+reordenamento é atômico e todas as escritas exigem ser dono do bloco.
+"""
+import uuid
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def add_exercise(client):
+    async def _add_exercise(user, block, exercise, order_in_block=None):
+        payload = {"training_block_id": block["id"], "exercise_id": exercise["id"]}
+        if order_in_block is not None:
+            payload["order_in_block"] = order_in_block
+        return await client.post("/training_block_exercises/", headers=user.headers, json=payload)
+    return _add_exercise
+
+
+async def _block_order(client, user, block):
+    response = await client.get(f"/training_block_exercises/by_block/{block['id']}", headers=user.headers)
+    return [(link["exercise"]["id"], link["order_in_block"]) for link in response.json()]
+
+
+async def test_omitted_position_appends(client, make_user, make_exercise, make_block, add_exercise):
+    user = make_user()
+    block = await make_block(user)
+    first, second = await make_exercise(), await make_exercise()
+
+    assert (await add_exercise(user, block, first)).json()["order_in_block"] == 0
+    assert (await add_exercise(user, block, second)).json()["order_in_block"] == 1
+
+
+async def test_taken_position_and_repeated_exercise_are_conflicts(client, make_user, make_exercise, make_block, add_exercise):
+    user = make_user()
+    block = await make_block(user)
+    first, second = await make_exercise(), await make_exercise()
+    await add_exercise(user, block, first, order_in_block=0)
+
+    assert (await add_exercise(user, block, second, order_in_block=0)).status_code == 409
+    assert (await add_exercise(user, block, first)).status_code == 409
+
+
+async def test_missing_exercise_is_404(client, make_user, make_block, add_exercise):
+    user = make_user()
+    block = await make_block(user)
+    response = await add_exercise(user, block, {"id": str(uuid.uuid4())})
+    assert response.status_code == 404
+
+
+async def test_reorder_applies_the_whole_order(client, make_user, make_exercise, make_block, add_exercise):
+    user = make_user()
+    block = await make_block(user)
+    exercises = [await make_exercise() for _ in range(3)]
+    links = [(await add_exercise(user, block, exercise)).json() for exercise in exercises]
+
+    new_order = [links[2]["id"], links[0]["id"], links[1]["id"]]
+    response = await client.put(
+        f"/training_block_exercises/by_block/{block['id']}/order", headers=user.headers, json={"ordered_ids": new_order}
+    )
+
+    assert response.status_code == 200, response.text
+    assert [link["id"] for link in response.json()] == new_order
+    assert await _block_order(client, user, block) == [
+        (exercises[2]["id"], 0), (exercises[0]["id"], 1), (exercises[1]["id"], 2),
+    ]
+
+
+@pytest.mark.parametrize("ids", ["partial", "duplicated"])
+async def test_reorder_requires_every_link_once(client, make_user, make_exercise, make_block, add_exercise, ids):
+    user = make_user()
+    block = await make_block(user)
+    links = [(await add_exercise(user, block, await make_exercise())).json() for _ in range(2)]
+    ordered_ids = [links[0]["id"]] if ids == "partial" else [links[0]["id"], links[0]["id"], links[1]["id"]]
+
+    response = await client.put(
+        f"/training_block_exercises/by_block/{block['id']}/order", headers=user.headers, json={"ordered_ids": ordered_ids}
+    )
+
+    assert response.status_code == 400
+    assert await _block_order(client, user, block) == [(links[0]["exercise_id"], 0), (links[1]["exercise_id"], 1)]
+
+
+async def test_writes_on_someone_elses_block_are_404(client, make_user, make_exercise, make_block, add_exercise):
+    owner, intruder = make_user(), make_user()
+    block = await make_block(owner)
+    exercise = await make_exercise()
+    link = (await add_exercise(owner, block, exercise)).json()
+
+    assert (await add_exercise(intruder, block, await make_exercise())).status_code == 404
+    response = await client.put(
+        f"/training_block_exercises/by_block/{block['id']}/order", headers=intruder.headers, json={"ordered_ids": [link["id"]]}
+    )
+    assert response.status_code == 404
+    response = await client.put(f"/training_block_exercises/{link['id']}", headers=intruder.headers, json={"order_in_block": 5})
+    assert response.status_code == 404
+    response = await client.delete(f"/training_block_exercises/{link['id']}", headers=intruder.headers)
+    assert response.status_code == 404
+
+    assert await _block_order(client, owner, block) == [(exercise["id"], 0)]
+    response = await client.delete(f"/training_block_exercises/{link['id']}", headers=owner.headers)
+    assert response.status_code == 204
+    assert await _block_order(client, owner, block) == []
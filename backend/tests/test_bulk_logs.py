@@ -0,0 +1,60 @@
+"""
+POST /exercise_logs/bulk: um INSERT para os logs válidos, erros por índice para os demais e
+422 quando nenhum é válido.
+"""
+import uuid
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def _log(block, exercise, weight=100.0, log_date="2026-05-01"):
+    return {
+        "training_block_id": block["id"],
+        "exercise_id": exercise["id"],
+        "log_date": log_date,
+        "sets_reps_data": [{"set": 1, "reps": 5, "weight": weight}],
+    }
+
+
+async def test_bulk_creates_valid_logs_and_reports_invalid_ones(client, make_user, make_exercise, make_block):
+    user, other = make_user(), make_user()
+    exercise = await make_exercise()
+    block, other_block = await make_block(user), await make_block(other)
+    missing_exercise = {"id": str(uuid.uuid4())}
+
+    response = await client.post("/exercise_logs/bulk", headers=user.headers, json={"logs": [
+        _log(block, exercise, 100.0),
+        _log(other_block, exercise),
+        _log(block, missing_exercise),
+        _log(block, exercise, 110.0),
+    ]})
+
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert [log["top_weight_kg"] for log in body["created"]] == [100.0, 110.0]
+    assert body["errors"] == [
+        {"index": 1, "detail": "Training block not found"},
+        {"index": 2, "detail": "Exercise not found"},
+    ]
+    listed = (await client.get("/exercise_logs/", headers=user.headers)).json()
+    assert {log["id"] for log in listed} == {log["id"] for log in body["created"]}
+
+
+async def test_bulk_without_valid_logs_is_422(client, make_user, make_exercise, make_block):
+    user, other = make_user(), make_user()
+    exercise = await make_exercise()
+    other_block = await make_block(other)
+
+    response = await client.post("/exercise_logs/bulk", headers=user.headers, json={"logs": [_log(other_block, exercise)]})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == [{"index": 0, "detail": "Training block not found"}]
+    assert (await client.get("/exercise_logs/", headers=user.headers)).json() == []
+
+
+async def test_bulk_rejects_empty_batch(client, make_user):
+    user = make_user()
+    response = await client.post("/exercise_logs/bulk", headers=user.headers, json={"logs": []})
+    assert response.status_code == 422
@@ -0,0 +1,50 @@
+"""
+GET /exercise_logs/calendar: dias com treino do ano a partir de daily_activity, mantida a
+cada escrita em exercise_logs.
+"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _days(client, user, year=2026):
+    response = await client.get("/exercise_logs/calendar", headers=user.headers, params={"year": year})
+    assert response.status_code == 200, response.text
+    return {day["date"]: day for day in response.json()["days"]}
+
+
+async def test_calendar_rolls_up_each_day(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    squat, bench = await make_exercise(), await make_exercise()
+    block_a, block_b = await make_block(user, "A"), await make_block(user, "B")
+    await make_log(user, block_a, squat, sets=((5, 100.0), (5, 100.0)), log_date="2026-08-01")
+    await make_log(user, block_a, bench, sets=((5, 60.0),), log_date="2026-08-01")
+    await make_log(user, block_b, squat, sets=((3, 110.0),), log_date="2026-08-01")
+    await make_log(user, block_a, squat, log_date="2026-08-03")
+    await make_log(user, block_a, squat, log_date="2025-12-31")
+
+    days = await _days(client, user)
+
+    assert list(days) == ["2026-08-01", "2026-08-03"]
+    day = days["2026-08-01"]
+    assert (day["session_count"], day["exercise_count"], day["log_count"], day["set_count"]) == (2, 2, 3, 4)
+    assert day["total_volume"] == pytest.approx(1000 + 300 + 330)
+
+
+async def test_deleting_the_last_log_of_a_day_removes_it(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    log = await make_log(user, block, exercise, log_date="2026-08-05")
+
+    assert (await client.delete(f"/exercise_logs/{log['id']}", headers=user.headers)).status_code == 204
+
+    assert await _days(client, user) == {}
+
+
+async def test_calendar_is_per_user(client, make_user, make_exercise, make_block, make_log):
+    user, other = make_user(), make_user()
+    exercise = await make_exercise()
+    await make_log(other, await make_block(other), exercise, log_date="2026-08-05")
+
+    assert await _days(client, user) == {}
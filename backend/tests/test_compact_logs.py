@@ -0,0 +1,54 @@
+"""
+GET /exercise_logs?view=compact: logs só com ids e cada exercício/bloco uma vez em
+`included`, com o mesmo conteúdo da resposta completa.
+"""
+from datetime import date
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_compact_view_sideloads_each_reference_once(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    squat, bench = await make_exercise(), await make_exercise()
+    block = await make_block(user)
+    for day in (1, 2):
+        await make_log(user, block, squat, log_date=date(2026, 6, day))
+    await make_log(user, block, bench, log_date=date(2026, 6, 3))
+
+    full = (await client.get("/exercise_logs/", headers=user.headers)).json()
+    response = await client.get("/exercise_logs/", headers=user.headers, params={"view": "compact"})
+
+    assert response.status_code == 200
+    compact = response.json()
+    assert set(compact["included"]["exercises"]) == {squat["id"], bench["id"]}
+    assert set(compact["included"]["training_blocks"]) == {block["id"]}
+    assert [log["id"] for log in compact["logs"]] == [log["id"] for log in full]
+    for full_log, compact_log in zip(full, compact["logs"]):
+        assert "exercise" not in compact_log
+        assert compact_log == {key: value for key, value in full_log.items() if key not in ("exercise", "training_block")}
+        assert compact["included"]["exercises"][compact_log["exercise_id"]] == full_log["exercise"]
+        assert compact["included"]["training_blocks"][compact_log["training_block_id"]] == full_log["training_block"]
+
+
+async def test_compact_view_pages_with_the_same_cursor(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    for day in (1, 2, 3):
+        await make_log(user, block, exercise, log_date=date(2026, 6, day))
+
+    response = await client.get("/exercise_logs/", headers=user.headers, params={"view": "compact", "limit": 2})
+    cursor = response.headers["X-Next-Cursor"]
+    rest = await client.get("/exercise_logs/", headers=user.headers, params={"view": "compact", "limit": 2, "cursor": cursor})
+
+    assert [log["log_date"] for log in response.json()["logs"]] == ["2026-06-03", "2026-06-02"]
+    assert [log["log_date"] for log in rest.json()["logs"]] == ["2026-06-01"]
+    assert "X-Next-Cursor" not in rest.headers
+
+
+async def test_unknown_view_is_rejected(client, make_user):
+    user = make_user()
+    response = await client.get("/exercise_logs/", headers=user.headers, params={"view": "tiny"})
+    assert response.status_code == 422
@@ -0,0 +1,71 @@
+"""
+Catálogo de exercícios em memória: ETags fortes, 304 com If-None-Match e recarga após
+escritas no catálogo.
+"""
+import pytest
+from starlette.requests import Request
+
+from catalog_cache import etag_matches, exercise_catalog, make_etag
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_etag_is_derived_from_body():
+    assert make_etag(b"[]") == make_etag(b"[]")
+    assert make_etag(b"[]") != make_etag(b"[1]")
+    assert make_etag(b"[]").startswith('"')
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ('"abc"', True),
+    ('"x", "abc"', True),
+    ("*", True),
+    ('"other"', False),
+])
+def test_if_none_match_parsing(header, matches):
+    assert etag_matches(_request(header), '"abc"') is matches
+
+
+@pytest.mark.anyio
+async def test_catalog_answers_304_until_it_changes(client, make_exercise):
+    await make_exercise()
+    first = await client.get("/exercises/", params={"limit": 1000})
+    etag = first.headers["ETag"]
+
+    cached = await client.get("/exercises/", params={"limit": 1000}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    created = await make_exercise()
+    changed = await client.get("/exercises/", params={"limit": 1000}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert created["id"] in {exercise["id"] for exercise in changed.json()}
+
+
+@pytest.mark.anyio
+async def test_single_exercise_reflects_update(client, make_exercise):
+    exercise = await make_exercise(category="Peito")
+    first = await client.get(f"/exercises/{exercise['id']}")
+
+    await client.put(f"/exercises/{exercise['id']}", json={"category": "Ombros"})
+    response = await client.get(f"/exercises/{exercise['id']}", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert response.status_code == 200
+    assert response.json()["category"] == "Ombros"
+
+
+@pytest.mark.anyio
+async def test_repeated_reads_are_served_from_memory(client, make_exercise):
+    await make_exercise()
+    await client.get("/exercises/")
+    reloads = exercise_catalog.reloads
+
+    await client.get("/exercises/")
+    await client.get("/exercises/")
+
+    assert exercise_catalog.reloads == reloads
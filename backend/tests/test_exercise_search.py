@@ -0,0 +1,59 @@
+# tests/test_exercise_search.py
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from models.exercise import Exercise
+from routers.exercises import exercise_search_clauses
+
+
+def _compile_search(term: str) -> str:
+    condition, rank = exercise_search_clauses(term)
+    return str(select(Exercise.id).where(condition).order_by(rank.desc()).compile(dialect=asyncpg.dialect()))
+
+
+def test_search_config_is_a_constant_under_asyncpg():
+    # Um parâmetro ligado viraria $n::VARCHAR e o plainto_tsquery(varchar, text) falharia no banco.
+    sql = _compile_search("supino")
+    assert "plainto_tsquery('simple', " in sql
+    assert "to_tsvector('simple', " in sql
+
+
+def test_search_uses_indexed_operators():
+    sql = _compile_search("supino")
+    assert "@@" in sql
+    assert "<%" in sql
+    assert "word_similarity" in sql
+
+
+def test_search_escapes_like_wildcards():
+    condition, _ = exercise_search_clauses("100%_a")
+    params = condition.compile(dialect=asyncpg.dialect()).params
+    assert "%100\\%\\_a%" in params.values()
+
+
+@pytest.mark.anyio
+async def test_autocomplete_matches_prefix_only(client, make_exercise):
+    await make_exercise(name="Zq Supino Reto")
+    await make_exercise(name="Zq Supino Inclinado")
+    await make_exercise(name="Remada Zq")
+
+    response = await client.get("/exercises/autocomplete", params={"q": "zq sup"})
+
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()] == ["Zq Supino Inclinado", "Zq Supino Reto"]
+
+
+@pytest.mark.anyio
+async def test_autocomplete_treats_wildcards_literally(client, make_exercise):
+    await make_exercise(name="Zw_underscore")
+    await make_exercise(name="Zwxunderscore")
+
+    response = await client.get("/exercises/autocomplete", params={"q": "zw_"})
+
+    assert [item["name"] for item in response.json()] == ["Zw_underscore"]
+
+
+def test_search_vector_index_is_part_of_the_schema():
+    # Sem tabela, o índice ficaria fora do create_all e do autogenerate.
+    assert "ix_exercises_search_vector" in {index.name for index in Exercise.__table__.indexes}
@@ -0,0 +1,62 @@
+"""
+CRUD do catálogo de exercícios sobre a sessão assíncrona; a exclusão é um único DELETE e
+exercício ainda em uso responde 409.
+"""
+import uuid
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_read_update_exercise(client, make_exercise):
+    exercise = await make_exercise(category="Pernas")
+
+    response = await client.get(f"/exercises/{exercise['id']}")
+    assert response.status_code == 200
+    assert response.json()["name"] == exercise["name"]
+
+    response = await client.put(f"/exercises/{exercise['id']}", json={"category": "Costas"})
+    assert response.status_code == 200
+    assert response.json()["category"] == "Costas"
+
+
+async def test_duplicate_name_is_a_conflict_regardless_of_case(client, make_exercise):
+    exercise = await make_exercise()
+    response = await client.post("/exercises/", json={"name": exercise["name"].upper()})
+    assert response.status_code == 409
+
+
+async def test_update_missing_exercise_is_404(client):
+    response = await client.put(f"/exercises/{uuid.uuid4()}", json={"category": "Costas"})
+    assert response.status_code == 404
+
+
+async def test_delete_requires_authentication(client, make_exercise):
+    exercise = await make_exercise()
+    response = await client.delete(f"/exercises/{exercise['id']}")
+    assert response.status_code == 401
+
+
+async def test_delete_unused_exercise(client, make_user, make_exercise):
+    user = make_user()
+    exercise = await make_exercise()
+
+    response = await client.delete(f"/exercises/{exercise['id']}", headers=user.headers)
+    assert response.status_code == 204
+    assert (await client.get(f"/exercises/{exercise['id']}")).status_code == 404
+
+    response = await client.delete(f"/exercises/{exercise['id']}", headers=user.headers)
+    assert response.status_code == 404
+
+
+async def test_delete_exercise_in_use_is_a_conflict(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    await make_log(user, block, exercise)
+
+    response = await client.delete(f"/exercises/{exercise['id']}", headers=user.headers)
+
+    assert response.status_code == 409
+    assert (await client.get(f"/exercises/{exercise['id']}")).status_code == 200
@@ -0,0 +1,51 @@
+"""
+GET /exercise_logs/export: uma linha por série, em ordem cronológica, lida em lotes.
+"""
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+
+from aggregates import LB_TO_KG
+from routers import exercise_logs as exercise_logs_router
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_csv_export_streams_one_row_per_set_across_batches(client, make_user, make_exercise, make_block, make_log, monkeypatch):
+    monkeypatch.setattr(exercise_logs_router, "EXPORT_BATCH_SIZE", 2)
+    user, other = make_user(), make_user()
+    exercise = await make_exercise()
+    block, other_block = await make_block(user, title="Força"), await make_block(other)
+    for day in (3, 1, 2):
+        await make_log(user, block, exercise, sets=((5, 100.0), (5, 105.0)), log_date=date(2026, 2, day))
+    await make_log(user, block, exercise, sets=((8, 100.0),), log_date=date(2026, 2, 4), unit="lb")
+    await make_log(other, other_block, exercise, log_date=date(2026, 2, 1))
+
+    response = await client.get("/exercise_logs/export", headers=user.headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 7
+    assert [row["log_date"] for row in rows] == sorted(row["log_date"] for row in rows)
+    assert {row["training_block"] for row in rows} == {"Força"}
+    assert float(rows[-1]["weight_kg"]) == pytest.approx(round(100 * LB_TO_KG, 3))
+
+
+async def test_ndjson_export_honours_date_range(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    for day in (1, 2, 3):
+        await make_log(user, block, exercise, log_date=date(2026, 2, day))
+
+    response = await client.get(
+        "/exercise_logs/export", headers=user.headers, params={"format": "ndjson", "from": "2026-02-02", "to": "2026-02-02"}
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert [(item["log_date"], item["reps"], item["weight"]) for item in items] == [("2026-02-02", 5, 100.0)]
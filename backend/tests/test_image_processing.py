@@ -0,0 +1,101 @@
+"""
+Foto de perfil: upload em blocos com limite de tamanho e nome pelo hash do conteúdo;
+miniaturas fora do loop, recusando imagens acima de IMAGE_MAX_PIXELS antes de decodificar.
+"""
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+import image_processing
+from routers import auth as auth_router
+
+
+def _write_png(path, size):
+    Image.new("RGB", size, (200, 40, 40)).save(path, format="PNG")
+
+
+def test_render_thumbnails_writes_every_size(tmp_path):
+    source = tmp_path / "abc.png"
+    _write_png(source, (300, 200))
+
+    generated = image_processing._render_thumbnails(str(source), str(tmp_path), "abc")
+
+    assert sorted(generated) == list(image_processing.THUMBNAIL_SIZES)
+    for size, filename in generated.items():
+        with Image.open(tmp_path / filename) as thumbnail:
+            assert thumbnail.size == (size, size)
+    assert (tmp_path / "abc.webp").exists()
+
+
+def test_render_thumbnails_refuses_images_above_pixel_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_processing, "IMAGE_MAX_PIXELS", 100 * 100)
+    source = tmp_path / "big.png"
+    _write_png(source, (101, 100))
+
+    with pytest.raises(Image.DecompressionBombError):
+        image_processing._render_thumbnails(str(source), str(tmp_path), "big")
+    assert sorted(os.listdir(tmp_path)) == ["big.png"]
+
+
+def test_pillow_limit_follows_setting():
+    assert Image.MAX_IMAGE_PIXELS == image_processing.IMAGE_MAX_PIXELS
+
+
+@pytest.fixture
+def upload_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth_router, "UPLOAD_DIRECTORY", str(tmp_path))
+    # Threads no lugar do pool de processos: o teste não deixa processos vivos.
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(image_processing, "_get_executor", lambda: executor)
+    yield tmp_path
+    executor.shutdown(wait=True)
+
+
+def _png_bytes(size=(40, 30), color=(10, 120, 200)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.anyio
+async def test_upload_is_stored_by_content_hash_with_thumbnails(client, upload_directory):
+    content = _png_bytes()
+
+    first = await client.post("/auth/upload_profile_picture", files={"file": ("me.png", content, "image/png")})
+    second = await client.post("/auth/upload_profile_picture", files={"file": ("other.png", content, "image/png")})
+
+    assert first.status_code == 200, first.text
+    assert first.json() == second.json()
+    body = first.json()
+    assert body["filename"] == hashlib.sha256(content).hexdigest()[:32] + ".png"
+    assert set(body["thumbnails"]) == {str(size) for size in image_processing.THUMBNAIL_SIZES}
+    assert not [name for name in os.listdir(upload_directory) if name.endswith(".tmp")]
+
+
+@pytest.mark.anyio
+async def test_upload_above_size_limit_is_413(client, upload_directory, monkeypatch):
+    monkeypatch.setattr(auth_router, "MAX_PROFILE_PICTURE_BYTES", 100)
+
+    response = await client.post("/auth/upload_profile_picture", files={"file": ("me.png", _png_bytes((200, 200)), "image/png")})
+
+    assert response.status_code == 413
+    assert os.listdir(upload_directory) == []
+
+
+@pytest.mark.anyio
+async def test_upload_that_is_not_an_image_keeps_only_the_original(client, upload_directory):
+    response = await client.post("/auth/upload_profile_picture", files={"file": ("me.png", b"not an image", "image/png")})
+
+    assert response.status_code == 200
+    assert response.json()["thumbnails"] == {}
+
+
+@pytest.mark.anyio
+async def test_empty_upload_is_400(client, upload_directory):
+    response = await client.post("/auth/upload_profile_picture", files={"file": ("me.png", b"", "image/png")})
+    assert response.status_code == 400
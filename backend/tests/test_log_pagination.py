@@ -0,0 +1,74 @@
+"""
+Paginação por cursor (log_date, created_at, id) e filtros de data do GET /exercise_logs.
+"""
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from pagination import InvalidCursor, decode_log_cursor, encode_log_cursor
+
+
+def test_log_cursor_round_trip():
+    key = (date(2026, 10, 18), datetime(2026, 10, 18, 7, 30, 1, 123456), uuid.uuid4())
+    cursor = encode_log_cursor(*key)
+
+    assert "=" not in cursor
+    assert decode_log_cursor(cursor) == key
+
+
+def test_empty_log_cursor_means_first_page():
+    assert decode_log_cursor(None) is None
+    assert decode_log_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "W10", "WyJ4IiwieSIsInoiXQ"])
+def test_malformed_log_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_log_cursor(cursor)
+
+
+@pytest.mark.anyio
+async def test_cursor_pages_cover_every_log_once_newest_first(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    start = date(2026, 1, 1)
+    created = [await make_log(user, block, exercise, log_date=start + timedelta(days=day % 3)) for day in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/exercise_logs/", headers=user.headers, params=params)
+        assert response.status_code == 200, response.text
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert sorted(log["id"] for log in seen) == sorted(log["id"] for log in created)
+    dates = [log["log_date"] for log in seen]
+    assert dates == sorted(dates, reverse=True)
+
+
+@pytest.mark.anyio
+async def test_date_range_filter_and_owner_isolation(client, make_user, make_exercise, make_block, make_log):
+    user, other = make_user(), make_user()
+    exercise = await make_exercise()
+    block, other_block = await make_block(user), await make_block(other)
+    for day in (1, 5, 9):
+        await make_log(user, block, exercise, log_date=date(2026, 3, day))
+    await make_log(other, other_block, exercise, log_date=date(2026, 3, 5))
+
+    response = await client.get(
+        "/exercise_logs/", headers=user.headers, params={"from": "2026-03-02", "to": "2026-03-09"}
+    )
+
+    assert [log["log_date"] for log in response.json()] == ["2026-03-09", "2026-03-05"]
+
+
+@pytest.mark.anyio
+async def test_invalid_cursor_is_400(client, make_user):
+    user = make_user()
+    response = await client.get("/exercise_logs/", headers=user.headers, params={"cursor": "garbage"})
+    assert response.status_code == 400
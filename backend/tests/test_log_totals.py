@@ -0,0 +1,74 @@
+"""
+Colunas derivadas de exercise_logs (séries, volume, maior peso e 1RM estimado em kg):
+gravadas em toda escrita, usadas pelos filtros de GET /exercise_logs e preenchidas pela
+migração 0007 com a mesma conta de aggregates.log_totals.
+"""
+import importlib
+
+import pytest
+
+from aggregates import LB_TO_KG, log_totals
+
+SETS = [
+    {"set": 1, "reps": 5, "weight": 100.0, "unit": "kg"},
+    {"set": 2, "reps": 3, "weight": 225.0, "unit": "lb"},
+    {"set": 3, "reps": 0, "weight": 0.0},
+]
+
+
+def test_migration_backfill_matches_log_totals():
+    migration = importlib.import_module("migrations.versions.20261018_0007_exercise_log_totals")
+
+    assert migration._log_totals(SETS) == pytest.approx(log_totals(SETS))
+    assert migration._log_totals(None) == log_totals(None)
+
+
+async def _logs(client, user, **params):
+    response = await client.get("/exercise_logs/", headers=user.headers, params=params)
+    assert response.status_code == 200, response.text
+    return {log["id"] for log in response.json()}
+
+
+@pytest.mark.anyio
+async def test_totals_are_stored_in_kg_and_follow_updates(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    log = await make_log(user, await make_block(user), await make_exercise(), sets=((5, 220.0), (5, 200.0)), unit="lb")
+
+    assert log["set_count"] == 2
+    assert log["top_weight_kg"] == pytest.approx(220.0 * LB_TO_KG)
+    assert log["total_volume_kg"] == pytest.approx(5 * 420.0 * LB_TO_KG)
+
+    response = await client.put(f"/exercise_logs/{log['id']}", headers=user.headers, json={"sets_reps_data": SETS})
+    assert response.status_code == 200, response.text
+    updated = response.json()
+    expected = log_totals(SETS)
+    assert updated["set_count"] == expected["set_count"] == 3
+    assert updated["top_weight_kg"] == pytest.approx(expected["top_weight_kg"])
+    assert updated["total_volume_kg"] == pytest.approx(expected["total_volume_kg"])
+    assert updated["estimated_1rm_kg"] == pytest.approx(expected["estimated_1rm_kg"])
+
+
+@pytest.mark.anyio
+async def test_logs_are_filtered_by_derived_totals(client, make_user, make_exercise, make_block, make_log):
+    user, other = make_user(), make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    light = await make_log(user, block, exercise, sets=((10, 60.0),))
+    heavy = await make_log(user, block, exercise, sets=((3, 140.0),))
+    many = await make_log(user, block, exercise, sets=((5, 80.0),) * 4)
+    # 300 lb ≈ 136 kg: o filtro compara em kg, não no número digitado.
+    pounds = await make_log(user, block, exercise, sets=((1, 300.0),), unit="lb")
+    await make_log(other, await make_block(other), exercise, sets=((1, 300.0),) * 5)
+
+    assert await _logs(client, user, min_top_weight_kg=130) == {heavy["id"], pounds["id"]}
+    assert await _logs(client, user, min_top_weight_kg=137) == {heavy["id"]}
+    assert await _logs(client, user, min_volume_kg=600) == {light["id"], many["id"]}
+    assert await _logs(client, user, min_set_count=4) == {many["id"]}
+    assert await _logs(client, user, min_top_weight_kg=70, min_volume_kg=1000) == {many["id"]}
+
+
+@pytest.mark.anyio
+async def test_negative_filters_are_rejected(client, make_user):
+    user = make_user()
+    response = await client.get("/exercise_logs/", headers=user.headers, params={"min_volume_kg": -1})
+    assert response.status_code == 422
@@ -0,0 +1,111 @@
+"""
+Login: bcrypt no pool dedicado (com fila limitada) e token bucket por usuário e por IP.
+"""
+import pytest
+
+import rate_limit
+import security
+from rate_limit import TokenBucketLimiter
+from routers import auth as auth_router
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    limiter = TokenBucketLimiter(capacity=2, refill_per_minute=6)
+
+    assert limiter.consume("ana") == (True, 0.0)
+    assert limiter.consume("ana") == (True, 0.0)
+    allowed, retry_after = limiter.consume("ana")
+    assert not allowed
+    assert retry_after == pytest.approx(10.0)
+
+    clock.now += 10
+    assert limiter.consume("ana")[0]
+    assert limiter.stats() == {"keys": 1, "allowed": 3, "limited": 1}
+
+
+def test_buckets_are_independent_per_key(clock):
+    limiter = TokenBucketLimiter(capacity=1, refill_per_minute=1)
+    assert limiter.consume("ana")[0]
+    assert not limiter.consume("ana")[0]
+    assert limiter.consume("bia")[0]
+
+
+def test_least_recently_used_key_is_forgotten(clock):
+    limiter = TokenBucketLimiter(capacity=1, refill_per_minute=0, max_keys=2)
+    limiter.consume("a")
+    limiter.consume("b")
+    limiter.consume("c")
+
+    assert limiter.stats()["keys"] == 2
+    # "a" saiu do LRU: volta com o balde cheio.
+    assert limiter.consume("a")[0]
+
+
+def test_bucket_without_refill_asks_to_wait_a_minute(clock):
+    limiter = TokenBucketLimiter(capacity=1, refill_per_minute=0)
+    limiter.consume("ana")
+    assert limiter.consume("ana") == (False, 60.0)
+
+
+@pytest.mark.anyio
+async def test_hash_pool_rejects_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(security, "_hash_in_flight", security.PASSWORD_HASH_WORKERS + security.PASSWORD_HASH_MAX_QUEUE)
+    rejected = security.password_hashing_stats()["rejected"]
+
+    with pytest.raises(security.PasswordHashingBusy):
+        await security.get_password_hash_async("whatever")
+    assert security.password_hashing_stats()["rejected"] == rejected + 1
+
+
+@pytest.mark.anyio
+async def test_hashing_runs_off_the_event_loop():
+    password_hash = await security.get_password_hash_async("secret123")
+    assert await security.verify_password_async("secret123", password_hash)
+    assert not await security.verify_password_async("wrong", password_hash)
+
+
+@pytest.mark.anyio
+async def test_login_returns_token(client, make_user):
+    user = make_user()
+    response = await client.post("/auth/token", data={"username": user.username, "password": user.password})
+    assert response.status_code == 200, response.text
+    assert response.json()["token_type"] == "bearer"
+
+
+@pytest.mark.anyio
+async def test_login_is_rate_limited_per_username(client, make_user, monkeypatch):
+    monkeypatch.setattr(auth_router, "login_username_limiter", TokenBucketLimiter(1, 0))
+    user = make_user()
+
+    first = await client.post("/auth/token", data={"username": user.username, "password": "wrong"})
+    second = await client.post("/auth/token", data={"username": user.username, "password": user.password})
+
+    assert first.status_code == 401
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "60"
+
+
+@pytest.mark.anyio
+async def test_login_answers_503_when_hash_pool_is_saturated(client, make_user, monkeypatch):
+    monkeypatch.setattr(security, "_hash_in_flight", security.PASSWORD_HASH_WORKERS + security.PASSWORD_HASH_MAX_QUEUE)
+    user = make_user()
+
+    response = await client.post("/auth/token", data={"username": user.username, "password": user.password})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,79 @@
+"""
+Instrumentação: histogramas no formato do Prometheus, rota pelo template (não pelo caminho)
+e contagem das instruções SQL de cada requisição.
+"""
+import logging
+import re
+
+import pytest
+
+import metrics
+from metrics import Counter, Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("h_seconds", "doc", (0.1, 1.0), ("route",))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+
+    assert histogram.render() == [
+        "# HELP h_seconds doc",
+        "# TYPE h_seconds histogram",
+        'h_seconds_bucket{route="/a",le="0.1"} 1',
+        'h_seconds_bucket{route="/a",le="1"} 2',
+        'h_seconds_bucket{route="/a",le="+Inf"} 3',
+        'h_seconds_sum{route="/a"} 5.55',
+        'h_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("c_total", "doc", ("route",))
+    counter.inc('/a"b\\c')
+    assert counter.render()[-1] == 'c_total{route="/a\\"b\\\\c"} 1'
+
+
+def _sample(text, name, **labels):
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}\{{{re.escape(label_text)}\}} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+@pytest.mark.anyio
+async def test_requests_are_labelled_by_route_template_with_sql_counts(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    log = await make_log(user, block, exercise)
+    before = (await client.get("/metrics")).text
+
+    response = await client.get(f"/exercise_logs/{log['id']}", headers=user.headers)
+    assert response.status_code == 200
+    text = (await client.get("/metrics")).text
+
+    route = {"method": "GET", "route": "/exercise_logs/{log_id}"}
+    assert _sample(text, "gym_notes_http_requests_total", **route, status="200") == _sample(
+        before, "gym_notes_http_requests_total", **route, status="200"
+    ) + 1
+    assert _sample(text, "gym_notes_http_request_db_statements_count", **route) == _sample(
+        before, "gym_notes_http_request_db_statements_count", **route
+    ) + 1
+    assert _sample(text, "gym_notes_http_request_db_statements_sum", **route) > _sample(
+        before, "gym_notes_http_request_db_statements_sum", **route
+    )
+    assert log["id"] not in text
+    assert "gym_notes_principal_cache_hits" in text
+
+
+@pytest.mark.anyio
+async def test_slow_requests_are_logged_with_their_sql(client, make_user, monkeypatch, caplog):
+    monkeypatch.setattr(metrics, "SLOW_REQUEST_MS", 0.0)
+    user = make_user()
+
+    with caplog.at_level(logging.WARNING, logger="gym_notes.slow_requests"):
+        await client.get("/training_blocks/", headers=user.headers)
+
+    records = [record for record in caplog.records if record.name == "gym_notes.slow_requests"]
+    assert records
+    assert "SELECT" in records[-1].getMessage()
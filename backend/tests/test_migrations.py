@@ -0,0 +1,77 @@
+"""
+Migrations rodadas num SQLite à parte: a limpeza da 0002 precisa deixar rastro no log, e o
+head precisa bater com os models (o mesmo que `alembic check`).
+"""
+import logging
+import os
+import uuid
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Índices de expressão não são refletidos no SQLite; o Alembic só avisa que os pula.
+pytestmark = pytest.mark.filterwarnings("ignore:autogenerate skipping metadata-specified expression-based index")
+
+
+@pytest.fixture
+def migration_connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+def _alembic_config(connection):
+    # Sem o alembic.ini: o env.py não reconfigura o logging (o caplog continua recebendo os logs).
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.attributes["connection"] = connection
+    return config
+
+
+def test_0002_logs_removed_duplicate_block_exercises(migration_connection, caplog):
+    config = _alembic_config(migration_connection)
+    command.upgrade(config, "0001")
+
+    user_id, exercise_id, block_id = uuid.uuid4().hex, uuid.uuid4().hex, uuid.uuid4().hex
+    kept_id, duplicate_id = uuid.uuid4().hex, uuid.uuid4().hex
+    migration_connection.execute(
+        text("INSERT INTO users (id, username, email, hashed_password) VALUES (:id, 'm', 'm@example.com', 'x')"),
+        {"id": user_id},
+    )
+    migration_connection.execute(
+        text("INSERT INTO exercises (id, name) VALUES (:id, 'Squat')"), {"id": exercise_id}
+    )
+    migration_connection.execute(
+        text("INSERT INTO training_blocks (id, title, user_id) VALUES (:id, 'A', :user_id)"),
+        {"id": block_id, "user_id": user_id},
+    )
+    for row_id, position in ((kept_id, 0), (duplicate_id, 1)):
+        migration_connection.execute(
+            text(
+                "INSERT INTO training_block_exercises (id, training_block_id, exercise_id, order_in_block)"
+                " VALUES (:id, :block_id, :exercise_id, :position)"
+            ),
+            {"id": row_id, "block_id": block_id, "exercise_id": exercise_id, "position": position},
+        )
+    migration_connection.commit()
+
+    with caplog.at_level(logging.INFO, logger="alembic.migration.0002"):
+        command.upgrade(config, "0002")
+
+    remaining = migration_connection.execute(text("SELECT id FROM training_block_exercises")).scalars().all()
+    assert remaining == [kept_id]
+    removed = [r for r in caplog.records if r.name == "alembic.migration.0002" and r.levelno == logging.WARNING]
+    assert len(removed) == 1
+    assert duplicate_id in removed[0].getMessage()
+
+
+def test_head_matches_models_without_postgres_only_objects(migration_connection):
+    config = _alembic_config(migration_connection)
+    command.upgrade(config, "head")
+    # Levanta AutogenerateDiffsDetected se o autogenerate propuser alguma operação.
+    command.check(config)
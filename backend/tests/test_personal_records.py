@@ -0,0 +1,78 @@
+"""
+Recordes pessoais mantidos na escrita: melhora por upsert condicional, recálculo quando o
+log do recorde muda ou sai, e o mesmo resultado que a reconstrução completa.
+"""
+import pytest
+
+from aggregates import estimate_1rm, rebuild_user_aggregates
+from database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+async def _records(client, user, **params):
+    response = await client.get("/records/", headers=user.headers, params=params)
+    assert response.status_code == 200, response.text
+    return {record["reps"]: record for record in response.json()}
+
+
+async def test_heavier_set_becomes_the_record(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    await make_log(user, block, exercise, sets=((5, 100.0), (3, 110.0)), log_date="2026-07-01")
+    best = await make_log(user, block, exercise, sets=((5, 105.0),), log_date="2026-07-08")
+    await make_log(user, block, exercise, sets=((5, 90.0),), log_date="2026-07-15")
+
+    records = await _records(client, user, exercise_id=exercise["id"])
+
+    assert set(records) == {3, 5}
+    assert records[5]["weight_kg"] == 105.0
+    assert records[5]["estimated_1rm"] == pytest.approx(estimate_1rm(105.0, 5))
+    assert records[5]["achieved_on"] == "2026-07-08"
+    assert records[5]["exercise_log_id"] == best["id"]
+    assert records[3]["weight_kg"] == 110.0
+
+
+async def test_records_fall_back_when_the_record_log_is_deleted_or_edited(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    first = await make_log(user, block, exercise, sets=((5, 100.0),), log_date="2026-07-01")
+    best = await make_log(user, block, exercise, sets=((5, 120.0),), log_date="2026-07-02")
+
+    assert (await client.delete(f"/exercise_logs/{best['id']}", headers=user.headers)).status_code == 204
+    records = await _records(client, user)
+    assert (records[5]["weight_kg"], records[5]["exercise_log_id"]) == (100.0, first["id"])
+
+    response = await client.put(f"/exercise_logs/{first['id']}", headers=user.headers, json={
+        "sets_reps_data": [{"set": 1, "reps": 3, "weight": 100.0}],
+    })
+    assert response.status_code == 200, response.text
+    assert set(await _records(client, user)) == {3}
+
+
+async def test_tie_keeps_the_earliest_date_like_the_rebuild(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    await make_log(user, block, exercise, sets=((5, 100.0),), log_date="2026-07-10")
+    earliest = await make_log(user, block, exercise, sets=((5, 100.0),), log_date="2026-07-03")
+    await make_log(user, block, exercise, sets=((5, 100.0), (8, 80.0)), log_date="2026-07-20")
+
+    incremental = await _records(client, user)
+    assert incremental[5]["achieved_on"] == "2026-07-03"
+    assert incremental[5]["exercise_log_id"] == earliest["id"]
+
+    async with AsyncSessionLocal() as db:
+        await rebuild_user_aggregates(db, user.id)
+        await db.commit()
+    assert await _records(client, user) == incremental
+
+
+async def test_records_are_per_user(client, make_user, make_exercise, make_block, make_log):
+    user, other = make_user(), make_user()
+    exercise = await make_exercise()
+    await make_log(other, await make_block(other), exercise, sets=((5, 200.0),))
+
+    assert await _records(client, user) == {}
@@ -0,0 +1,109 @@
+"""
+Roteamento de leituras: GETs vão para a réplica enquanto o atraso medido estiver abaixo de
+REPLICA_MAX_LAG_SECONDS; réplica atrasada ou fora do ar devolve as leituras ao primário.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import database
+from database import ReplicaHealth, _connect_args, _pool_options, to_async_url
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def __aenter__(self):
+        if self.engine.error:
+            raise self.engine.error
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def scalar(self, statement):
+        self.engine.checks += 1
+        return self.engine.lag
+
+
+class FakeEngine:
+    dialect = SimpleNamespace(name="postgresql")
+
+    def __init__(self, lag=0.0, error=None):
+        self.lag = lag
+        self.error = error
+        self.checks = 0
+
+    def connect(self):
+        return FakeConnection(self)
+
+
+def test_drivers_are_swapped_for_async_ones():
+    assert to_async_url("postgresql://u:p@h:5432/db") == "postgresql+asyncpg://u:p@h:5432/db"
+    assert to_async_url("sqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    assert to_async_url("postgresql+asyncpg://h/db") == "postgresql+asyncpg://h/db"
+
+
+def test_replica_connections_are_read_only_and_named():
+    args = _connect_args("postgresql+asyncpg://h/db", default_transaction_read_only="on")
+    assert args == {"server_settings": {
+        "application_name": database.DB_APPLICATION_NAME, "default_transaction_read_only": "on",
+    }}
+    assert _connect_args("sqlite+aiosqlite:///x.db") == {}
+
+
+def test_pool_sizing_applies_except_to_in_memory_sqlite():
+    assert _pool_options("postgresql+asyncpg://h/db")["pool_size"] == database.DB_POOL_SIZE
+    assert "pool_size" not in _pool_options("sqlite+aiosqlite:///:memory:")
+
+
+@pytest.mark.anyio
+async def test_lagging_replica_falls_back_to_primary():
+    engine = FakeEngine(lag=5.0)
+    health = ReplicaHealth(engine, max_lag_seconds=2, check_interval_seconds=60)
+
+    assert await health.use_replica() is False
+    assert health.stats()["primary_fallbacks"] == 1
+
+    engine.lag = 0.5
+    # O atraso só é medido de novo depois do intervalo.
+    assert await health.use_replica() is False
+    assert engine.checks == 1
+
+
+@pytest.mark.anyio
+async def test_replica_is_used_while_lag_is_small():
+    engine = FakeEngine(lag=0.5)
+    health = ReplicaHealth(engine, max_lag_seconds=2, check_interval_seconds=0)
+
+    assert await health.use_replica() is True
+    assert health.stats()["lag_seconds"] == 0.5
+    assert health.stats()["replica_reads"] == 1
+
+
+@pytest.mark.anyio
+async def test_unreachable_replica_falls_back_to_primary():
+    health = ReplicaHealth(FakeEngine(error=OSError("connection refused")), max_lag_seconds=2, check_interval_seconds=0)
+
+    assert await health.use_replica() is False
+    assert health.stats()["check_failures"] == 1
+    assert health.stats()["lag_seconds"] is None
+
+
+@pytest.mark.anyio
+async def test_read_sessions_follow_replica_health(monkeypatch):
+    engine = FakeEngine(lag=0.0)
+    health = ReplicaHealth(engine, max_lag_seconds=2, check_interval_seconds=0)
+    monkeypatch.setattr(database, "async_read_engine", engine)
+    monkeypatch.setattr(database, "replica_health", health)
+
+    assert await database.read_sessionmaker() is database.AsyncReadSessionLocal
+    engine.lag = 10.0
+    assert await database.read_sessionmaker() is database.AsyncSessionLocal
+
+
+@pytest.mark.anyio
+async def test_without_replica_reads_use_the_primary():
+    assert database.async_read_engine is database.async_engine
+    assert await database.read_sessionmaker() is database.AsyncSessionLocal
@@ -0,0 +1,130 @@
+"""
+Cache de respostas GET por usuário: TTL e LRU do backend em memória, versão por usuário
+incrementada nas escritas e falhas do backend tratadas como miss.
+"""
+import pytest
+
+import response_cache as response_cache_module
+from response_cache import InMemoryBackend, ResponseCache, response_cache
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(response_cache_module, "time", fake)
+    return fake
+
+
+class BrokenBackend:
+    async def get_version(self, user_key):
+        raise ConnectionError("redis down")
+
+    async def bump_version(self, user_key):
+        raise ConnectionError("redis down")
+
+    def stats(self):
+        return {}
+
+
+async def test_entry_expires_after_ttl(clock):
+    backend = InMemoryBackend(ttl_seconds=30, max_entries=10)
+    await backend.set("k", b"body")
+
+    clock.now += 29
+    assert await backend.get("k") == b"body"
+    clock.now += 1
+    assert await backend.get("k") is None
+    assert backend.stats()["size"] == 0
+
+
+async def test_least_recently_used_entry_is_evicted(clock):
+    backend = InMemoryBackend(ttl_seconds=30, max_entries=2)
+    await backend.set("a", b"1")
+    await backend.set("b", b"2")
+    await backend.get("a")
+    await backend.set("c", b"3")
+
+    assert await backend.get("b") is None
+    assert (await backend.get("a"), await backend.get("c")) == (b"1", b"3")
+    assert backend.stats()["evictions"] == 1
+
+
+async def test_zero_ttl_or_size_disables_storage(clock):
+    for backend in (InMemoryBackend(ttl_seconds=0, max_entries=10), InMemoryBackend(ttl_seconds=30, max_entries=0)):
+        await backend.set("k", b"body")
+        assert await backend.get("k") is None
+
+
+async def test_versions_are_per_user():
+    backend = InMemoryBackend(ttl_seconds=30, max_entries=10)
+    await backend.bump_version("ana")
+    await backend.bump_version("ana")
+
+    assert await backend.get_version("ana") == 2
+    assert await backend.get_version("bia") == 0
+
+
+async def test_backend_failures_become_misses():
+    cache = ResponseCache(BrokenBackend())
+
+    lookup = await cache.lookup(None, "ana")
+    await cache.invalidate_user("ana")
+
+    assert lookup.hit is False
+    assert cache.stats()["errors"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+async def _blocks(client, user, **headers):
+    return await client.get("/training_blocks/", headers={**user.headers, **headers})
+
+
+async def test_repeated_get_is_served_from_cache(client, make_user, make_block):
+    user = make_user()
+    await make_block(user)
+    before = response_cache.stats()
+
+    first = await _blocks(client, user)
+    second = await _blocks(client, user)
+
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert response_cache.stats()["hits"] == before["hits"] + 1
+    assert (await _blocks(client, user, **{"If-None-Match": first.headers["ETag"]})).status_code == 304
+
+
+async def test_write_invalidates_only_the_writers_cache(client, make_user, make_block):
+    user, other = make_user(), make_user()
+    block = await make_block(user, "Antes")
+    await make_block(other)
+    await _blocks(client, user)
+    other_before = (await _blocks(client, other)).json()
+
+    response = await client.put(f"/training_blocks/{block['id']}", headers=user.headers, json={"title": "Depois"})
+    assert response.status_code == 200, response.text
+
+    assert [row["title"] for row in (await _blocks(client, user)).json()] == ["Depois"]
+    hits = response_cache.stats()["hits"]
+    assert (await _blocks(client, other)).json() == other_before
+    assert response_cache.stats()["hits"] == hits + 1
+
+
+async def test_query_parameters_are_part_of_the_key(client, make_user, make_block):
+    user = make_user()
+    for title in ("A", "B"):
+        await make_block(user, title)
+
+    assert len((await _blocks(client, user)).json()) == 2
+    response = await client.get("/training_blocks/", headers=user.headers, params={"limit": 1})
+    assert len(response.json()) == 1
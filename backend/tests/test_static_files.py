@@ -0,0 +1,70 @@
+"""
+/static: cache imutável para nomes endereçados por conteúdo e variantes .webp/.br/.gz
+negociadas pelos cabeçalhos Accept.
+"""
+import gzip
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from static_files import DEFAULT_CACHE_CONTROL, IMMUTABLE_CACHE_CONTROL, CachedStaticFiles, _accepts
+
+HASHED_NAME = "0123456789abcdef0123456789abcdef"
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def static_client(tmp_path):
+    (tmp_path / f"{HASHED_NAME}.jpg").write_bytes(b"jpeg")
+    (tmp_path / f"{HASHED_NAME}.webp").write_bytes(b"webp")
+    (tmp_path / "app.js").write_text("console.log('gym notes');")
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(b"console.log('gym notes');"))
+    app = Starlette(routes=[Mount("/static", CachedStaticFiles(directory=str(tmp_path)))])
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.parametrize("header, token, accepted", [
+    ("image/webp,image/*;q=0.8", "image/webp", True),
+    ("image/avif, IMAGE/WEBP;q=0.5", "image/webp", True),
+    ("image/webp;q=0", "image/webp", False),
+    ("gzip;q=abc", "gzip", False),
+    ("br, gzip", "deflate", False),
+])
+def test_accepts_honours_quality(header, token, accepted):
+    assert _accepts(header, token) is accepted
+
+
+async def test_content_addressed_files_are_immutable(static_client):
+    response = await static_client.get(f"/static/{HASHED_NAME}.jpg")
+
+    assert response.content == b"jpeg"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept"
+
+
+async def test_webp_variant_is_served_when_accepted(static_client):
+    response = await static_client.get(f"/static/{HASHED_NAME}.jpg", headers={"Accept": "image/webp,*/*"})
+
+    assert response.content == b"webp"
+    assert response.headers["content-type"] == "image/webp"
+
+
+async def test_precompressed_variant_keeps_original_type(static_client):
+    response = await static_client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "javascript" in response.headers["content-type"]
+    assert response.text == "console.log('gym notes');"
+    assert response.headers["cache-control"] == DEFAULT_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+async def test_identity_is_served_without_accept_encoding(static_client):
+    response = await static_client.get("/static/app.js", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "console.log('gym notes');"
@@ -0,0 +1,120 @@
+"""
+GET /sync: sincronização completa, deltas a partir do watermark com tombstones das
+exclusões e páginas por cursor (carimbo, id) em cada coleção.
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from models.exercise_log import ExerciseLog
+from pagination import InvalidCursor, decode_sync_cursor, encode_sync_cursor
+from routers.sync import _changes_page
+
+
+def test_sync_cursor_round_trip():
+    watermark = datetime(2026, 10, 18, 9, 0, 0, 250000)
+    positions = {"exercise_logs": (datetime(2026, 10, 18, 8, 59, 59, 1), uuid.uuid4())}
+
+    assert decode_sync_cursor(encode_sync_cursor(watermark, positions)) == (watermark, positions)
+    assert decode_sync_cursor(encode_sync_cursor(watermark, {})) == (watermark, {})
+
+
+@pytest.mark.parametrize("cursor", ["", "garbage", "WyJ4Il0", "WyIyMDI2LTEwLTE4IiwgW11d"])
+def test_malformed_sync_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_sync_cursor(cursor)
+
+
+def test_page_continues_after_the_last_key():
+    page = _changes_page(
+        select(ExerciseLog), ExerciseLog.updated_at, ExerciseLog.id,
+        since=datetime(2026, 1, 1), after=(datetime(2026, 1, 2), uuid.uuid4()), limit=10,
+    )
+    sql = str(page.compile(dialect=asyncpg.dialect()))
+
+    assert "exercise_logs.updated_at >= " in sql
+    assert "(exercise_logs.updated_at, exercise_logs.id) > (" in sql
+    assert "ORDER BY exercise_logs.updated_at, exercise_logs.id" in sql
+    assert "LIMIT" in sql
+
+
+async def _sync(client, user, **params):
+    response = await client.get("/sync/", headers=user.headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _ids(changes, name):
+    return {row["id"] for row in changes[name]}
+
+
+@pytest.mark.anyio
+async def test_full_sync_returns_only_the_users_data(client, make_user, make_exercise, make_block, make_log):
+    user, other = make_user(), make_user()
+    exercise = await make_exercise()
+    block = await make_block(user)
+    log = await make_log(user, block, exercise)
+    await make_log(other, await make_block(other), exercise)
+
+    changes = await _sync(client, user)
+
+    assert changes["full"] is True
+    assert _ids(changes, "training_blocks") == {block["id"]}
+    assert _ids(changes, "exercise_logs") == {log["id"]}
+    assert changes["tombstones"] == []
+    assert changes["next_cursor"] is None
+
+
+@pytest.mark.anyio
+async def test_delta_since_watermark_has_changes_and_tombstones(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise, other_exercise = await make_exercise(), await make_exercise()
+    block = await make_block(user)
+    link = (await client.post(
+        "/training_block_exercises/", headers=user.headers,
+        json={"training_block_id": block["id"], "exercise_id": exercise["id"]},
+    )).json()
+    watermark = (await _sync(client, user))["watermark"]
+
+    log = await make_log(user, block, other_exercise)
+    response = await client.put(f"/training_blocks/{block['id']}", headers=user.headers, json={"title": "Renomeado"})
+    assert response.status_code == 200, response.text
+    assert (await client.delete(f"/training_block_exercises/{link['id']}", headers=user.headers)).status_code == 204
+
+    changes = await _sync(client, user, since=watermark)
+
+    assert changes["full"] is False
+    assert log["id"] in _ids(changes, "exercise_logs")
+    assert [row["title"] for row in changes["training_blocks"] if row["id"] == block["id"]] == ["Renomeado"]
+    assert link["id"] not in _ids(changes, "training_block_exercises")
+    assert {"table": "training_block_exercises", "id": link["id"]} in [
+        {"table": row["table"], "id": row["id"]} for row in changes["tombstones"]
+    ]
+
+
+@pytest.mark.anyio
+async def test_pages_cover_every_row_once_with_a_fixed_watermark(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    exercise = await make_exercise()
+    blocks = [await make_block(user, title) for title in ("A", "B")]
+    logs = [await make_log(user, blocks[index % 2], exercise, log_date=f"2026-09-0{index + 1}") for index in range(5)]
+
+    pages = [await _sync(client, user, limit=2)]
+    while pages[-1]["next_cursor"]:
+        pages.append(await _sync(client, user, limit=2, cursor=pages[-1]["next_cursor"]))
+
+    assert len(pages) == 3
+    assert {page["watermark"] for page in pages} == {pages[0]["watermark"]}
+    for name, expected in (("training_blocks", blocks), ("exercise_logs", logs)):
+        delivered = [row["id"] for page in pages for row in page[name]]
+        assert sorted(delivered) == sorted(item["id"] for item in expected)
+
+
+@pytest.mark.anyio
+async def test_invalid_sync_cursor_is_400(client, make_user):
+    user = make_user()
+    response = await client.get("/sync/", headers=user.headers, params={"cursor": "garbage"})
+    assert response.status_code == 400
@@ -0,0 +1,121 @@
+"""
+GET /training_blocks/{id}/workout: uma consulta (LEFT JOIN LATERAL, só PostgreSQL) e a
+montagem da resposta a partir das linhas dela. A sessão de leitura é trocada por uma que
+guarda a consulta e devolve linhas prontas.
+"""
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from database import get_read_db
+from main import app
+from models.exercise import Exercise
+from models.exercise_log import ExerciseLog
+from models.training_block import TrainingBlock
+from models.training_block_exercise import TrainingBlockExercise
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+class RecordingSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def all(self):
+        return self.rows
+
+
+@pytest.fixture
+def read_session():
+    def install(rows):
+        session = RecordingSession(rows)
+        app.dependency_overrides[get_read_db] = lambda: session
+        return session
+
+    yield install
+    app.dependency_overrides.pop(get_read_db, None)
+
+
+def _block(user):
+    return TrainingBlock(id=uuid.uuid4(), title="Treino A", description=None, color_hex="#FFFFFF", user_id=user.id, created_at=NOW, updated_at=NOW)
+
+
+def _exercise(name):
+    return Exercise(id=uuid.uuid4(), name=name, description=None, category=None, created_at=NOW, updated_at=NOW)
+
+
+def _link(block, exercise, order):
+    return TrainingBlockExercise(
+        id=uuid.uuid4(), training_block_id=block.id, exercise_id=exercise.id, order_in_block=order, created_at=NOW, updated_at=NOW
+    )
+
+
+def _log(user, block, exercise):
+    return ExerciseLog(
+        id=uuid.uuid4(), training_block_id=block.id, exercise_id=exercise.id, user_id=user.id, log_date=date(2026, 10, 17),
+        sets_reps_data=[{"set": 1, "reps": 5, "weight": 100.0, "unit": "kg"}], notes=None,
+        set_count=1, total_volume_kg=500.0, top_weight_kg=100.0, estimated_1rm_kg=116.67, created_at=NOW, updated_at=NOW,
+    )
+
+
+async def test_workout_is_one_lateral_query_filtered_by_owner(client, make_user, read_session):
+    user = make_user()
+    block = _block(user)
+    session = read_session([(block, None, None, None)])
+
+    response = await client.get(f"/training_blocks/{block.id}/workout", headers=user.headers)
+
+    assert response.status_code == 200, response.text
+    assert len(session.statements) == 1
+    compiled = session.statements[0].compile(dialect=asyncpg.dialect())
+    sql = str(compiled)
+    assert "LEFT OUTER JOIN LATERAL" in sql
+    assert "training_blocks.user_id = " in sql
+    assert user.id in compiled.params.values()
+
+
+async def test_workout_groups_rows_into_exercises_with_last_log(client, make_user, read_session):
+    user = make_user()
+    block = _block(user)
+    squat, bench = _exercise("Agachamento"), _exercise("Supino")
+    last_squat = _log(user, block, squat)
+    read_session([
+        (block, _link(block, squat, 0), squat, last_squat),
+        (block, _link(block, bench, 1), bench, None),
+    ])
+
+    response = await client.get(f"/training_blocks/{block.id}/workout", headers=user.headers)
+
+    body = response.json()
+    assert body["id"] == str(block.id)
+    assert [item["exercise"]["name"] for item in body["exercises"]] == ["Agachamento", "Supino"]
+    assert body["exercises"][0]["last_log"]["id"] == str(last_squat.id)
+    assert body["exercises"][1]["last_log"] is None
+
+
+async def test_empty_block_has_no_exercises(client, make_user, read_session):
+    user = make_user()
+    block = _block(user)
+    read_session([(block, None, None, None)])
+
+    response = await client.get(f"/training_blocks/{block.id}/workout", headers=user.headers)
+
+    assert response.json()["exercises"] == []
+
+
+async def test_missing_or_foreign_block_is_404(client, make_user, read_session):
+    user = make_user()
+    read_session([])
+
+    response = await client.get(f"/training_blocks/{uuid.uuid4()}/workout", headers=user.headers)
+
+    assert response.status_code == 404
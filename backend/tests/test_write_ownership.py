@@ -0,0 +1,115 @@
+"""
+Escritas com o dono no WHERE e RETURNING: log, bloco ou exercício alheio ou inexistente é
+404 sem efeito colateral, e só falhas das FKs do log viram 404.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from database import engine
+from models import exercise_log as models_log
+from models import sync_tombstone as models_tombstone
+from routers.exercise_logs import _missing_reference
+
+pytestmark = pytest.mark.anyio
+
+
+def _count(model, condition):
+    with engine.connect() as connection:
+        return connection.scalar(select(func.count()).select_from(model).where(condition))
+
+
+@pytest.mark.parametrize("message, detail", [
+    ('insert or update on table "exercise_logs" violates foreign key constraint "exercise_logs_exercise_id_fkey"', "Exercise not found"),
+    ('insert or update on table "exercise_logs" violates foreign key constraint "exercise_logs_training_block_id_fkey"', "Training block not found"),
+    ("FOREIGN KEY constraint failed", "Exercise not found"),
+    ('null value in column "log_date" violates not-null constraint', None),
+])
+def test_only_foreign_key_failures_become_404(message, detail):
+    assert _missing_reference(IntegrityError("INSERT ...", {}, Exception(message))) == detail
+
+
+async def test_created_log_is_owned_and_stamped(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    log = await make_log(user, await make_block(user), await make_exercise())
+
+    assert log["user_id"] == str(user.id)
+    assert log["created_at"] and log["updated_at"]
+
+
+async def test_log_on_a_foreign_block_or_missing_exercise_is_404(client, make_user, make_exercise, make_block):
+    user, other = make_user(), make_user()
+    exercise = await make_exercise()
+    foreign_block, own_block = await make_block(other), await make_block(user)
+
+    for block_id, exercise_id, detail in (
+        (foreign_block["id"], exercise["id"], "Training block not found"),
+        (str(uuid.uuid4()), exercise["id"], "Training block not found"),
+        (own_block["id"], str(uuid.uuid4()), "Exercise not found"),
+    ):
+        response = await client.post("/exercise_logs/", headers=user.headers, json={
+            "training_block_id": block_id, "exercise_id": exercise_id,
+            "sets_reps_data": [{"set": 1, "reps": 5, "weight": 100.0}],
+        })
+        assert (response.status_code, response.json()["detail"]) == (404, detail)
+
+    assert _count(models_log.ExerciseLog, models_log.ExerciseLog.user_id == user.id) == 0
+
+
+async def test_foreign_log_cannot_be_updated_or_deleted(client, make_user, make_exercise, make_block, make_log):
+    user, other = make_user(), make_user()
+    log = await make_log(other, await make_block(other), await make_exercise(), sets=((5, 100.0),))
+
+    response = await client.put(f"/exercise_logs/{log['id']}", headers=user.headers, json={"notes": "invadido"})
+    assert response.status_code == 404
+    assert (await client.delete(f"/exercise_logs/{log['id']}", headers=user.headers)).status_code == 404
+
+    current = (await client.get(f"/exercise_logs/{log['id']}", headers=other.headers)).json()
+    assert current["notes"] == log["notes"]
+    assert _count(models_tombstone.SyncTombstone, models_tombstone.SyncTombstone.row_id == uuid.UUID(log["id"])) == 0
+
+
+async def test_log_cannot_move_to_a_foreign_block(client, make_user, make_exercise, make_block, make_log):
+    user, other = make_user(), make_user()
+    block = await make_block(user)
+    log = await make_log(user, block, await make_exercise())
+
+    response = await client.put(f"/exercise_logs/{log['id']}", headers=user.headers, json={
+        "training_block_id": (await make_block(other))["id"],
+    })
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "New training block not found or not owned by user."
+    current = (await client.get(f"/exercise_logs/{log['id']}", headers=user.headers)).json()
+    assert current["training_block_id"] == block["id"]
+
+
+async def test_foreign_block_cannot_be_updated_or_deleted(client, make_user, make_exercise, make_block, make_log):
+    user, other = make_user(), make_user()
+    block = await make_block(other, "Dele")
+    await make_log(other, block, await make_exercise())
+
+    response = await client.put(f"/training_blocks/{block['id']}", headers=user.headers, json={"title": "Meu"})
+    assert response.status_code == 404
+    assert (await client.delete(f"/training_blocks/{block['id']}", headers=user.headers)).status_code == 404
+
+    assert (await client.get(f"/training_blocks/{block['id']}", headers=other.headers)).json()["title"] == "Dele"
+    assert _count(models_tombstone.SyncTombstone, models_tombstone.SyncTombstone.user_id == other.id) == 0
+
+
+async def test_deleting_a_block_records_tombstones_for_its_children(client, make_user, make_exercise, make_block, make_log):
+    user = make_user()
+    block = await make_block(user)
+    log = await make_log(user, block, await make_exercise())
+
+    assert (await client.delete(f"/training_blocks/{block['id']}", headers=user.headers)).status_code == 204
+
+    with engine.connect() as connection:
+        tombstones = set(connection.execute(
+            select(models_tombstone.SyncTombstone.table_name, models_tombstone.SyncTombstone.row_id)
+            .where(models_tombstone.SyncTombstone.user_id == user.id)
+        ).all())
+    assert tombstones == {("training_blocks", uuid.UUID(block["id"])), ("exercise_logs", uuid.UUID(log["id"]))}
+    assert _count(models_log.ExerciseLog, models_log.ExerciseLog.id == uuid.UUID(log["id"])) == 0
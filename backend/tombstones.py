@@ -0,0 +1,23 @@
+# tombstones.py
+from sqlalchemy import Select, insert, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import db_now
+from models import sync_tombstone as models_tombstone
+
+
+async def record_tombstones(db: AsyncSession, table_name: str, rows: Select) -> None:
+    """
+    Grava tombstones para as linhas de `rows`, um SELECT de (user_id, id) executado no próprio
+    banco (INSERT ... SELECT). Deve rodar antes do DELETE, na mesma transação.
+    """
+    tombstone = models_tombstone.SyncTombstone
+    source = rows.add_columns(
+        literal(table_name).label("table_name"),
+        db_now().label("deleted_at"),
+    )
+    await db.execute(
+        insert(tombstone).from_select(
+            [tombstone.user_id, tombstone.row_id, tombstone.table_name, tombstone.deleted_at], source
+        )
+    )
@@ -42,14 +42,15 @@ class TrainingBlockExerciseCreate {
   final String trainingBlockId;
   @JsonKey(name: 'exercise_id')
   final String exerciseId;
+  // Nulo: o backend coloca o exercício no fim do bloco.
   @JsonKey(name: 'order_in_block')
-  final int orderInBlock;
+  final int? orderInBlock;
   final String? notes;
 
   TrainingBlockExerciseCreate({
     required this.trainingBlockId,
     required this.exerciseId,
-    required this.orderInBlock,
+    this.orderInBlock,
     this.notes,
   });
 
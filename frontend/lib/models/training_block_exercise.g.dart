@@ -35,7 +35,7 @@ TrainingBlockExerciseCreate _$TrainingBlockExerciseCreateFromJson(
 ) => TrainingBlockExerciseCreate(
   trainingBlockId: json['training_block_id'] as String,
   exerciseId: json['exercise_id'] as String,
-  orderInBlock: (json['order_in_block'] as num).toInt(),
+  orderInBlock: (json['order_in_block'] as num?)?.toInt(),
   notes: json['notes'] as String?,
 );
 
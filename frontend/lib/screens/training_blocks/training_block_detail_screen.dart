@@ -58,7 +58,6 @@ class _TrainingBlockDetailScreenState extends State<TrainingBlockDetailScreen> {
       final tbeCreate = TrainingBlockExerciseCreate(
         trainingBlockId: widget.trainingBlock.id,
         exerciseId: exerciseId,
-        orderInBlock: 0, 
         notes: null,
       );
       await Provider.of<TrainingBlockExerciseService>(context, listen: false)
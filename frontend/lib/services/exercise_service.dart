@@ -172,12 +172,17 @@ class ExerciseService extends ChangeNotifier {
         throw Exception("Usuário não autenticado.");
       }
       final uri = Uri.parse('$_baseUrl/exercises/$id');
-      await http.delete(
+      final response = await http.delete(
         uri,
         headers: {
           'Authorization': 'Bearer $token',
         },
       );
+      // 409: o exercício ainda está em algum bloco ou log e não foi apagado.
+      if (response.statusCode != 204) {
+        final errorData = jsonDecode(response.body);
+        throw Exception(errorData['detail'] ?? 'Falha ao deletar exercício');
+      }
       _exercises.removeWhere((e) => e.id == id);
       notifyListeners();
     } catch (e) {